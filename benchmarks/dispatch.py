@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Micro-benchmark for component dispatch: reports time spent by
+# ModuleRegistry.dispatch per component call on top of the component
+# function itself.
+#
+# Usage: benchmarks/dispatch.py [--calls 100000] [--output FILE]
+
+import argparse
+import json
+import timeit
+import xml.etree.ElementTree as XML
+
+from jenkins_jobs.config import JJBConfig
+from jenkins_jobs.modules import properties, wrappers
+from jenkins_jobs.registry import ModuleRegistry
+
+
+def run(n_calls):
+    config = JJBConfig()
+    config.validate()
+    registry = ModuleRegistry(config, plugins_list=[])
+    job_data = {"name": "bench"}
+
+    cases = [
+        ("wrapper", "timestamps", wrappers.timestamps, {}),
+        ("property", "authorization", properties.authorization, {}),
+    ]
+    results = {}
+    for component_type, name, func, data in cases:
+        component = {name: data}
+        xml_parent = XML.Element("parent")
+
+        def dispatch():
+            registry.dispatch(component_type, xml_parent, component, job_data=job_data)
+
+        def call():
+            if name == "authorization":
+                func(registry, xml_parent, data, job_data)
+            else:
+                func(registry, xml_parent, data)
+
+        dispatch()  # Load entry points.
+        dispatch_seconds = min(timeit.repeat(dispatch, number=n_calls, repeat=5))
+        xml_parent.clear()
+        call_seconds = min(timeit.repeat(call, number=n_calls, repeat=5))
+        xml_parent.clear()
+        results[f"{component_type} {name}"] = (
+            dispatch_seconds - call_seconds
+        ) / n_calls
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--calls",
+        type=int,
+        default=100000,
+        help="number of calls per component (default: %(default)s)",
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.calls)
+    for component, overhead in results.items():
+        print(f"{component}: {overhead * 1e9:.0f} ns per call overhead")
+
+    if args.output:
+        data = {"calls": args.calls, "overhead_seconds": results}
+        with open(args.output, "w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Micro-benchmark for job data expansion: reports time spent per data node
+# (dict, list or string) and for expander construction.
+#
+# Usage: benchmarks/expander.py [--builders 1000] [--output FILE]
+
+import argparse
+import json
+import timeit
+
+from jenkins_jobs.config import JJBConfig
+from jenkins_jobs.expander import Expander
+from jenkins_jobs.loc_loader import LocDict, LocList
+
+
+def make_contents(n_builders):
+    builders = LocList(
+        [
+            LocDict({"shell": f"echo {{name}} {idx}\n make {{target}}"})
+            for idx in range(n_builders)
+        ]
+    )
+    return LocDict(
+        {
+            "name": "job-{name}",
+            "node": "{node}",
+            "disabled": False,
+            "builders": builders,
+        }
+    )
+
+
+def count_nodes(obj):
+    if isinstance(obj, dict):
+        return 1 + sum(count_nodes(value) for value in obj.values())
+    if isinstance(obj, list):
+        return 1 + sum(count_nodes(value) for value in obj)
+    return 1
+
+
+def run(n_builders):
+    config = JJBConfig()
+    config.validate()
+    contents = make_contents(n_builders)
+    params = {"name": "bench", "target": "all", "node": "linux"}
+    expander = Expander.shared(config)
+    n_nodes = count_nodes(contents)
+
+    n_runs = 20
+    seconds = min(
+        timeit.repeat(lambda: expander.expand(contents, params), number=n_runs)
+    )
+    results = {"expand_per_node": seconds / n_runs / n_nodes}
+
+    n_runs = 10000
+    seconds = min(timeit.repeat(lambda: Expander(config), number=n_runs))
+    results["new_expander"] = seconds / n_runs
+    seconds = min(timeit.repeat(lambda: Expander.shared(config), number=n_runs))
+    results["shared_expander"] = seconds / n_runs
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--builders",
+        type=int,
+        default=1000,
+        help="number of builders in expanded job (default: %(default)s)",
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.builders)
+    print(f"expand: {results['expand_per_node'] * 1e9:.0f} ns per node")
+    print(f"new expander: {results['new_expander'] * 1e6:.2f} us")
+    print(f"shared expander: {results['shared_expander'] * 1e6:.2f} us")
+
+    if args.output:
+        data = {"builders": args.builders, "seconds": results}
+        with open(args.output, "w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
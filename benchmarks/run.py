@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Throughput benchmarks for processing phases on synthetic trees.
+#
+# For each tree size, a tree is generated by synthetic_tree.py and run
+# through the same phases as `jenkins-jobs update` does, each one timed
+# separately. Results are written as JSON and may be compared with results
+# of a previous run.
+#
+# Usage: benchmarks/run.py [--sizes 1000,10000,100000] [--output FILE]
+#                          [--compare BASELINE-FILE]
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from jenkins_jobs.cache import JobCache
+from jenkins_jobs.config import JJBConfig
+from jenkins_jobs.loader import load_files
+from jenkins_jobs.registry import ModuleRegistry
+from jenkins_jobs.roots import Roots
+from jenkins_jobs.version import version_info
+from jenkins_jobs.xml_config import XmlJobGenerator
+
+from synthetic_tree import n_projects_for, write_tree
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+class Timer:
+    def __init__(self):
+        self.results = {}
+
+    def __call__(self, phase, func, *args):
+        # Garbage from previous phase should not be collected on this one's time.
+        gc.collect()
+        start = time.perf_counter()
+        result = func(*args)
+        self.results[phase] = time.perf_counter() - start
+        return result
+
+
+def make_config():
+    config = JJBConfig()
+    config.validate()
+    return config
+
+
+def run_size(tree_dir, n_jobs):
+    n_projects = n_projects_for(n_jobs)
+    n_jobs = write_tree(tree_dir, n_projects)
+    path_list = sorted(Path(tree_dir).rglob("*.yaml"))
+    config = make_config()
+    timer = Timer()
+
+    fast_roots = Roots(config)
+    timer("load_files_fast", load_files, config, fast_roots, path_list, True)
+    del fast_roots
+    roots = Roots(config)
+    timer("load_files", load_files, config, roots, path_list)
+
+    jobs = timer("generate_jobs", lambda: list(roots.generate_jobs()))
+    assert len(jobs) == n_jobs, (len(jobs), n_jobs)
+    timer("generate_job_names", lambda: list(roots.generate_jobs(names_only=True)))
+
+    registry = ModuleRegistry(config, plugins_list=[])
+    registry.set_macros(roots.macros)
+    timer("amend_job_dicts", registry.amend_job_dicts, jobs)
+    xml_jobs = timer("generate_xml", XmlJobGenerator(registry).generateXML, jobs)
+    del jobs
+    timer("xml_output", lambda: [job.output() for job in xml_jobs])
+    md5_list = timer("xml_md5", lambda: [job.md5() for job in xml_jobs])
+
+    url = f"http://bench-{n_jobs}.example.org"
+    cache = JobCache(url, flush=True)
+    for job, md5 in zip(xml_jobs, md5_list):
+        cache.set(job.name, md5)
+    timer("cache_save", cache.save)
+    del cache  # Unlock it.
+    cache = timer("cache_load", JobCache, url)
+    assert len(cache.data) == n_jobs
+    del cache
+
+    return {
+        "jobs": n_jobs,
+        "projects": n_projects,
+        "files": len(path_list),
+        "seconds": timer.results,
+    }
+
+
+def run(sizes):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="jjb-bench-") as work_dir:
+        # Keep job cache away from user's one.
+        os.environ["XDG_CACHE_HOME"] = os.path.join(work_dir, "cache")
+        for n_jobs in sizes:
+            print(f"Running on {n_jobs} jobs", file=sys.stderr)
+            tree_dir = os.path.join(work_dir, f"tree-{n_jobs}")
+            results[str(n_jobs)] = result = run_size(tree_dir, n_jobs)
+            for phase, seconds in result["seconds"].items():
+                per_job = seconds / result["jobs"] * 1e6
+                print(f"  {phase}: {seconds:.3f} s, {per_job:.1f} us per job")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print changes against baseline and return list of regressions"""
+    regressions = []
+    for size, result in results.items():
+        base_result = baseline["results"].get(size)
+        if not base_result:
+            continue
+        print(f"Compared to baseline on {size} jobs:")
+        for phase, seconds in result["seconds"].items():
+            base_seconds = base_result["seconds"].get(phase)
+            if not base_seconds:
+                continue
+            ratio = seconds / base_seconds
+            print(f"  {phase}: {ratio:.2f}x")
+            if ratio > threshold:
+                regressions.append(f"{phase} on {size} jobs: {ratio:.2f}x")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=DEFAULT_SIZES,
+        help="comma-separated list of job counts (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output",
+        help="write results to this JSON file",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="BASELINE",
+        help="compare results with ones from this JSON file",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="slowdown ratio reported as regression (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    data = {
+        "jjb_version": version_info.version_string(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": run(args.sizes),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(data["results"], baseline, args.threshold)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
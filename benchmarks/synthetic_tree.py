@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Generator of synthetic job definition trees for benchmarks.
+#
+# Tree has N projects, each expanding M job templates over K axes, so it
+# defines N * M * product(axis sizes) jobs. Templates use builder and
+# publisher macros, !include-raw-expand:, !j2: and folders. Output depends
+# on arguments only, so the same arguments give the same tree.
+#
+# Usage: benchmarks/synthetic_tree.py output-dir [number-of-jobs]
+
+import functools
+import math
+import operator
+import sys
+import textwrap
+from pathlib import Path
+
+DEFAULT_AXES = (5, 2)
+DEFAULT_TEMPLATES = 10
+
+MACROS = """\
+- builder:
+    name: bench-build
+    builders:
+      - shell: 'make -C {dir} {target}'
+      - shell: !j2: |
+          {% for step in ['lint', 'test'] %}
+          tox -e {{ step }}-{{ target }}
+          {% endfor %}
+
+- publisher:
+    name: bench-notify
+    publishers:
+      - email:
+          recipients: '{recipients}'
+      - junit:
+          results: 'reports/{target}/*.xml'
+"""
+
+DEFAULTS = """\
+- defaults:
+    name: global
+    node: bench-node
+    branch: master
+    recipients: bench@example.org
+    timeout: 30
+    wrappers:
+      - timestamps
+      - timeout:
+          timeout: '{timeout}'
+"""
+
+SCRIPT = """\
+#!/bin/bash -e
+# Script of template {template}, expanded for each job.
+echo "Building {{project}} on {{axis0}}"
+export TARGET={{axis0}}-{{axis1}}
+if [ -n "${{{{WORKSPACE}}}}" ]; then
+    cd "${{{{WORKSPACE}}}}"
+fi
+"""
+
+
+def axis_values(axis, size):
+    return [f"a{axis}v{value}" for value in range(size)]
+
+
+def template_text(template, axes):
+    axis_names = "-".join(f"{{axis{axis}}}" for axis in range(len(axes)))
+    # Every other template is placed into project folder.
+    if template % 2:
+        name = f"{{project}}/t{template}-{axis_names}"
+    else:
+        name = f"{{project}}-t{template}-{axis_names}"
+    return textwrap.dedent(
+        f"""\
+        - job-template:
+            name: '{name}'
+            description: 'Template {template} for {{project}}, {axis_names}'
+            parameters:
+              - string:
+                  name: BRANCH
+                  default: '{{branch}}'
+            scm:
+              - git:
+                  url: 'https://git.example.org/{{project}}.git'
+                  branches:
+                    - '{{branch}}'
+            triggers:
+              - timed: 'H H * * *'
+            builders:
+              - bench-build:
+                  dir: '{{project}}'
+                  target: '{{axis0}}'
+              - shell: !include-raw-expand: template-{template}.sh
+              - shell: !j2: 'echo {{{{ project }}}} {{{{ axis1 }}}}'
+            publishers:
+              - bench-notify:
+                  target: '{{axis1}}'
+        """
+    )
+
+
+def project_text(project, n_templates, axes):
+    lines = [
+        "- project:",
+        f"    name: project-{project:05d}",
+        "    project: '{name}'",
+    ]
+    for axis, size in enumerate(axes):
+        lines.append(f"    axis{axis}:")
+        lines.extend(f"      - {value}" for value in axis_values(axis, size))
+    lines.append("    jobs:")
+    axis_names = "-".join(f"{{axis{axis}}}" for axis in range(len(axes)))
+    for template in range(n_templates):
+        if template % 2:
+            lines.append(f"      - '{{project}}/t{template}-{axis_names}'")
+        else:
+            lines.append(f"      - '{{project}}-t{template}-{axis_names}'")
+    return "\n".join(lines) + "\n"
+
+
+def jobs_per_project(n_templates, axes):
+    return n_templates * functools.reduce(operator.mul, axes, 1)
+
+
+def n_projects_for(n_jobs, n_templates=DEFAULT_TEMPLATES, axes=DEFAULT_AXES):
+    return max(1, math.ceil(n_jobs / jobs_per_project(n_templates, axes)))
+
+
+def write_tree(path, n_projects, n_templates=DEFAULT_TEMPLATES, axes=DEFAULT_AXES):
+    """Write tree into directory path and return number of jobs it defines"""
+    path = Path(path)
+    templates_dir = path / "templates"
+    projects_dir = path / "projects"
+    templates_dir.mkdir(parents=True, exist_ok=True)
+    projects_dir.mkdir(parents=True, exist_ok=True)
+    (path / "macros.yaml").write_text(MACROS)
+    (path / "defaults.yaml").write_text(DEFAULTS)
+    for template in range(n_templates):
+        (templates_dir / f"template-{template}.yaml").write_text(
+            template_text(template, axes)
+        )
+        (templates_dir / f"template-{template}.sh").write_text(
+            SCRIPT.format(template=template)
+        )
+    # Projects are grouped by hundred into subdirectories.
+    for project in range(n_projects):
+        group_dir = projects_dir / f"group-{project // 100:03d}"
+        group_dir.mkdir(exist_ok=True)
+        (group_dir / f"project-{project:05d}.yaml").write_text(
+            project_text(project, n_templates, axes)
+        )
+    return n_projects * jobs_per_project(n_templates, axes)
+
+
+def main():
+    path = sys.argv[1]
+    n_jobs = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    n_written = write_tree(path, n_projects_for(n_jobs))
+    print(f"{n_written} jobs written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Load test of `jenkins-jobs update` against fake Jenkins server.
+#
+# A synthetic tree is uploaded to tests/fake_jenkins server, with given
+# latency per request, for each number of workers. For each, times are
+# reported for creating all jobs, reconfiguring them, and updating with
+# --delete-old while some stale managed jobs exist.
+#
+# Usage: benchmarks/update.py [--jobs 1000] [--workers 1,4,16]
+#                             [--latency 0.01] [--output FILE]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Fake server lives in test tree.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from jenkins_jobs.cli import entry  # noqa: E402
+from tests.fake_jenkins.server import FakeJenkins  # noqa: E402
+
+from synthetic_tree import n_projects_for, write_tree  # noqa: E402
+
+STALE_JOB = (
+    "<project><description>"
+    "Stale job&lt;!-- Managed by Jenkins Job Builder --&gt;"
+    "</description></project>"
+)
+
+
+def run_update(server, work_dir, tree_dir, n_workers, *args):
+    config_path = os.path.join(work_dir, "jenkins_jobs.ini")
+    with open(config_path, "w") as f:
+        f.write(f"[jenkins]\nurl={server.url}\n")
+    start = time.perf_counter()
+    entry.JenkinsJobs(
+        [
+            "--conf",
+            config_path,
+            "--log_level",
+            "warning",
+            "--flush-cache",
+            "update",
+            "--workers",
+            str(n_workers),
+            *args,
+            "-r",
+            tree_dir,
+        ]
+    ).execute()
+    return time.perf_counter() - start
+
+
+def run_workers(work_dir, tree_dir, n_workers, n_stale, latency):
+    seconds = {}
+    with FakeJenkins(latency=latency) as server:
+        seconds["create"] = run_update(server, work_dir, tree_dir, n_workers)
+        seconds["reconfigure"] = run_update(server, work_dir, tree_dir, n_workers)
+        for idx in range(n_stale):
+            server.add_job(f"stale-{idx}", STALE_JOB)
+        seconds["delete_old"] = run_update(
+            server, work_dir, tree_dir, n_workers, "--delete-old"
+        )
+        assert not any(name.startswith("stale-") for name in server.jobs)
+    return {"seconds": seconds, "requests": dict(server.stats)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=1000, help="number of jobs")
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=[1, 4, 16],
+        help="comma-separated list of worker counts (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.01,
+        help="seconds per request (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--stale",
+        type=int,
+        default=100,
+        help="number of stale jobs to delete (default: %(default)s)",
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="jjb-bench-") as work_dir:
+        # Keep job cache away from user's one.
+        os.environ["XDG_CACHE_HOME"] = os.path.join(work_dir, "cache")
+        tree_dir = os.path.join(work_dir, "tree")
+        n_jobs = write_tree(tree_dir, n_projects_for(args.jobs))
+        for n_workers in args.workers:
+            print(f"Running with {n_workers} workers", file=sys.stderr)
+            result = run_workers(
+                work_dir, tree_dir, n_workers, args.stale, args.latency
+            )
+            results[str(n_workers)] = result
+            for phase, seconds in result["seconds"].items():
+                print(f"  {phase}: {seconds:.2f} s")
+
+    if args.output:
+        data = {
+            "jobs": n_jobs,
+            "latency": args.latency,
+            "stale": args.stale,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Write generated XML files into a single tar or zip archive.
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import posixpath
+import tarfile
+import zipfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from jenkins_jobs.errors import JenkinsJobsException
+
+__all__ = ["OutputArchive"]
+
+# Timestamp of all archive entries, so the same files give the same archive.
+# 1980-01-01, the earliest date zip format can hold.
+ENTRY_MTIME = 315532800
+
+
+def _open_zstd(file):
+    return zstandard.ZstdCompressor().stream_writer(file)
+
+
+# Suffix -> function wrapping raw file into compressing one.
+tar_compressors = {
+    ".tar": None,
+    ".tar.gz": lambda f: gzip.GzipFile(filename="", mode="wb", fileobj=f, mtime=0),
+    ".tgz": lambda f: gzip.GzipFile(filename="", mode="wb", fileobj=f, mtime=0),
+    ".tar.bz2": lambda f: bz2.BZ2File(f, mode="wb"),
+    ".tar.xz": lambda f: lzma.LZMAFile(f, mode="wb"),
+    ".tar.zst": _open_zstd,
+}
+
+
+class OutputArchive(object):
+    """Tar or zip archive to write job and view XML files into.
+
+    Archive format is selected by file name suffix: .zip, .tar, .tar.gz,
+    .tgz, .tar.bz2, .tar.xz or .tar.zst. Entries are written in the order
+    they are added, with fixed timestamps and permissions.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._names = set()
+        self._file = None
+        self._compressed = None
+        self._tar = None
+        self._zip = None
+        if path.endswith(".zip"):
+            self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+            return
+        for suffix, compressor in tar_compressors.items():
+            if path.endswith(suffix):
+                break
+        else:
+            raise JenkinsJobsException(
+                "Unknown archive type: {0}; expected one of: .zip, {1}".format(
+                    path, ", ".join(tar_compressors)
+                )
+            )
+        if compressor is _open_zstd and zstandard is None:
+            raise JenkinsJobsException(
+                "Python package 'zstandard' is required to write .zst archives"
+            )
+        self._file = open(path, "wb")
+        try:
+            if compressor:
+                self._compressed = compressor(self._file)
+            self._tar = tarfile.open(
+                fileobj=self._compressed or self._file,
+                mode="w|",
+                format=tarfile.PAX_FORMAT,
+            )
+        except BaseException:
+            self._file.close()
+            os.remove(path)
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add(self, name, data):
+        """Add file with relative path name and data bytes"""
+        name = posixpath.normpath(name.replace(os.sep, "/"))
+        if name in self._names:
+            # For example job and view with the same name and --config-xml.
+            raise JenkinsJobsException(
+                "Duplicate entry {0!r} in archive {1}".format(name, self.path)
+            )
+        self._names.add(name)
+        if self._zip:
+            info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            self._zip.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = ENTRY_MTIME
+            info.mode = 0o644
+            self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        if self._zip:
+            self._zip.close()
+            return
+        try:
+            self._tar.close()
+            if self._compressed:
+                self._compressed.close()
+        finally:
+            self._file.close()
+
+    def abort(self):
+        """Close and remove partially written archive"""
+        try:
+            self.close()
+        except Exception:
+            # Archive is removed anyway.
+            pass
+        os.remove(self.path)
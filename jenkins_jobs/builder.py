@@ -18,6 +18,7 @@
 import errno
 import hashlib
 import io
+from itertools import islice
 import logging
 import os
 from pprint import pformat
@@ -29,9 +30,11 @@ import xml.etree.ElementTree as XML
 import jenkins
 
 from jenkins_jobs.alphanum import AlphanumSort
+from jenkins_jobs.archive import OutputArchive
 from jenkins_jobs.cache import JobCache
 from jenkins_jobs.constants import MAGIC_MANAGE_STRING
 from jenkins_jobs.parallel import concurrent
+from jenkins_jobs.stats import InstrumentedJenkins, stats
 from jenkins_jobs import utils
 
 __all__ = ["JenkinsManager"]
@@ -40,6 +43,21 @@ logger = logging.getLogger(__name__)
 
 _DEFAULT_TIMEOUT = object()
 
+# Number of jobs or views per worker buffered while streaming.
+STREAM_CHUNK_SIZE = 20
+
+
+def _enum_serialized_chunks(xml_items, n_workers):
+    """Serialize jobs or views, and group them into chunks to update with
+    n_workers. Element trees are released once their job is serialized."""
+    chunk_size = STREAM_CHUNK_SIZE * max(n_workers or os.cpu_count() or 1, 1)
+    xml_iter = iter(xml_items)
+    while True:
+        chunk = [item.serialized() for item in islice(xml_iter, chunk_size)]
+        if not chunk:
+            return
+        yield chunk
+
 
 class JenkinsManager(object):
     def __init__(self, jjb_config):
@@ -52,9 +70,13 @@ class JenkinsManager(object):
             self.jenkins = jenkins.Jenkins(url, user, password, timeout)
         else:
             self.jenkins = jenkins.Jenkins(url, user, password)
+        if stats.enabled:
+            self.jenkins = InstrumentedJenkins(self.jenkins)
 
         self.cache = JobCache(
-            jjb_config.jenkins["url"], flush=jjb_config.builder["flush_cache"]
+            jjb_config.jenkins["url"],
+            flush=jjb_config.builder["flush_cache"],
+            shard=jjb_config.builder.get("shard"),
         )
 
         self._plugins_list = jjb_config.builder["plugins_info"]
@@ -63,6 +85,8 @@ class JenkinsManager(object):
         self._views = None
         self._view_list = None
         self._jjb_config = jjb_config
+        # Files written to output directory, see remove_stale_output.
+        self._written_files = set()
 
     def _setup_output(self, output, item, config_xml=False):
         output_dir = output
@@ -204,7 +228,11 @@ class JenkinsManager(object):
         deleted_jobs = 0
         if keep is None:
             keep = []
+        shard = self._jjb_config.builder.get("shard")
         for job in jobs:
+            if shard is not None and job["fullname"] not in shard:
+                # Kept or deleted by its own shard.
+                continue
             # python-jenkins stores the folder and name as 'fullname'
             # Check if the job was deleted when his parent folder was deleted
             if job["fullname"] not in keep and self.is_job(
@@ -252,6 +280,7 @@ class JenkinsManager(object):
         )
         if not changed:
             logger.debug("'{0}' has not changed".format(job.name))
+            stats.add("unchanged items")
         return changed
 
     def exists(self, job):
@@ -260,6 +289,124 @@ class JenkinsManager(object):
             logger.debug("'{0}' does not currently exist".format(job.name))
         return exists
 
+    def _prepare_output(self, output):
+        if hasattr(output, "write"):
+            # ensure only wrapped once
+            return utils.wrap_stream(output)
+        if isinstance(output, OutputArchive):
+            return output
+        if not os.path.isdir(output):
+            logger.debug("Creating directory %s" % output)
+            try:
+                os.makedirs(output)
+            except OSError:
+                if not os.path.isdir(output):
+                    raise
+        return output
+
+    def _write_items(self, items, output, config_xml, kind, n_workers=1):
+        """Write jobs or views XML; return False if output stream is closed"""
+        if hasattr(output, "write"):
+            return self._write_items_to_stream(items, output, kind)
+        if isinstance(output, OutputArchive):
+            for item in items:
+                name = item.name + "/config.xml" if config_xml else item.name
+                logger.debug("Writing XML to '{0}' in archive".format(name))
+                output.add(name, item.output())
+            return True
+        items = list(items)
+        if not items:
+            return True
+        if n_workers == 1:
+            results = [
+                self.parallel_write_item(output, config_xml, item=item)
+                for item in items
+            ]
+        else:
+            p_params = [{"item": item} for item in items]
+            results = self.parallel_write_item(
+                output, config_xml, n_workers=n_workers, concurrent=p_params
+            )
+            if len(p_params) == 1:
+                results = [results]
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+            self._written_files.add(result)
+        return True
+
+    def _write_items_to_stream(self, items, output, kind):
+        for item in items:
+            # `output` is a file-like object
+            logger.info("%s name:  %s", kind, item.name)
+            logger.debug("Writing XML to '{0}'".format(output))
+            try:
+                output.write(item.output())
+            except IOError as exc:
+                if exc.errno == errno.EPIPE:
+                    # EPIPE could happen if piping output to something
+                    # that doesn't read the whole input (e.g.: the UNIX
+                    # `head` command)
+                    return False
+                raise
+        return True
+
+    @concurrent
+    def parallel_write_item(self, output, config_xml, item):
+        output_fn = self._setup_output(output, item.name, config_xml)
+        # Compared and written as bytes, so line endings are compared too.
+        data = item.output()
+        try:
+            with io.open(output_fn, "rb") as f:
+                unchanged = f.read() == data
+        except OSError:
+            unchanged = False
+        if unchanged:
+            # Keep file modification time for rsync or make.
+            logger.debug("Not changed, skipping '{0}'".format(output_fn))
+        else:
+            logger.debug("Writing XML to '{0}'".format(output_fn))
+            with io.open(output_fn, "wb") as f:
+                f.write(data)
+        return os.path.abspath(output_fn)
+
+    def remove_stale_output(self, output, config_xml=False):
+        """Remove output files of jobs and views not generated by this run,
+        and directories left empty by that. Other files are kept: only job
+        or view XML files managed by JJB, named config.xml with config_xml,
+        are removed. Returns number of removed files."""
+        n_removed = 0
+        removed_dirs = set()
+        output = os.path.abspath(output)
+        for dir, dir_names, file_names in os.walk(output):
+            for file_name in file_names:
+                path = os.path.join(dir, file_name)
+                if path in self._written_files:
+                    continue
+                if config_xml and (file_name != "config.xml" or dir == output):
+                    continue
+                if not self._is_managed_output(path):
+                    continue
+                logger.info("Removing stale output file %s", path)
+                os.remove(path)
+                removed_dirs.add(dir)
+                n_removed += 1
+        # Deepest first, so parents left empty by children are removed too.
+        for dir in sorted(removed_dirs, key=len, reverse=True):
+            while dir != output and not os.listdir(dir):
+                os.rmdir(dir)
+                dir = os.path.dirname(dir)
+        return n_removed
+
+    @staticmethod
+    def _is_managed_output(path):
+        try:
+            root = XML.parse(path).getroot()
+        except (OSError, XML.ParseError):
+            return False
+        description = root.findtext("description") or ""
+        return description.endswith(MAGIC_MANAGE_STRING)
+
     def update_jobs(
         self,
         xml_jobs,
@@ -273,42 +420,59 @@ class JenkinsManager(object):
         logger.info("Number of jobs generated:  %d", len(xml_jobs))
         xml_jobs.sort(key=AlphanumSort)
 
-        if output and not hasattr(output, "write") and not os.path.isdir(output):
-            logger.debug("Creating directory %s" % output)
-            try:
-                os.makedirs(output)
-            except OSError:
-                if not os.path.isdir(output):
-                    raise
-
         if output:
-            # ensure only wrapped once
-            if hasattr(output, "write"):
-                output = utils.wrap_stream(output)
-
-            for job in xml_jobs:
-                if hasattr(output, "write"):
-                    # `output` is a file-like object
-                    logger.info("Job name:  %s", job.name)
-                    logger.debug("Writing XML to '{0}'".format(output))
-                    try:
-                        output.write(job.output())
-                    except IOError as exc:
-                        if exc.errno == errno.EPIPE:
-                            # EPIPE could happen if piping output to something
-                            # that doesn't read the whole input (e.g.: the UNIX
-                            # `head` command)
-                            return
-                        raise
-                    continue
+            output = self._prepare_output(output)
+            if not self._write_items(xml_jobs, output, config_xml, "Job", n_workers):
+                return
+            return xml_jobs, len(xml_jobs)
 
-                output_fn = self._setup_output(output, job.name, config_xml)
+        jobs = self._upload_jobs(xml_jobs, n_workers, existing_only)
+        if not jobs:
+            return [], 0
+        # write cache to disk
+        self.cache.save()
+        logging.debug("Total run took %ss", (time.time() - orig))
+        return jobs, len(jobs)
 
-                logger.debug("Writing XML to '{0}'".format(output_fn))
-                with io.open(output_fn, "w", encoding="utf-8") as f:
-                    f.write(job.output().decode("utf-8"))
-            return xml_jobs, len(xml_jobs)
+    def update_jobs_stream(
+        self,
+        xml_jobs,
+        n_jobs,
+        output=None,
+        n_workers=None,
+        existing_only=None,
+        config_xml=False,
+    ):
+        """Update jobs like update_jobs does, but from an iterable of jobs
+        sorted by name, see XmlStream. Jobs are serialized, written or
+        uploaded in chunks and are not kept afterwards.
+
+        Returns number of updated jobs.
+        """
+        orig = time.time()
+
+        logger.info("Number of jobs generated:  %d", n_jobs)
+        if output:
+            output = self._prepare_output(output)
+        n_updated = 0
+        try:
+            for chunk in _enum_serialized_chunks(xml_jobs, n_workers):
+                if output:
+                    if not self._write_items(
+                        chunk, output, config_xml, "Job", n_workers
+                    ):
+                        break
+                    n_updated += len(chunk)
+                else:
+                    n_updated += len(self._upload_jobs(chunk, n_workers, existing_only))
+        finally:
+            if not output and n_updated:
+                # write cache to disk, also for jobs updated before an error
+                self.cache.save()
+        logging.debug("Total run took %ss", (time.time() - orig))
+        return n_updated
 
+    def _upload_jobs(self, xml_jobs, n_workers, existing_only):
         # Filter out the jobs that did not change
         logging.debug("Filtering %d jobs for changed jobs", len(xml_jobs))
         step = time.time()
@@ -323,7 +487,7 @@ class JenkinsManager(object):
             logging.debug("Filtered for existing jobs in %ss", (time.time() - step))
 
         if not jobs:
-            return [], 0
+            return []
 
         # Update the jobs
         logging.debug("Updating jobs")
@@ -342,11 +506,8 @@ class JenkinsManager(object):
                 # update in-memory cache
                 j_name, j_md5 = result
                 self.cache.set(j_name, j_md5)
-        # write cache to disk
-        self.cache.save()
         logging.debug("Updated %d jobs in %ss", len(jobs), time.time() - step)
-        logging.debug("Total run took %ss", (time.time() - orig))
-        return jobs, len(jobs)
+        return jobs
 
     @concurrent
     def parallel_update_job(self, job):
@@ -398,7 +559,10 @@ class JenkinsManager(object):
         deleted_views = 0
         if keep is None:
             keep = []
+        shard = self._jjb_config.builder.get("shard")
         for view in view_list:
+            if shard is not None and view["name"] not in shard:
+                continue
             if view["name"] not in keep and self.is_view(view["name"], use_cache=False):
                 if self.is_managed_view(view["name"]):
                     logger.info(
@@ -463,33 +627,58 @@ class JenkinsManager(object):
         xml_views.sort(key=AlphanumSort)
 
         if output:
-            # ensure only wrapped once
-            if hasattr(output, "write"):
-                output = utils.wrap_stream(output)
-
-            for view in xml_views:
-                if hasattr(output, "write"):
-                    # `output` is a file-like object
-                    logger.info("View name:  %s", view.name)
-                    logger.debug("Writing XML to '{0}'".format(output))
-                    try:
-                        output.write(view.output())
-                    except IOError as exc:
-                        if exc.errno == errno.EPIPE:
-                            # EPIPE could happen if piping output to something
-                            # that doesn't read the whole input (e.g.: the UNIX
-                            # `head` command)
-                            return
-                        raise
-                    continue
+            output = self._prepare_output(output)
+            if not self._write_items(xml_views, output, config_xml, "View", n_workers):
+                return
+            return xml_views, len(xml_views)
+
+        views = self._upload_views(xml_views, n_workers, existing_only)
+        if not views:
+            return [], 0
+        # write cache to disk
+        self.cache.save()
+        logging.debug("Total run took %ss", (time.time() - orig))
+        return views, len(views)
 
-                output_fn = self._setup_output(output, view.name, config_xml)
+    def update_views_stream(
+        self,
+        xml_views,
+        n_views,
+        output=None,
+        n_workers=None,
+        existing_only=None,
+        config_xml=False,
+    ):
+        """Views counterpart of update_jobs_stream.
 
-                logger.debug("Writing XML to '{0}'".format(output_fn))
-                with io.open(output_fn, "w", encoding="utf-8") as f:
-                    f.write(view.output().decode("utf-8"))
-            return xml_views, len(xml_views)
+        Returns number of updated views.
+        """
+        orig = time.time()
+
+        logger.info("Number of views generated:  %d", n_views)
+        if output:
+            output = self._prepare_output(output)
+        n_updated = 0
+        try:
+            for chunk in _enum_serialized_chunks(xml_views, n_workers):
+                if output:
+                    if not self._write_items(
+                        chunk, output, config_xml, "View", n_workers
+                    ):
+                        break
+                    n_updated += len(chunk)
+                else:
+                    n_updated += len(
+                        self._upload_views(chunk, n_workers, existing_only)
+                    )
+        finally:
+            if not output and n_updated:
+                # write cache to disk, also for views updated before an error
+                self.cache.save()
+        logging.debug("Total run took %ss", (time.time() - orig))
+        return n_updated
 
+    def _upload_views(self, xml_views, n_workers, existing_only):
         # Filter out the views that did not change
         logging.debug("Filtering %d views for changed views", len(xml_views))
         step = time.time()
@@ -504,7 +693,7 @@ class JenkinsManager(object):
             logging.debug("Filtered for existing views in %ss", (time.time() - step))
 
         if not views:
-            return [], 0
+            return []
 
         # Update the views
         logging.debug("Updating views")
@@ -523,11 +712,8 @@ class JenkinsManager(object):
                 # update in-memory cache
                 v_name, v_md5 = result
                 self.cache.set(v_name, v_md5)
-        # write cache to disk
-        self.cache.save()
         logging.debug("Updated %d views in %ss", len(views), time.time() - step)
-        logging.debug("Total run took %ss", (time.time() - orig))
-        return views, len(views)
+        return views
 
     @concurrent
     def parallel_update_view(self, view):
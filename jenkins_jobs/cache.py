@@ -16,6 +16,7 @@
 # Manage jobs in Jenkins server
 
 import errno
+import glob
 import io
 import logging
 import os
@@ -26,6 +27,8 @@ import fasteners
 import yaml
 
 from jenkins_jobs import errors
+from jenkins_jobs.sharding import Shard
+from jenkins_jobs.stats import stats
 
 logger = logging.getLogger(__name__)
 
@@ -37,16 +40,25 @@ class JobCache(object):
     # removed global module references during teardown.
     _logger = logger
     _os = os
+    _glob = glob
     _tempfile = tempfile
     _yaml = yaml
+    _stats = stats
+    _shard_file_re = re.compile(r"-shard-(\d+)-of-(\d+)\.yml$")
 
-    def __init__(self, jenkins_url, flush=False):
+    def __init__(self, jenkins_url, flush=False, shard=None):
         cache_dir = self.get_cache_dir()
         # One cache per remote Jenkins URL:
         host_vary = re.sub(r"[^A-Za-z0-9\-\~]", "_", jenkins_url)
-        self.cachefilename = os.path.join(
-            cache_dir, "cache-host-jobs-" + host_vary + ".yml"
-        )
+        self._prefix = os.path.join(cache_dir, "cache-host-jobs-" + host_vary)
+        self._shard = shard
+        if shard is None:
+            self.cachefilename = self._prefix + ".yml"
+        else:
+            # Shards may run in parallel, so each one has its own cache file.
+            self.cachefilename = "{0}-shard-{1}-of-{2}.yml".format(
+                self._prefix, shard.index, shard.count
+            )
 
         # generate named lockfile if none exists, and lock it
         self._locked = self._lock()
@@ -55,13 +67,76 @@ class JobCache(object):
                 "Unable to lock cache for '%s'" % jenkins_url
             )
 
-        if flush or not os.path.isfile(self.cachefilename):
-            self.data = {}
-        else:
-            with io.open(self.cachefilename, "r", encoding="utf-8") as yfile:
-                self.data = yaml.safe_load(yfile)
+        self.data = {}
+        if not flush:
+            self._read_merged()
         logger.debug("Using cache: '{0}'".format(self.cachefilename))
 
+    def _shard_files(self):
+        """Return list of (path, shard) of existing shard cache files"""
+        shard_files = []
+        for path in self._glob.glob(self._glob.escape(self._prefix) + "-shard-*.yml"):
+            match = self._shard_file_re.search(path)
+            if match:
+                shard = Shard(int(match.group(1)), int(match.group(2)))
+                shard_files.append((path, shard))
+        return shard_files
+
+    def _read_merged(self):
+        """Read main cache file and ones of shards, merged.
+
+        Each file is authoritative for jobs and views of its shard, or for
+        all of them for the main file, and files written later take
+        precedence. For a shard, only its jobs and views are kept.
+        """
+        file_list = [(self._prefix + ".yml", None), *self._shard_files()]
+        file_list = [(path, shard) for path, shard in file_list if os.path.isfile(path)]
+        file_list.sort(key=lambda item: os.path.getmtime(item[0]))
+        for path, shard in file_list:
+            with self._stats.timer("cache read"):
+                with io.open(path, "r", encoding="utf-8") as yfile:
+                    data = yaml.safe_load(yfile) or {}
+            if shard is None:
+                self.data = data
+                continue
+            # Jobs missing from the shard file were deleted or flushed.
+            self.data = {
+                name: md5 for name, md5 in self.data.items() if name not in shard
+            }
+            self.data.update((name, md5) for name, md5 in data.items() if name in shard)
+        if self._shard is not None:
+            self.data = {
+                name: md5 for name, md5 in self.data.items() if name in self._shard
+            }
+
+    def _remove_superseded(self):
+        """Remove shard cache files not needed after this one is written"""
+        shard_files = self._shard_files()
+        if self._shard is None:
+            # Main cache has data of all shards, or is cleared or flushed.
+            superseded = [path for path, shard in shard_files]
+        else:
+            # Files of other shard count are superseded, once all shards of
+            # this count have written theirs.
+            current = [
+                self._os.path.getmtime(path)
+                for path, shard in shard_files
+                if shard.count == self._shard.count
+            ]
+            if len(current) < self._shard.count:
+                return
+            superseded = [
+                path
+                for path, shard in shard_files
+                if shard.count != self._shard.count
+                and self._os.path.getmtime(path) < min(current)
+            ]
+        for path in superseded:
+            try:
+                self._os.remove(path)
+            except FileNotFoundError:
+                pass
+
     def _lock(self):
         self._fastener = fasteners.InterProcessLock("%s.lock" % self.cachefilename)
 
@@ -116,7 +191,8 @@ class JobCache(object):
         tfile = self._tempfile.NamedTemporaryFile(
             dir=self.get_cache_dir(), delete=False
         )
-        tfile.write(self._yaml.dump(self.data).encode("utf-8"))
+        with self._stats.timer("cache write"):
+            tfile.write(self._yaml.dump(self.data).encode("utf-8"))
         # force contents to be synced on disk before overwriting cachefile
         tfile.flush()
         self._os.fsync(tfile.fileno())
@@ -129,6 +205,8 @@ class JobCache(object):
             self._os.remove(self.cachefilename)
             self._os.rename(tfile.name, self.cachefilename)
 
+        self._remove_superseded()
+
         self._logger.debug("Cache written out to '%s'" % self.cachefilename)
 
     def __del__(self):
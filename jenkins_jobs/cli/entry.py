@@ -17,6 +17,7 @@ import io
 import os
 import logging
 import platform
+import sys
 from pathlib import Path
 
 from stevedore import extension
@@ -25,6 +26,8 @@ import yaml
 from jenkins_jobs.errors import JenkinsJobsException
 from jenkins_jobs.cli.parser import create_parser
 from jenkins_jobs.config import JJBConfig
+from jenkins_jobs.profiler import memory_profiler, profiler
+from jenkins_jobs.stats import stats
 from jenkins_jobs import utils
 from jenkins_jobs import version
 
@@ -89,7 +92,10 @@ class JenkinsJobs(object):
         self._set_config(self.jjb_config.builder, "ignore_cache")
         self._set_config(self.jjb_config.builder, "flush_cache")
         self._set_config(self.jjb_config.builder, "update")
+        self._set_config(self.jjb_config.builder, "shard")
         self._set_config(self.jjb_config.yamlparser, "allow_empty_variables")
+        self._set_config(self.jjb_config.yamlparser, "fast_load")
+        self._set_config(self.jjb_config.yamlparser, "load_workers")
         self._set_config(self.jjb_config.jenkins, "section")
         self._set_config(self.jjb_config.jenkins, "user")
         self._set_config(self.jjb_config.jenkins, "password")
@@ -155,15 +161,43 @@ class JenkinsJobs(object):
         )
 
         ext = extension_manager[self.options.command]
-        ext.obj.execute(self.options, self.jjb_config)
+        if not (
+            self.options.stats
+            or self.options.stats_json
+            or self.options.profile
+            or self.options.memory_profile
+        ):
+            ext.obj.execute(self.options, self.jjb_config)
+            return
+        stats.reset()
+        stats.enabled = True
+        # Profiled phases are stats timers.
+        profiler.reset()
+        profiler.enabled = bool(self.options.profile)
+        if self.options.memory_profile:
+            memory_profiler.start()
+        try:
+            with stats.timer("total"):
+                ext.obj.execute(self.options, self.jjb_config)
+        finally:
+            stats.enabled = False
+            profiler.enabled = False
+            if self.options.memory_profile:
+                memory_profiler.stop()
+            if self.options.stats:
+                print(stats.format_table(), file=sys.stderr)
+            if self.options.stats_json:
+                stats.write_json(self.options.stats_json)
+            if self.options.profile:
+                profiler.write(self.options.profile)
+            if self.options.memory_profile:
+                memory_profiler.write(self.options.memory_profile)
 
 
 def main():
 
     # utf-8 workaround for avoiding unicode errors in stdout/stderr
     # see https://stackoverflow.com/a/2001767/99834
-    import sys
-
     if sys.version_info[0] == 2:
         import codecs
 
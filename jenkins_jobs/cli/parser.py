@@ -74,6 +74,23 @@ def create_parser():
         help="Don't fail if any of the variables inside any string are "
         "not defined, replace with empty string instead.",
     )
+    parser.add_argument(
+        "--fast-load",
+        action="store_true",
+        dest="fast_load",
+        default=None,
+        help="Load YAML files without tracking source positions, using libyaml"
+        " if it is available. On error, files are loaded again in normal mode"
+        " to report error location.",
+    )
+    parser.add_argument(
+        "--load-workers",
+        type=int,
+        dest="load_workers",
+        default=None,
+        help="number of processes to parse YAML files with, 0 for"
+        " autodetection and 1 for parsing in main process only.",
+    )
     parser.add_argument(
         "--server",
         "-s",
@@ -97,6 +114,36 @@ def create_parser():
         " This overrides the password specified in the configuration file."
         " [JJB_PASSWORD]",
     )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        dest="stats",
+        default=False,
+        help="print time spent in processing phases and counters to stderr",
+    )
+    parser.add_argument(
+        "--stats-json",
+        dest="stats_json",
+        metavar="FILE",
+        default=None,
+        help="write time spent in processing phases and counters to JSON file",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        metavar="DIR",
+        default=None,
+        help="write cProfile data of processing phases and cost of job"
+        " templates, macros and components to directory",
+    )
+    parser.add_argument(
+        "--memory-profile",
+        dest="memory_profile",
+        metavar="FILE",
+        default=None,
+        help="trace memory allocations and write memory use, top allocation"
+        " sites and object counts after each processing phase to file",
+    )
 
     subparser = parser.add_subparsers(
         dest="command", help="update, test, list or delete job"
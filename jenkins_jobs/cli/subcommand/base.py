@@ -18,12 +18,19 @@ import fnmatch
 import logging
 import time
 
+import yaml
+
 from jenkins_jobs.builder import JenkinsManager
+from jenkins_jobs.errors import JenkinsJobsException
+from jenkins_jobs.profiler import memory_profiler
 from jenkins_jobs.registry import ModuleRegistry
 from jenkins_jobs.roots import Roots
+from jenkins_jobs.sources import RecordingXmlStream, SourceIndex, git_changed_files
+from jenkins_jobs.stats import stats
 from jenkins_jobs.xml_config import XmlJobGenerator
+from jenkins_jobs.xml_config import XmlStream
 from jenkins_jobs.xml_config import XmlViewGenerator
-from jenkins_jobs.loader import load_files
+from jenkins_jobs.loader import is_stdin, load_files
 
 
 logger = logging.getLogger(__name__)
@@ -40,10 +47,24 @@ def matches(name, glob_list):
     return any(fnmatch.fnmatch(name, glob) for glob in glob_list)
 
 
-def filter_matching(item_list, glob_list):
-    if not glob_list:
-        return item_list
-    return [item for item in item_list if matches(item.name, glob_list)]
+def filter_matching(item_list, glob_list, shard=None):
+    if glob_list:
+        item_list = [item for item in item_list if matches(item.name, glob_list)]
+    if shard is not None:
+        item_list = [item for item in item_list if item.name in shard]
+    return item_list
+
+
+def generate_matching(generate, glob_list, shard=None):
+    """Generate jobs or views matching glob list and in shard, if given.
+
+    When filtering, only names are expanded first, and the rest of data is
+    expanded for matching jobs or views only.
+    """
+    if not glob_list and shard is None:
+        return generate()
+    item_list = filter_matching(generate(names_only=True), glob_list, shard)
+    return [item.expanded() for item in item_list]
 
 
 class BaseSubCommand(metaclass=abc.ABCMeta):
@@ -102,34 +123,137 @@ class BaseSubCommand(metaclass=abc.ABCMeta):
 class JobsSubCommand(BaseSubCommand):
     """Base class for Jenkins Job Builder subcommands which generates jobs."""
 
-    def load_roots(self, jjb_config, path_list):
+    def load_roots(self, jjb_config, path_list, fast_load=False):
         roots = Roots(jjb_config)
-        load_files(jjb_config, roots, path_list)
+        with stats.timer("load"):
+            load_files(jjb_config, roots, path_list, fast_load)
+        memory_profiler.snapshot("load")
         return roots
 
+    def with_fast_load(self, jjb_config, path_list, func):
+        """Call ``func(fast_load)``, in fast load mode first if it is enabled.
+
+        Fast load mode does not track source positions. So, if an error
+        occurs in it, files are loaded and processed again in normal mode,
+        to report the error with it's location.
+        """
+        fast_load = jjb_config.yamlparser["fast_load"]
+        if fast_load and jjb_config.yamlparser["retain_anchors"]:
+            logger.warning("Fast load does not support retain_anchors; disabling it")
+            fast_load = False
+        if fast_load and any(is_stdin(path) for path in path_list):
+            # Standard input can not be read second time.
+            fast_load = False
+        if not fast_load:
+            return func(fast_load=False)
+        try:
+            return func(fast_load=True)
+        except (JenkinsJobsException, yaml.YAMLError) as x:
+            logger.info("Fast load failed (%s); loading again to locate error", x)
+            return func(fast_load=False)
+
     def make_jobs_and_views_xml(self, jjb_config, path_list, glob_list):
         logger.info("Updating jobs in {0} ({1})".format(path_list, glob_list))
         orig = time.time()
 
-        roots = self.load_roots(jjb_config, path_list)
-
         builder = JenkinsManager(jjb_config)
+        shard = jjb_config.builder.get("shard")
 
-        registry = ModuleRegistry(jjb_config, builder.plugins_list)
-        registry.set_macros(roots.macros)
+        def generate(fast_load):
+            roots = self.load_roots(jjb_config, path_list, fast_load)
+
+            registry = ModuleRegistry(jjb_config, builder.plugins_list)
+            registry.set_macros(roots.macros)
 
-        jobs = filter_matching(roots.generate_jobs(), glob_list)
-        views = filter_matching(roots.generate_views(), glob_list)
+            with stats.timer("expand"):
+                jobs = generate_matching(roots.generate_jobs, glob_list, shard)
+                views = generate_matching(roots.generate_views, glob_list, shard)
+            memory_profiler.snapshot("generate_jobs")
 
-        registry.amend_job_dicts(jobs)
+            registry.amend_job_dicts(jobs)
+            memory_profiler.snapshot("amend")
 
-        xml_job_generator = XmlJobGenerator(registry)
-        xml_view_generator = XmlViewGenerator(registry)
+            xml_job_generator = XmlJobGenerator(registry)
+            xml_view_generator = XmlViewGenerator(registry)
 
-        xml_jobs = xml_job_generator.generateXML(jobs)
-        xml_views = xml_view_generator.generateXML(views)
+            xml_jobs = xml_job_generator.generateXML(jobs)
+            xml_views = xml_view_generator.generateXML(views)
+            memory_profiler.snapshot("generate_xml")
+            return xml_jobs, xml_views
+
+        xml_jobs, xml_views = self.with_fast_load(jjb_config, path_list, generate)
 
         step = time.time()
-        logging.debug("%d XML files generated in %ss", len(jobs), str(step - orig))
+        logging.debug("%d XML files generated in %ss", len(xml_jobs), str(step - orig))
+
+        return builder, xml_jobs, xml_views
+
+    def make_source_index(self, options, jjb_config):
+        """Return SourceIndex if only jobs and views affected by changed
+        files are requested with --changed-since or --changed-files, or None.
+        """
+        if options.changed_since is not None:
+            path_list = [path for path in options.path if not is_stdin(path)]
+            changed_files = git_changed_files(options.changed_since, path_list)
+        elif options.changed_files is not None:
+            changed_files = options.changed_files
+        else:
+            return None
+        return SourceIndex(jjb_config, changed_files)
+
+    def make_jobs_and_views_stream(
+        self, jjb_config, path_list, glob_list, source_index=None
+    ):
+        """Streaming counterpart of make_jobs_and_views_xml.
+
+        Returns builder and XmlStream of jobs and of views. Only names are
+        expanded here; the rest of job or view data is expanded, and XML is
+        generated, while the stream is iterated over.
 
+        With source_index, streams have only jobs and views affected by
+        changed files, see SourceIndex.
+        """
+        logger.info("Updating jobs in {0} ({1})".format(path_list, glob_list))
+
+        builder = JenkinsManager(jjb_config)
+
+        # Errors are found while streaming, after files are loaded,
+        # so do not use fast load: source positions are needed to report them.
+        roots = self.load_roots(jjb_config, path_list)
+
+        registry = ModuleRegistry(jjb_config, builder.plugins_list)
+        registry.set_macros(roots.macros)
+
+        shard = jjb_config.builder.get("shard")
+        with stats.timer("expand names"):
+            jobs = filter_matching(
+                roots.generate_jobs(names_only=True), glob_list, shard
+            )
+            views = filter_matching(
+                roots.generate_views(names_only=True), glob_list, shard
+            )
+        memory_profiler.snapshot("generate_jobs")
+
+        if source_index is None:
+            xml_jobs = XmlStream(
+                XmlJobGenerator(registry), jobs, registry.amend_job_dicts
+            )
+            xml_views = XmlStream(XmlViewGenerator(registry), views)
+            return builder, xml_jobs, xml_views
+
+        source_index.set_roots(roots)
+        # Index entries of other jobs and views are kept if names or shard
+        # are given.
+        prune = not glob_list and shard is None
+        xml_jobs = RecordingXmlStream(
+            XmlJobGenerator(registry),
+            jobs,
+            source_index,
+            "jobs",
+            prune,
+            registry.amend_job_dicts,
+        )
+        xml_views = RecordingXmlStream(
+            XmlViewGenerator(registry), views, source_index, "views", prune
+        )
         return builder, xml_jobs, xml_views
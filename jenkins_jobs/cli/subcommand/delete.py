@@ -58,9 +58,16 @@ class DeleteSubCommand(base.JobsSubCommand):
             )
 
         if options.path:
-            roots = self.load_roots(jjb_config, options.path)
-            jobs = base.filter_matching(roots.generate_jobs(), options.name)
-            views = base.filter_matching(roots.generate_views(), options.name)
+
+            def generate(fast_load):
+                roots = self.load_roots(jjb_config, options.path, fast_load)
+                jobs = roots.generate_jobs(names_only=True)
+                views = roots.generate_views(names_only=True)
+                jobs = base.filter_matching(jobs, options.name)
+                views = base.filter_matching(views, options.name)
+                return jobs, views
+
+            jobs, views = self.with_fast_load(jjb_config, options.path, generate)
             job_names = [j.name for j in jobs]
             view_names = [v.name for v in views]
         else:
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import errno
+import json
+import logging
+import sys
+
+from jenkins_jobs.alphanum import AlphanumSort
+import jenkins_jobs.cli.subcommand.base as base
+from jenkins_jobs.registry import ModuleRegistry
+import jenkins_jobs.utils as utils
+
+
+logger = logging.getLogger(__name__)
+
+
+def pos_dict(pos):
+    if pos is None:
+        return None
+    # Lines and columns are counted from 1, as in error messages.
+    return {"path": str(pos.path), "line": pos.line + 1, "column": pos.column + 1}
+
+
+def ndjson_line(kind, item, positions):
+    record = {"type": kind, "name": item.name, "data": item.data}
+    if positions:
+        record["pos"] = pos_dict(getattr(item.data, "pos", None))
+        record["context"] = [
+            {"message": context.message, "pos": pos_dict(context.pos)}
+            for context in item.context
+        ]
+    return json.dumps(record, default=str) + "\n"
+
+
+class DumpSubCommand(base.JobsSubCommand):
+    def parse_args(self, subparser):
+        dump = subparser.add_parser(
+            "dump", help="Dump expanded job and view definitions"
+        )
+
+        self.parse_option_recursive_exclude(dump)
+
+        dump.add_argument(
+            "path",
+            nargs="?",
+            default=sys.stdin,
+            help="colon-separated list of paths to YAML files or directories",
+        )
+        dump.add_argument("names", help="name(s) of job(s)", nargs="*")
+        dump.add_argument(
+            "--format",
+            dest="format",
+            choices=["ndjson"],
+            default="ndjson",
+            help="output format: one JSON object per line (default)",
+        )
+        dump.add_argument(
+            "--positions",
+            action="store_true",
+            dest="positions",
+            default=False,
+            help="add source positions of job and view definitions",
+        )
+
+    def execute(self, options, jjb_config):
+        # Data is expanded while dumping, so errors are found after files
+        # are loaded; do not use fast load to report their locations.
+        roots = self.load_roots(jjb_config, options.path)
+        registry = ModuleRegistry(jjb_config)
+        registry.set_macros(roots.macros)
+
+        # Only names are kept for all jobs and views; the rest of data is
+        # expanded, written and released one by one.
+        jobs = base.filter_matching(roots.generate_jobs(names_only=True), options.names)
+        views = base.filter_matching(
+            roots.generate_views(names_only=True), options.names
+        )
+
+        stdout = utils.wrap_stream(sys.stdout)
+        n_dumped = 0
+        try:
+            for kind, item_list in [("job", jobs), ("view", views)]:
+                for item in sorted(item_list, key=AlphanumSort):
+                    item = item.expanded()
+                    if kind == "job":
+                        registry.amend_job_dict(item.data)
+                    line = ndjson_line(kind, item, options.positions)
+                    stdout.write(line.encode("utf-8"))
+                    n_dumped += 1
+        except IOError as exc:
+            if exc.errno != errno.EPIPE:
+                raise
+            # Reader, like `head`, does not need the rest of output.
+            return
+        logger.info("Number of jobs and views dumped: %d", n_dumped)
@@ -47,8 +47,13 @@ class ListSubCommand(base.JobsSubCommand):
 
     def get_jobs(self, jjb_config, path_list, glob_list):
         if path_list:
-            roots = self.load_roots(jjb_config, path_list)
-            jobs = base.filter_matching(roots.generate_jobs(), glob_list)
+
+            def generate(fast_load):
+                roots = self.load_roots(jjb_config, path_list, fast_load)
+                jobs = roots.generate_jobs(names_only=True)
+                return base.filter_matching(jobs, glob_list)
+
+            jobs = self.with_fast_load(jjb_config, path_list, generate)
             job_names = [j.name for j in jobs]
         else:
             jenkins = JenkinsManager(jjb_config)
@@ -17,6 +17,9 @@ import logging
 import sys
 
 import jenkins_jobs.cli.subcommand.update as update
+from jenkins_jobs.archive import OutputArchive
+from jenkins_jobs.errors import JenkinsJobsException
+from jenkins_jobs.profiler import memory_profiler
 
 
 logger = logging.getLogger(__name__)
@@ -30,6 +33,9 @@ class TestSubCommand(update.UpdateSubCommand):
 
         self.parse_arg_path(test)
         self.parse_arg_names(test)
+        self.parse_option_streaming(test)
+        self.parse_option_changed(test)
+        self.parse_option_shard(test)
 
         test.add_argument(
             "--config-xml",
@@ -45,11 +51,59 @@ class TestSubCommand(update.UpdateSubCommand):
             default=None,
             help="path to plugin info YAML file",
         )
-        test.add_argument(
+        output = test.add_mutually_exclusive_group()
+        output.add_argument(
             "-o", dest="output_dir", default=sys.stdout, help="path to output XML"
         )
+        output.add_argument(
+            "--output-archive",
+            dest="output_archive",
+            default=None,
+            help="path to tar or zip archive to write output XML files into;"
+            " format is selected by suffix: .zip, .tar, .tar.gz, .tar.bz2,"
+            " .tar.xz or .tar.zst",
+        )
+        test.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            dest="n_workers",
+            help="number of workers to write output files with, 0 for "
+            "autodetection and 1 for just one worker.",
+        )
+        test.add_argument(
+            "--delete-old",
+            action="store_true",
+            dest="delete_old",
+            default=False,
+            help="delete output files of jobs and views which were not "
+            "generated by this run",
+        )
 
     def execute(self, options, jjb_config):
+        if options.n_workers < 0:
+            raise JenkinsJobsException(
+                "Number of workers must be equal or greater than 0"
+            )
+        if options.delete_old and (
+            options.output_archive or hasattr(options.output_dir, "write")
+        ):
+            raise JenkinsJobsException("--delete-old requires output directory")
+        if options.delete_old and (options.changed_since or options.changed_files):
+            # Output of jobs and views not affected would be deleted.
+            raise JenkinsJobsException(
+                "--delete-old can not be used with --changed-since"
+                " or --changed-files"
+            )
+        if options.delete_old and options.shard:
+            # Output of other shards would be deleted.
+            raise JenkinsJobsException("--delete-old can not be used with --shard")
+        if options.delete_old and options.names:
+            # Output of jobs and views not matching names would be deleted.
+            raise JenkinsJobsException(
+                "--delete-old can not be used with job or view names"
+            )
+
         if not options.config_xml:
             logger.warning(
                 "(Deprecated) The default output behavior of"
@@ -61,19 +115,53 @@ class TestSubCommand(update.UpdateSubCommand):
                 " `--config-xml` parameter."
             )
 
-        builder, xml_jobs, xml_views = self.make_jobs_and_views_xml(
-            jjb_config, options.path, options.names
-        )
+        if options.output_archive:
+            with OutputArchive(options.output_archive) as archive:
+                self.write_output(options, jjb_config, archive)
+            return
 
-        builder.update_jobs(
-            xml_jobs,
-            output=options.output_dir,
-            n_workers=1,
-            config_xml=options.config_xml,
-        )
-        builder.update_views(
-            xml_views,
-            output=options.output_dir,
-            n_workers=1,
-            config_xml=options.config_xml,
-        )
+        builder = self.write_output(options, jjb_config, options.output_dir)
+        if options.delete_old:
+            n = builder.remove_stale_output(options.output_dir, options.config_xml)
+            logger.info("Number of stale output files deleted: %d", n)
+
+    def write_output(self, options, jjb_config, output):
+        source_index = self.make_source_index(options, jjb_config)
+        if options.streaming or source_index:
+            builder, xml_jobs, xml_views = self.make_jobs_and_views_stream(
+                jjb_config, options.path, options.names, source_index
+            )
+            builder.update_jobs_stream(
+                xml_jobs,
+                len(xml_jobs),
+                output=output,
+                n_workers=options.n_workers,
+                config_xml=options.config_xml,
+            )
+            builder.update_views_stream(
+                xml_views,
+                len(xml_views),
+                output=output,
+                n_workers=options.n_workers,
+                config_xml=options.config_xml,
+            )
+        else:
+            builder, xml_jobs, xml_views = self.make_jobs_and_views_xml(
+                jjb_config, options.path, options.names
+            )
+            builder.update_jobs(
+                xml_jobs,
+                output=output,
+                n_workers=options.n_workers,
+                config_xml=options.config_xml,
+            )
+            builder.update_views(
+                xml_views,
+                output=output,
+                n_workers=options.n_workers,
+                config_xml=options.config_xml,
+            )
+        memory_profiler.snapshot("serialize")
+        if source_index:
+            source_index.save()
+        return builder
@@ -13,16 +13,24 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import argparse
 import logging
 import sys
 
 from jenkins_jobs.errors import JenkinsJobsException
+from jenkins_jobs.profiler import memory_profiler
+from jenkins_jobs.sharding import Shard
 import jenkins_jobs.cli.subcommand.base as base
 
 
 logger = logging.getLogger(__name__)
 
 
+def is_disabled(xml_job):
+    el = xml_job.xml.find("./disabled")
+    return el is not None and el.text == "true"
+
+
 class UpdateSubCommand(base.JobsSubCommand):
     def parse_arg_path(self, parser):
         parser.add_argument(
@@ -35,6 +43,51 @@ class UpdateSubCommand(base.JobsSubCommand):
     def parse_arg_names(self, parser):
         parser.add_argument("names", help="name(s) of job(s)", nargs="*")
 
+    def parse_option_streaming(self, parser):
+        parser.add_argument(
+            "--streaming",
+            action="store_true",
+            default=False,
+            help="generate and process jobs and views one by one,"
+            " without keeping all of them in memory",
+        )
+
+    def parse_option_changed(self, parser):
+        changed = parser.add_mutually_exclusive_group()
+        changed.add_argument(
+            "--changed-since",
+            dest="changed_since",
+            metavar="REF",
+            default=None,
+            help="generate only jobs and views affected by files changed since"
+            " git ref REF, including uncommitted changes; implies --streaming",
+        )
+        changed.add_argument(
+            "--changed-files",
+            dest="changed_files",
+            metavar="FILE",
+            action="append",
+            default=None,
+            help="generate only jobs and views affected by changes in FILE;"
+            " may be given several times; implies --streaming",
+        )
+
+    def parse_option_shard(self, parser):
+        def shard(value):
+            try:
+                return Shard.from_string(value)
+            except ValueError as x:
+                raise argparse.ArgumentTypeError(str(x))
+
+        parser.add_argument(
+            "--shard",
+            type=shard,
+            metavar="I/N",
+            default=None,
+            help="process only part I of N (starting from 1) of jobs and views,"
+            " split by hash of their name or top-level folder",
+        )
+
     def parse_args(self, subparser):
         update = subparser.add_parser("update")
 
@@ -42,6 +95,9 @@ class UpdateSubCommand(base.JobsSubCommand):
 
         self.parse_arg_path(update)
         self.parse_arg_names(update)
+        self.parse_option_streaming(update)
+        self.parse_option_changed(update)
+        self.parse_option_shard(update)
 
         update.add_argument(
             "--delete-old",
@@ -107,6 +163,11 @@ class UpdateSubCommand(base.JobsSubCommand):
                 "Number of workers must be equal or greater than 0"
             )
 
+        source_index = self.make_source_index(options, jjb_config)
+        if options.streaming or source_index:
+            self.execute_streaming(options, jjb_config, source_index)
+            return
+
         builder, xml_jobs, xml_views = self.make_jobs_and_views_xml(
             jjb_config, options.path, options.names
         )
@@ -115,10 +176,8 @@ class UpdateSubCommand(base.JobsSubCommand):
             # filter out jobs which are disabled
             xml_jobs_filtered = []
             for xml_job in xml_jobs:
-                el = xml_job.xml.find("./disabled")
-                if el is not None:
-                    if el.text == "true":
-                        continue
+                if is_disabled(xml_job):
+                    continue
                 xml_jobs_filtered.append(xml_job)
 
             logging.info(
@@ -143,6 +202,7 @@ class UpdateSubCommand(base.JobsSubCommand):
                 existing_only=options.existing_only,
             )
             logger.info("Number of views updated: %d", num_updated_views)
+        memory_profiler.snapshot("serialize")
 
         if options.delete_old:
             if options.update in {"jobs", "all"}:
@@ -153,3 +213,49 @@ class UpdateSubCommand(base.JobsSubCommand):
                 keep_views = [view.name for view in xml_views]
                 n = builder.delete_old_managed_views(keep=keep_views)
                 logger.info("Number of views deleted: %d", n)
+
+    def execute_streaming(self, options, jjb_config, source_index=None):
+        builder, xml_jobs, xml_views = self.make_jobs_and_views_stream(
+            jjb_config, options.path, options.names, source_index
+        )
+        # Jobs not affected by changed files are kept as they are.
+        keep_jobs = list(xml_jobs.skipped_names)
+
+        def enum_jobs():
+            n_disabled = 0
+            for xml_job in xml_jobs:
+                if options.enabled_only and is_disabled(xml_job):
+                    n_disabled += 1
+                    continue
+                keep_jobs.append(xml_job.name)
+                yield xml_job
+            if options.enabled_only:
+                logging.info("Skipped {} disabled jobs".format(n_disabled))
+
+        if options.update in {"jobs", "all"}:
+            num_updated_jobs = builder.update_jobs_stream(
+                enum_jobs(),
+                len(xml_jobs),
+                n_workers=options.n_workers,
+                existing_only=options.existing_only,
+            )
+            logger.info("Number of jobs updated: %d", num_updated_jobs)
+        if options.update in {"views", "all"}:
+            num_updated_views = builder.update_views_stream(
+                xml_views,
+                len(xml_views),
+                n_workers=options.n_workers,
+                existing_only=options.existing_only,
+            )
+            logger.info("Number of views updated: %d", num_updated_views)
+        memory_profiler.snapshot("serialize")
+
+        if options.delete_old:
+            if options.update in {"jobs", "all"}:
+                n = builder.delete_old_managed_jobs(keep=keep_jobs)
+                logger.info("Number of jobs deleted: %d", n)
+            if options.update in {"views", "all"}:
+                n = builder.delete_old_managed_views(keep=xml_views.names)
+                logger.info("Number of views deleted: %d", n)
+        if source_index:
+            source_index.save()
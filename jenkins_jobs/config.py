@@ -322,6 +322,38 @@ class JJBConfig(object):
             retain_anchors = config.getboolean("job_builder", "retain_anchors")
         self.yamlparser["retain_anchors"] = retain_anchors
 
+        # skip source positions tracking when loading yaml?
+        fast_load = False
+        if config and config.has_option("job_builder", "fast_load"):
+            fast_load = config.getboolean("job_builder", "fast_load")
+        self.yamlparser["fast_load"] = fast_load
+
+        # number of processes to parse yaml files with
+        load_workers = 1
+        if config and config.has_option("job_builder", "load_workers"):
+            load_workers = config.getint("job_builder", "load_workers")
+        self.yamlparser["load_workers"] = load_workers
+
+        # directory to keep compiled jinja2 templates in
+        jinja2_cache_dir = None
+        if config and config.has_option("job_builder", "jinja2_cache_dir"):
+            jinja2_cache_dir = os.path.expanduser(
+                config.get("job_builder", "jinja2_cache_dir")
+            )
+        self.yamlparser["jinja2_cache_dir"] = jinja2_cache_dir
+
+        # reuse XML generated by pure components for the same data?
+        component_cache = False
+        if config and config.has_option("job_builder", "component_cache"):
+            component_cache = config.getboolean("job_builder", "component_cache")
+        self.builder["component_cache"] = component_cache
+
+        # reuse XML generated by macros for the same parameters?
+        macro_memo = False
+        if config and config.has_option("job_builder", "macro_memo"):
+            macro_memo = config.getboolean("job_builder", "macro_memo")
+        self.builder["macro_memo"] = macro_memo
+
         update = None
         if (
             config
@@ -345,6 +377,11 @@ class JJBConfig(object):
                 "Password provided, please check your configuration."
             )
 
+        if self.yamlparser["load_workers"] < 0:
+            raise JenkinsJobsException(
+                "Number of load workers must be equal or greater than 0"
+            )
+
         if self.builder["plugins_info"] is not None and not isinstance(
             self.builder["plugins_info"], list
         ):
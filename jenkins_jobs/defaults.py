@@ -168,6 +168,19 @@ def split_contents_params(data, contents_keys):
     return (contents, params)
 
 
+class DefaultsDict(dict):
+    """Defaults by name, also keeping ones already merged with global"""
+
+    def __init__(self):
+        super().__init__()
+        self.merged = {}  # name -> Defaults merged with global.
+
+    def __setitem__(self, name, defaults):
+        super().__setitem__(name, defaults)
+        # Global defaults may be changed, drop all merged ones.
+        self.merged.clear()
+
+
 @dataclass
 class Defaults:
     name: str
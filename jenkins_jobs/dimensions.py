@@ -48,7 +48,7 @@ def _decode_axis_value(axis, value, key_pos, value_pos):
 
 
 def enum_dimensions_params(axes, params, defaults):
-    expander = YamlObjectsExpander()
+    expander = YamlObjectsExpander.shared()
     if not axes:
         # No axes - instantiate one job/view.
         yield {}
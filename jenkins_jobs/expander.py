@@ -10,7 +10,6 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from functools import partial
 from itertools import filterfalse
 from jinja2 import StrictUndefined
 
@@ -54,35 +53,29 @@ def expand_tuple(expander, obj, params, key_pos, value_pos):
     return tuple(expander.expand(item, params, None) for item in obj)
 
 
-class StrExpander:
-    def __init__(self, allow_empty_variables):
-        self._formatter = CustomFormatter(allow_empty_variables)
-
-    def __call__(self, obj, params, key_pos, value_pos):
-        try:
-            return self._formatter.format(str(obj), **params)
-        except JenkinsJobsException as x:
-            lines = str(obj).splitlines()
-            start_ofs = value_pos.body.index(lines[0])
-            pre_pad = value_pos.body[:start_ofs]
-            # Shift position to reflect template position inside yaml file:
-            if "\n" in pre_pad:
-                pos = value_pos.with_offset(line_ofs=1)
-            else:
-                pos = value_pos.with_offset(column_ofs=start_ofs)
-            pos = pos.with_contents_start()
-            raise x.with_pos(pos)
+def expand_str(expander, obj, params, key_pos, value_pos):
+    try:
+        return expander.formatter.format(str(obj), **params)
+    except JenkinsJobsException as x:
+        if value_pos is None:
+            raise
+        lines = str(obj).splitlines()
+        start_ofs = value_pos.body.index(lines[0])
+        pre_pad = value_pos.body[:start_ofs]
+        # Shift position to reflect template position inside yaml file:
+        if "\n" in pre_pad:
+            pos = value_pos.with_offset(line_ofs=1)
+        else:
+            pos = value_pos.with_offset(column_ofs=start_ofs)
+        pos = pos.with_contents_start()
+        raise x.with_pos(pos)
 
 
 def call_expand(expander, obj, params, key_pos, value_pos):
     return obj.expand(expander, params)
 
 
-def dont_expand(obj, params, key_pos, value_pos):
-    return obj
-
-
-def dont_expand_yaml_object(expander, obj, params, key_pos, value_pos):
+def dont_expand(expander, obj, params, key_pos, value_pos):
     return obj
 
 
@@ -104,64 +97,74 @@ deprecated_yaml_tags = [
     ("!include-raw-escape:", IncludeRawVerbatim),
 ]
 
+# Expanders are stateless, so ones with the same options are shared.
+_shared_expanders = {}  # (class, allow_empty_variables) -> expander.
+
 
 # Expand strings and yaml objects.
 class Expander:
-    def __init__(self, config=None):
+    # Type -> function(expander, obj, params, key_pos, value_pos).
+    expanders = {
+        dict: expand_dict,
+        LocDict: expand_dict,
+        list: expand_list,
+        LocList: expand_list,
+        tuple: expand_tuple,
+        str: expand_str,
+        LocString: expand_str,
+        bool: dont_expand,
+        int: dont_expand,
+        float: dont_expand,
+        type(None): dont_expand,
+        **{cls: call_expand for cls in yaml_classes_list},
+    }
+
+    @classmethod
+    def shared(cls, config=None):
+        """Return expander shared with others using the same options"""
+        key = (cls, cls._allow_empty_variables(config))
+        try:
+            return _shared_expanders[key]
+        except KeyError:
+            expander = _shared_expanders[key] = cls(config)
+            return expander
+
+    @staticmethod
+    def _allow_empty_variables(config):
         if config:
-            allow_empty_variables = config.yamlparser["allow_empty_variables"]
+            return bool(config.yamlparser["allow_empty_variables"])
         else:
-            allow_empty_variables = False
-        _yaml_object_expanders = {
-            cls: partial(call_expand, self) for cls in yaml_classes_list
-        }
-        self.expanders = {
-            dict: partial(expand_dict, self),
-            LocDict: partial(expand_dict, self),
-            list: partial(expand_list, self),
-            LocList: partial(expand_list, self),
-            tuple: partial(expand_tuple, self),
-            str: StrExpander(allow_empty_variables),
-            LocString: StrExpander(allow_empty_variables),
-            bool: dont_expand,
-            int: dont_expand,
-            float: dont_expand,
-            type(None): dont_expand,
-            **_yaml_object_expanders,
-        }
+            return False
+
+    def __init__(self, config=None):
+        self.formatter = CustomFormatter(self._allow_empty_variables(config))
 
     def expand(self, obj, params, key_pos=None, value_pos=None):
-        t = type(obj)
         try:
-            expander = self.expanders[t]
+            expander = self.expanders[type(obj)]
         except KeyError:
             raise JenkinsJobsException(
-                f"Do not know how to expand type: {t!r}", pos=value_pos
+                f"Do not know how to expand type: {type(obj)!r}", pos=value_pos
             )
-        return expander(obj, params, key_pos, value_pos)
+        return expander(self, obj, params, key_pos, value_pos)
 
 
 # Expand only yaml objects.
 class YamlObjectsExpander(Expander):
-    def __init__(self, config=None):
-        super().__init__(config)
-        self.expanders.update(
-            {
-                str: dont_expand,
-                LocString: dont_expand,
-                IncludeRawVerbatim: dont_expand,
-            }
-        )
+    expanders = {
+        **Expander.expanders,
+        str: dont_expand,
+        LocString: dont_expand,
+        IncludeRawVerbatim: dont_expand,
+    }
 
 
 # Expand only string parameters.
 class StringsOnlyExpander(Expander):
-    def __init__(self, config):
-        super().__init__(config)
-        _yaml_object_expanders = {
-            cls: partial(dont_expand_yaml_object, self) for cls in yaml_classes_list
-        }
-        self.expanders.update(_yaml_object_expanders)
+    expanders = {
+        **Expander.expanders,
+        **{cls: dont_expand for cls in yaml_classes_list},
+    }
 
 
 def call_required_params(obj, pos):
@@ -18,6 +18,7 @@
 import _string
 import logging
 import re
+from functools import lru_cache
 from string import Formatter
 
 from jinja2 import Undefined
@@ -121,10 +122,16 @@ class CustomFormatter(Formatter):
             raise JenkinsJobsException(f"Missing parameter: {key!r}")
 
 
-def enum_str_format_required_params(format, pos):
+@lru_cache(maxsize=65536)
+def _str_format_required_params(format_string):
+    # Same strings are used by many jobs and templates, parse them once.
     formatter = CustomFormatter()
+    return tuple(formatter.enum_required_params(format_string))
+
+
+def enum_str_format_required_params(format, pos):
     try:
-        yield from formatter.enum_required_params(str(format))
+        yield from _str_format_required_params(str(format))
     except JenkinsJobsException as x:
         raise x.with_pos(pos)
 
@@ -22,6 +22,7 @@ from .defaults import split_contents_params, job_contents_keys
 class JobBase(RootBase):
     project_type: str
     folder: str
+    _name_keys = ("name", "folder")
 
     @classmethod
     def from_dict(cls, config, roots, data, pos):
@@ -36,7 +37,7 @@ class JobBase(RootBase):
         contents, params = split_contents_params(d, job_contents_keys)
         return cls(
             _defaults=roots.defaults,
-            _expander=Expander(config),
+            _expander=Expander.shared(config),
             _keep_descriptions=keep_descriptions,
             _id=id,
             name=name,
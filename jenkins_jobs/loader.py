@@ -10,50 +10,59 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import gc
 import io
 import logging
+import pickle
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
 
 from .errors import JenkinsJobsException
-from .loc_loader import LocLoader
-from .yaml_objects import BaseYamlObject
+from .loc_loader import LocLoader, CLocLoader, FastLocLoader
+from .yaml_objects import BaseYamlObject, IncludeFiles, unpickling_loader
 from .expander import YamlObjectsExpander, deprecated_yaml_tags, yaml_classes_list
 from .roots import root_adders
 
 logger = logging.getLogger(__name__)
 
 
-class Loader(LocLoader):
+class LoaderBase:
     @classmethod
     def empty(cls, jjb_config):
         return cls(io.StringIO(), jjb_config)
 
     def __init__(
-        self, stream, jjb_config, source_path=None, source_dir=None, anchors=None
+        self,
+        stream,
+        jjb_config,
+        source_path=None,
+        source_dir=None,
+        anchors=None,
+        include_files=None,
     ):
         super().__init__(stream, source_path)
         self.jjb_config = jjb_config
         self.source_path = source_path
         self.source_dir = source_dir
+        # Shared by loaders for all files loaded during the run.
+        self.include_files = include_files or IncludeFiles()
         self._retain_anchors = jjb_config.yamlparser["retain_anchors"]
         if anchors:
             # Override default set by super class.
             self.anchors = anchors
 
-    # Override the default composer to skip resetting the anchors at the
-    # end of the current document.
-    def compose_document(self):
-        # Drop the DOCUMENT-START event.
-        self.get_event()
-        # Compose the root node.
-        node = self.compose_node(None, None)
-        # Drop the DOCUMENT-END event.
-        self.get_event()
-        return node
-
     def _with_stream(self, stream, source_path, source_dir):
-        return Loader(stream, self.jjb_config, source_path, source_dir, self.anchors)
+        # libyaml parser does not expose anchors.
+        anchors = getattr(self, "anchors", None)
+        return type(self)(
+            stream,
+            self.jjb_config,
+            source_path,
+            source_dir,
+            anchors,
+            self.include_files,
+        )
 
     def load_fp(self, fp):
         return self.load(fp)
@@ -70,6 +79,63 @@ class Loader(LocLoader):
             if self._retain_anchors:
                 self.anchors.update(loader.anchors)
 
+    def dump_path(self, path):
+        """Load file and pickle it's data, to be passed between processes"""
+        text = path.read_text()
+        loader = self._with_stream(text, source_path=path, source_dir=path.parent)
+        try:
+            data = loader.get_single_data()
+            # Included files may refer anchors from including one.
+            anchors = getattr(loader, "anchors", None)
+            return pickle.dumps((data, anchors), protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            loader.dispose()
+
+    def load_dumped(self, path, dump):
+        """Unpickle data from dump_path result"""
+        loader = self._with_stream("", source_path=path, source_dir=path.parent)
+        # Unpickled yaml objects are bound to this loader.
+        token = unpickling_loader.set(loader)
+        gc_was_enabled = gc.isenabled()
+        # Unpickling creates lots of objects, no garbage among them.
+        gc.disable()
+        try:
+            data, anchors = pickle.loads(dump)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+            unpickling_loader.reset(token)
+        if anchors:
+            loader.anchors = anchors
+        return data
+
+    # Override the default composer to skip resetting the anchors at the
+    # end of the current document.
+    def compose_document(self):
+        # Drop the DOCUMENT-START event.
+        self.get_event()
+        # Compose the root node.
+        node = self.compose_node(None, None)
+        # Drop the DOCUMENT-END event.
+        self.get_event()
+        return node
+
+
+# Uses libyaml parser if it is available.
+class Loader(LoaderBase, CLocLoader):
+    pass
+
+
+# Pure python one.
+class PyLoader(LoaderBase, LocLoader):
+    pass
+
+
+# Does not track source positions, for already validated sources.
+# Anchors are not retained across files by it.
+class FastLoader(LoaderBase, FastLocLoader):
+    pass
+
 
 def load_deprecated_yaml(tag, cls, loader, node):
     warnings.warn(
@@ -79,11 +145,11 @@ def load_deprecated_yaml(tag, cls, loader, node):
     return cls.from_yaml(loader, node)
 
 
-for cls in yaml_classes_list:
-    Loader.add_constructor(cls.yaml_tag, cls.from_yaml)
-
-for tag, cls in deprecated_yaml_tags:
-    Loader.add_constructor(tag, partial(load_deprecated_yaml, tag, cls))
+for loader_cls in [Loader, PyLoader, FastLoader]:
+    for cls in yaml_classes_list:
+        loader_cls.add_constructor(cls.yaml_tag, cls.from_yaml)
+    for tag, cls in deprecated_yaml_tags:
+        loader_cls.add_constructor(tag, partial(load_deprecated_yaml, tag, cls))
 
 
 def is_stdin(path):
@@ -117,14 +183,40 @@ def enum_expanded_paths(path_list):
             yield from real(path)
 
 
-def load_files(config, roots, path_list):
+def _dump_path(loader_cls, config, path):
+    return loader_cls.empty(config).dump_path(path)
+
+
+def enum_loaded_data(config, loader, path_list):
+    path_list = list(enum_expanded_paths(path_list))
+    n_workers = config.yamlparser["load_workers"]
+    file_path_list = [path for path in path_list if not is_stdin(path)]
+    # Anchors retained from previous files are required to parse next ones.
+    if n_workers == 1 or len(file_path_list) < 2 or loader._retain_anchors:
+        for path in path_list:
+            if is_stdin(path):
+                yield loader.load_fp(path)
+            else:
+                yield loader.load_path(path)
+        return
+    # Load files in worker processes, but pass data on in original order.
+    dump = partial(_dump_path, type(loader), config)
+    with ProcessPoolExecutor(n_workers or None) as executor:
+        dump_iter = executor.map(dump, file_path_list)
+        for path in path_list:
+            if is_stdin(path):
+                yield loader.load_fp(path)
+            else:
+                yield loader.load_dumped(path, next(dump_iter))
+
+
+def load_files(config, roots, path_list, fast_load=False):
     expander = YamlObjectsExpander(config)
-    loader = Loader.empty(config)
-    for path in enum_expanded_paths(path_list):
-        if is_stdin(path):
-            data = loader.load_fp(path)
-        else:
-            data = loader.load_path(path)
+    if fast_load:
+        loader = FastLoader.empty(config)
+    else:
+        loader = Loader.empty(config)
+    for data in enum_loaded_data(config, loader, path_list):
         if data is None:
             continue
         if not isinstance(data, list):
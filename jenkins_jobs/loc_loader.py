@@ -13,9 +13,17 @@
 from collections import UserString
 
 import yaml
+from yaml.composer import Composer
+from yaml.constructor import Constructor
+from yaml.resolver import Resolver
+
+try:
+    from yaml.cyaml import CParser
+except ImportError:
+    CParser = None
 
 from .errors import JenkinsJobsException
-from .position import Pos
+from .position import Pos, Source
 
 
 class LocDict(dict):
@@ -118,19 +126,26 @@ class LocString(UserString):
         self.pos = pos
 
 
-class LocLoader(yaml.Loader):
-    """Load YAML and store source position information"""
+class LocLoaderBase:
+    """Store source position information into loaded data"""
 
     def __init__(self, stream, file_path, line_ofs=0, column_ofs=0):
+        if hasattr(stream, "read"):
+            name = getattr(stream, "name", "<file>")
+            stream = stream.read()
+        else:
+            name = "<unicode string>"
         super().__init__(stream)
         if file_path:
             # Override one set by yaml Reader. Used to construct marks.
             self.name = file_path
+        # Positions keep reference to it instead of to yaml marks.
+        self._source = Source(file_path or name, stream)
         self._line_ofs = line_ofs
         self._column_ofs = column_ofs
 
     def pos_from_node(self, node):
-        return Pos.from_node(node, self._line_ofs, self._column_ofs)
+        return Pos.from_node(self._source, node, self._line_ofs, self._column_ofs)
 
     def construct_yaml_map(self, node):
         data = LocDict(pos=self.pos_from_node(node))
@@ -157,5 +172,76 @@ class LocLoader(yaml.Loader):
         data.value_pos.extend(self.pos_from_node(item_node) for item_node in node.value)
 
 
-LocLoader.add_constructor("tag:yaml.org,2002:map", LocLoader.construct_yaml_map)
-LocLoader.add_constructor("tag:yaml.org,2002:seq", LocLoader.construct_yaml_seq)
+class LocLoader(LocLoaderBase, yaml.Loader):
+    """Load YAML and store source position information"""
+
+
+if CParser is not None:
+
+    class CEventLoader(Composer, CParser, Constructor, Resolver):
+        """Compose nodes from libyaml event stream.
+
+        Unlike yaml.CLoader, nodes are composed by python composer, so it
+        can be customized the same way as for pure python loader.
+        """
+
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            Composer.__init__(self)
+            Constructor.__init__(self)
+            Resolver.__init__(self)
+
+    class CLocLoader(LocLoaderBase, CEventLoader):
+        """Load YAML using libyaml and store source position information"""
+
+        def get_single_data(self):
+            try:
+                return super().get_single_data()
+            except yaml.MarkedYAMLError as x:
+                # libyaml marks have neither file path nor text.
+                x.context_mark = self._source_mark(x.context_mark)
+                x.problem_mark = self._source_mark(x.problem_mark)
+                raise
+
+        def _source_mark(self, mark):
+            if mark is None:
+                return None
+            return yaml.Mark(
+                str(self._source.path),
+                mark.index,
+                mark.line,
+                mark.column,
+                self._source.text,
+                self._source.offset(mark.line, mark.column),
+            )
+
+else:
+    # Fall back to pure python implementation when libyaml is missing.
+    CLocLoader = LocLoader
+
+
+class FastLocLoader(getattr(yaml, "CLoader", yaml.Loader)):
+    """Load YAML into the same containers as LocLoader, but without source
+    position information. Uses libyaml if it is available"""
+
+    def __init__(self, stream, file_path):
+        super().__init__(stream)
+
+    def pos_from_node(self, node):
+        return None
+
+    def construct_yaml_map(self, node):
+        data = LocDict()
+        yield data
+        data.update(self.construct_mapping(node))
+
+    def construct_yaml_seq(self, node):
+        data = LocList()
+        yield data
+        data.extend(self.construct_sequence(node))
+        data.value_pos.extend(None for _ in node.value)
+
+
+for cls in {LocLoader, CLocLoader, FastLocLoader}:
+    cls.add_constructor("tag:yaml.org,2002:map", cls.construct_yaml_map)
+    cls.add_constructor("tag:yaml.org,2002:seq", cls.construct_yaml_seq)
@@ -10,15 +10,29 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
 from dataclasses import dataclass
-from functools import partial
+from functools import cached_property, partial
 
 from .root_base import ElementBase
-from .expander import Expander, StringsOnlyExpander
-from .yaml_objects import BaseYamlObject
+from .expander import Expander, StringsOnlyExpander, enum_required_params
+from .yaml_objects import (
+    BaseYamlObject,
+    IncludeJinja2,
+    IncludeRawExpand,
+    J2Yaml,
+    YamlInclude,
+)
 from .loc_loader import LocDict
+from .memo import freeze, missing, record_elements
 from .errors import JenkinsJobsException
 from .position import Pos
+from .sources import (
+    record_defaults,
+    record_key_sources,
+    record_sources,
+    recording_sources,
+)
 
 
 macro_specs = [
@@ -36,6 +50,21 @@ macro_specs = [
 ]
 
 
+# Yaml objects which may use parameters not listed in their required_params:
+# included files and yaml produced by templates are expanded with all of them.
+opaque_params_classes = (YamlInclude, IncludeRawExpand, J2Yaml, IncludeJinja2)
+
+
+def _has_opaque_params(obj):
+    if isinstance(obj, opaque_params_classes):
+        return True
+    if isinstance(obj, dict):
+        return any(_has_opaque_params(v) for v in obj.values())
+    if isinstance(obj, list):
+        return any(_has_opaque_params(v) for v in obj)
+    return False
+
+
 @dataclass
 class Macro(ElementBase):
     _expander: Expander
@@ -61,8 +90,8 @@ class Macro(ElementBase):
         defaults = d.pop_loc_string("defaults", "global")
         elements = d.pop_required_element(elements_name)
         params = d
-        expander = Expander(config)
-        str_expander = StringsOnlyExpander(config)
+        expander = Expander.shared(config)
+        str_expander = StringsOnlyExpander.shared(config)
         macro = cls(
             _defaults=roots.defaults,
             _expander=expander,
@@ -79,21 +108,95 @@ class Macro(ElementBase):
     def __str__(self):
         return f"{self._type_name} macro {self.name!r}"
 
+    @cached_property
+    def _memo_param_names(self):
+        """Names of parameters used by macro elements, or None if unknown"""
+        if _has_opaque_params(self.elements):
+            return None
+        try:
+            return sorted(set(enum_required_params(self.elements, self.pos)))
+        except JenkinsJobsException:
+            return None
+
+    def _memo_key(self, params):
+        names = self._memo_param_names
+        if names is None:
+            return None
+        key = tuple((name, freeze(params.get(name, missing))) for name in names)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
     def dispatch_elements(self, registry, xml_parent, component_data, job_data, params):
         defaults = self._pick_defaults(self.defaults_name)
+        record_defaults(self.defaults_name)
+        record_key_sources(defaults.params)
         full_params = LocDict.merge(
             defaults.params,
             self.params,
             params,
         )
+        # If enabled, macro output is memoized by values of parameters it uses and tag of
+        # parent element, which components may look at. Output is recorded
+        # into separate element and only if no component looks into parent
+        # element contents, uses job data or calls other macros.
+        memo = None
+        if registry.macro_memo is not None:
+            memo = registry.macro_memo.get(id(self), {})
+        key = None
+        if memo is not None:
+            key = self._memo_key(full_params)
+        if key is not None:
+            key = (xml_parent.tag, key)
+        if key is None:
+            self._dispatch_elements(
+                registry, xml_parent, component_data, job_data, full_params
+            )
+            return
+        try:
+            output, sources = memo[key]
+        except KeyError:
+            # Included files are read only when output is recorded.
+            with recording_sources() as sources:
+                output = self._record_elements(
+                    registry, xml_parent.tag, component_data, job_data, full_params
+                )
+            if output is None:
+                registry.macro_memo[id(self)] = None
+                self._dispatch_elements(
+                    registry, xml_parent, component_data, job_data, full_params
+                )
+                return
+            memo[key] = (output, sources)
+            registry.macro_memo[id(self)] = memo
+        record_sources(sources)
+        xml_parent.extend(copy.deepcopy(output))
+
+    def _record_elements(self, registry, tag, component_data, job_data, params):
+        def dispatch(xml_parent):
+            self._dispatch_elements(
+                registry, xml_parent, component_data, job_data, params
+            )
+
+        registry.recording_macro = True
+        try:
+            return record_elements(tag, dispatch)
+        finally:
+            registry.recording_macro = False
+
+    def _dispatch_elements(
+        self, registry, xml_parent, component_data, job_data, params
+    ):
         element_list = self.elements
         if isinstance(element_list, BaseYamlObject):
             # Expand !j2-yaml tag if it is right below macro body.
             # But do not expand yaml tags inside it - they will be expanded later.
-            element_list = element_list.expand(self._str_expander, full_params)
+            element_list = element_list.expand(self._str_expander, params)
         for element in element_list:
             try:
-                expanded_element = self._expander.expand(element, full_params)
+                expanded_element = self._expander.expand(element, params)
             except JenkinsJobsException as x:
                 raise x.with_context(
                     f"While expanding {self}",
@@ -0,0 +1,160 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Recording of generated XML elements, to reuse them for the same input.
+
+import xml.etree.ElementTree as XML
+
+from .loc_loader import LocString
+
+
+class NotMemoizable(Exception):
+    """Raised when recorded output depends on more than its parameters"""
+
+
+class RecordingElement(XML.Element):
+    """Parent element for recording macro or component output.
+
+    Components must not look at what is already in the parent element or
+    change it other than by adding elements while recording, because output
+    reused for other parents would be wrong. Component catching the raised
+    exception does not help, recording is aborted anyway.
+    """
+
+    recording = True
+    aborted = False
+
+    def _check_recording(self):
+        if self.recording:
+            self.aborted = True
+            raise NotMemoizable()
+
+    @property
+    def text(self):
+        self._check_recording()
+        return XML.Element.text.__get__(self)
+
+    @text.setter
+    def text(self, value):
+        self._check_recording()
+        XML.Element.text.__set__(self, value)
+
+    @property
+    def attrib(self):
+        self._check_recording()
+        return XML.Element.attrib.__get__(self)
+
+    @attrib.setter
+    def attrib(self, value):
+        self._check_recording()
+        XML.Element.attrib.__set__(self, value)
+
+    def get(self, *args, **kw):
+        self._check_recording()
+        return super().get(*args, **kw)
+
+    def keys(self):
+        self._check_recording()
+        return super().keys()
+
+    def items(self):
+        self._check_recording()
+        return super().items()
+
+    def set(self, key, value):
+        self._check_recording()
+        super().set(key, value)
+
+    def clear(self):
+        self._check_recording()
+        super().clear()
+
+    def insert(self, index, element):
+        self._check_recording()
+        super().insert(index, element)
+
+    def __setitem__(self, index, element):
+        self._check_recording()
+        super().__setitem__(index, element)
+
+    def __delitem__(self, index):
+        self._check_recording()
+        super().__delitem__(index)
+
+    def __getitem__(self, index):
+        self._check_recording()
+        return super().__getitem__(index)
+
+    def __iter__(self):
+        self._check_recording()
+        return iter(super().__getitem__(slice(None)))
+
+    def __len__(self):
+        self._check_recording()
+        return super().__len__()
+
+    def find(self, *args, **kw):
+        self._check_recording()
+        return super().find(*args, **kw)
+
+    def findall(self, *args, **kw):
+        self._check_recording()
+        return super().findall(*args, **kw)
+
+    def findtext(self, *args, **kw):
+        self._check_recording()
+        return super().findtext(*args, **kw)
+
+    def iter(self, *args, **kw):
+        self._check_recording()
+        return super().iter(*args, **kw)
+
+    def iterfind(self, *args, **kw):
+        self._check_recording()
+        return super().iterfind(*args, **kw)
+
+    def itertext(self):
+        self._check_recording()
+        return super().itertext()
+
+    def remove(self, element):
+        self._check_recording()
+        super().remove(element)
+
+
+missing = object()
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return (dict, tuple((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return (list, tuple(freeze(v) for v in value))
+    if isinstance(value, LocString):
+        return (str, str(value))
+    return (type(value), value)
+
+
+def record_elements(tag, dispatch):
+    """Call dispatch with recording parent element.
+
+    Returns list of elements it added, or None if they can not be reused.
+    """
+    recorder = RecordingElement(tag)
+    try:
+        dispatch(recorder)
+    except NotMemoizable:
+        return None
+    recorder.recording = False
+    if recorder.aborted:
+        return None
+    return list(recorder)
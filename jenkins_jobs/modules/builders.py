@@ -54,6 +54,7 @@ from jenkins_jobs.modules.publishers import cifs
 logger = logging.getLogger(__name__)
 
 
+@helpers.pure_component
 def shell(registry, xml_parent, data):
     """yaml: shell
     Execute a shell command.
@@ -1286,6 +1287,7 @@ def system_groovy(registry, xml_parent, data):
     helpers.convert_mapping_to_xml(sysgroovy, data, mapping, fail_required=True)
 
 
+@helpers.pure_component
 def batch(registry, xml_parent, data):
     """yaml: batch
     Execute a batch command.
@@ -725,6 +725,16 @@ def jms_messaging_common(parent, subelement, data):
     convert_mapping_to_xml(namespace, data, mapping, fail_required=True)
 
 
+def pure_component(func):
+    """Mark component as generating the same XML for the same data.
+
+    Output of such components is reused when ``component_cache`` option
+    is enabled.
+    """
+    func.pure = True
+    return func
+
+
 def check_mutual_exclusive_data_args(data_arg_position, *args):
     mutual_exclusive_args = set(args)
 
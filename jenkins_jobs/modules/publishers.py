@@ -132,6 +132,7 @@ def allure(registry, xml_parent, data):
     helpers.convert_mapping_to_xml(config, data, mapping, fail_required=True)
 
 
+@helpers.pure_component
 def archive(registry, xml_parent, data):
     """yaml: archive
     Archive build artifacts
@@ -1567,6 +1568,7 @@ def hp_alm(registry, xml_parent, data):
     helpers.convert_mapping_to_xml(alm_uploader, data, mapping, fail_required=True)
 
 
+@helpers.pure_component
 def junit(registry, xml_parent, data):
     """yaml: junit
     Publish JUnit test results. Requires the Jenkins :jenkins-plugins:`JUnit
@@ -2415,6 +2417,7 @@ def pipeline(registry, xml_parent, data):
         XML.SubElement(pippub, "downstreamProjectNames").text = projects
 
 
+@helpers.pure_component
 def email(registry, xml_parent, data):
     """yaml: email
     Email notifications on build failure.
@@ -2593,6 +2596,7 @@ def base_email_ext(registry, xml_parent, data, ttype):
         helpers.convert_mapping_to_xml(email, data, mappings, fail_required=True)
 
 
+@helpers.pure_component
 def email_ext(registry, xml_parent, data):
     """yaml: email-ext
     Extend Jenkin's built in email notification
@@ -264,6 +264,7 @@ def logfilesize(registry, xml_parent, data):
     helpers.convert_mapping_to_xml(lfswrapper, data, mapping, fail_required=True)
 
 
+@helpers.pure_component
 def timeout(registry, xml_parent, data):
     """yaml: timeout
     Abort the build if it runs too long.
@@ -492,6 +493,7 @@ def timeout(registry, xml_parent, data):
         XML.SubElement(twrapper, "timeoutType").text = tout_type
 
 
+@helpers.pure_component
 def timestamps(registry, xml_parent, data):
     """yaml: timestamps
     Add timestamps to the console log.
@@ -506,6 +508,7 @@ def timestamps(registry, xml_parent, data):
     XML.SubElement(xml_parent, "hudson.plugins.timestamper.TimestamperBuildWrapper")
 
 
+@helpers.pure_component
 def ansicolor(registry, xml_parent, data):
     """yaml: ansicolor
     Translate ANSI color codes to HTML in the console log.
@@ -857,6 +860,7 @@ def mask_passwords(registry, xml_parent, data):
     )
 
 
+@helpers.pure_component
 def workspace_cleanup(registry, xml_parent, data):
     """yaml: workspace-cleanup (pre-build)
 
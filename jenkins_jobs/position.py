@@ -10,84 +10,98 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import sys
-import yaml
+import re
+from array import array
 
-if sys.version_info >= (3, 8):
-    from functools import cached_property
-else:
-    from .cached_property import cached_property
+import yaml
 
 
 LINE_SEPARATORS = "\0\r\n\x85\u2028\u2029"
 WHITESPACE_CHARS = " \t"
 
+# Same line breaks as counted by yaml Reader.
+_line_break_re = re.compile("\r\n|[\r\n\x85\u2028\u2029]")
+
+
+class Source:
+    """Source text, shared by all positions inside it"""
+
+    __slots__ = ("path", "text", "_line_starts")
+
+    def __init__(self, path, text):
+        self.path = path
+        self.text = text
+        self._line_starts = None
+
+    def offset(self, line, column):
+        if self._line_starts is None:
+            # Only needed for error reporting; build it on first request.
+            self._line_starts = array(
+                "Q", [0, *(m.end() for m in _line_break_re.finditer(self.text))]
+            )
+        if line >= len(self._line_starts):
+            return len(self.text)
+        return min(self._line_starts[line] + column, len(self.text))
+
 
 class Pos:
+    __slots__ = ("source", "line", "column")
+
     @classmethod
-    def from_node(cls, node, line_ofs=0, column_ofs=0):
+    def from_node(cls, source, node, line_ofs=0, column_ofs=0):
         mark = node.start_mark
-        return cls(mark, mark.name, mark.line + line_ofs, mark.column + column_ofs)
+        return cls(source, mark.line + line_ofs, mark.column + column_ofs)
 
     @classmethod
     def from_file(cls, path, text):
-        mark = yaml.Mark(str(path), 0, 0, 0, text, 0)
-        return cls(mark, path, 0, 0)
+        return cls(Source(path, text), 0, 0)
 
-    def __init__(self, mark, path, line, column):
-        self._mark = mark
-        self.path = path
+    def __init__(self, source, line, column):
+        self.source = source
         self.line = line  # Starts from 0.
         self.column = column  # Starts from 0.
 
     def __repr__(self):
         return f"<Pos {self.path}:{self.line}:{self.column}>"
 
+    @property
+    def path(self):
+        return self.source.path
+
     def with_offset(self, line_ofs=0, column_ofs=0):
-        line_ptr = self._move_ptr_by_lines(line_ofs)
-        ptr = line_ptr + column_ofs
-        mark = self._clone_mark(self._mark, ptr)
         if line_ofs:
             column = column_ofs  # Start from new line.
         else:
             column = self.column + column_ofs
-        return Pos(mark, self.path, self.line + line_ofs, column)
+        return Pos(self.source, self.line + line_ofs, column)
 
     def with_contents_start(self):
-        ptr = self._mark.pointer
-        buf = self._mark.buffer
+        text = self.source.text
+        start = ptr = self._pointer
         while (
-            ptr < len(buf)
-            and buf[ptr] not in LINE_SEPARATORS
-            and buf[ptr] in WHITESPACE_CHARS
+            ptr < len(text)
+            and text[ptr] not in LINE_SEPARATORS
+            and text[ptr] in WHITESPACE_CHARS
         ):
             ptr += 1
-        mark = self._clone_mark(self._mark, ptr)
-        return Pos(mark, self.path, self.line, self.column + ptr - self._mark.pointer)
+        return Pos(self.source, self.line, self.column + ptr - start)
 
-    @cached_property
+    @property
     def snippet(self):
-        return self._mark.get_snippet(max_length=100)
+        mark = yaml.Mark(
+            str(self.path),
+            0,
+            self.line,
+            self.column,
+            self.source.text,
+            self._pointer,
+        )
+        return mark.get_snippet(max_length=100)
 
-    @cached_property
+    @property
     def body(self):
-        return self._mark.buffer[self._mark.pointer :]
-
-    def _clone_mark(self, mark, ptr):
-        return yaml.Mark(
-            mark.name,
-            mark.index,
-            mark.line,
-            mark.column,
-            mark.buffer,
-            ptr,
-        )
+        return self.source.text[self._pointer :]
 
-    def _move_ptr_by_lines(self, line_ofs):
-        ptr = self._mark.pointer
-        buf = self._mark.buffer
-        while line_ofs > 0 and ptr < len(buf):
-            if buf[ptr] in LINE_SEPARATORS:
-                line_ofs -= 1
-            ptr += 1
-        return ptr
+    @property
+    def _pointer(self):
+        return self.source.offset(self.line, self.column)
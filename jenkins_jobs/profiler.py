@@ -0,0 +1,243 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Profiling of processing phases and cost attribution, used by --profile,
+# and memory snapshots at pipeline boundaries, used by --memory-profile.
+
+import cProfile
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import xml.etree.ElementTree as XML
+
+__all__ = ["profiler", "memory_profiler"]
+
+
+class _NullCost(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_null_cost = _NullCost()
+
+
+class _Cost(object):
+    def __init__(self, profiler, source, pos):
+        self._profiler = profiler
+        self._key = (source, pos)
+
+    def __enter__(self):
+        self._blocks = sys.getallocatedblocks()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self._start
+        blocks = sys.getallocatedblocks() - self._blocks
+        self._profiler.add_cost(self._key, seconds, blocks)
+
+
+def format_pos(pos):
+    if pos is None:
+        return ""
+    # Lines and columns are counted from 1, as in error messages.
+    return "{0}:{1}:{2}".format(pos.path, pos.line + 1, pos.column + 1)
+
+
+class Profiler(object):
+    """cProfile data per processing phase, and cost of YAML elements.
+
+    Phases are timers of :py:data:`jenkins_jobs.stats.stats`; each one
+    has its own cProfile profile, collecting time not spent in phases nested
+    into it. Only the main thread is profiled.
+
+    Cost is wall time and number of memory blocks allocated and not freed,
+    by job templates and other items, macros and components. It is
+    inclusive: cost of a macro includes cost of components it calls.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.phase_profiles = {}
+        self._phase_stack = []
+        # (source, pos) -> [count, seconds, blocks].
+        self.costs = {}
+
+    def enter_phase(self, name):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        if self._phase_stack:
+            self._phase_stack[-1].disable()
+        profile = self.phase_profiles.get(name)
+        if profile is None:
+            profile = self.phase_profiles[name] = cProfile.Profile()
+        self._phase_stack.append(profile)
+        profile.enable()
+
+    def exit_phase(self, name):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        self._phase_stack.pop().disable()
+        if self._phase_stack:
+            self._phase_stack[-1].enable()
+
+    def cost(self, source, pos):
+        """Return context manager adding cost of code in it to source at pos"""
+        if not self.enabled:
+            return _null_cost
+        return _Cost(self, source, pos)
+
+    def add_cost(self, key, seconds, blocks):
+        with self._lock:
+            cost = self.costs.setdefault(key, [0, 0.0, 0])
+            cost[0] += 1
+            cost[1] += seconds
+            cost[2] += blocks
+
+    def format_costs(self):
+        rows = [("Seconds", "Count", "Blocks", "Source", "Position")]
+        costs = sorted(self.costs.items(), key=lambda item: -item[1][1])
+        for (source, pos), (count, seconds, blocks) in costs:
+            rows.append(
+                (
+                    "{0:.3f}".format(seconds),
+                    str(count),
+                    str(blocks),
+                    source,
+                    format_pos(pos),
+                )
+            )
+        widths = [max(len(row[idx]) for row in rows) for idx in range(4)]
+        return "\n".join(
+            "{0:>{5}}  {1:>{6}}  {2:>{7}}  {3:<{8}}  {4}".format(*row, *widths).rstrip()
+            for row in rows
+        )
+
+    def write(self, path):
+        """Write <phase>.pstats files and attribution.txt into directory path"""
+        os.makedirs(path, exist_ok=True)
+        for name, profile in self.phase_profiles.items():
+            file_name = name.replace(" ", "-") + ".pstats"
+            profile.dump_stats(os.path.join(path, file_name))
+        with open(os.path.join(path, "attribution.txt"), "w") as f:
+            f.write(self.format_costs() + "\n")
+
+
+profiler = Profiler()
+
+
+def _format_size(size):
+    return "{0:.1f} KiB".format(size / 1024)
+
+
+class MemoryProfiler(object):
+    """Memory use at pipeline boundaries, traced with tracemalloc.
+
+    At each boundary, a snapshot is taken and reported right away, and only
+    the last one is kept: report shows memory in use and peak since previous
+    boundary, allocation sites which grew the most since then, and number of
+    live objects of Jenkins Job Builder classes and of XML elements.
+    """
+
+    top_sites = 15
+    top_types = 20
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.sections = []
+        self._last_snapshot = None
+        self._last_counts = {}
+
+    def start(self):
+        self.reset()
+        self.enabled = True
+        tracemalloc.start()
+
+    def stop(self):
+        self.enabled = False
+        self._last_snapshot = None
+        tracemalloc.stop()
+
+    def snapshot(self, boundary):
+        """Take snapshot after boundary, like "load" or "amend", and report it"""
+        if not self.enabled:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                # Modules imported on first use, not data being processed.
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ]
+        )
+        counts = self._count_objects()
+        lines = [
+            "After {0}: current {1}, peak {2}".format(
+                boundary, _format_size(current), _format_size(peak)
+            ),
+            "",
+            "Top allocation sites:",
+        ]
+        if self._last_snapshot is None:
+            sites = snapshot.statistics("lineno")
+        else:
+            sites = snapshot.compare_to(self._last_snapshot, "lineno")
+        lines += ["  {0}".format(site) for site in sites[: self.top_sites]]
+        lines += ["", "Objects:"]
+        width = max([len(name) for name in counts] + [0])
+        types = sorted(counts.items(), key=lambda item: -item[1])
+        for name, count in types[: self.top_types]:
+            diff = count - self._last_counts.get(name, 0)
+            lines.append("  {0:<{2}}  {1:>9} ({3:+d})".format(name, count, width, diff))
+        self.sections.append("\n".join(lines))
+        self._last_snapshot = snapshot
+        self._last_counts = counts
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+    @staticmethod
+    def _count_objects():
+        element_type = type(XML.Element("element"))
+        counts = {}
+        for obj in gc.get_objects():
+            cls = type(obj)
+            # Not always a string for extension types.
+            module = cls.__dict__.get("__module__")
+            if cls is element_type:
+                name = "xml.etree.ElementTree.Element"
+            elif isinstance(module, str) and module.startswith("jenkins_jobs."):
+                name = "{0}.{1}".format(module, cls.__qualname__)
+            else:
+                continue
+            counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    def write(self, path):
+        with open(path, "w") as f:
+            f.write("\n\n".join(self.sections) + "\n")
+
+
+memory_profiler = MemoryProfiler()
@@ -15,18 +15,25 @@
 
 # Manage Jenkins plugin module registry.
 
+import copy
 import inspect
 import logging
 import operator
 import pkg_resources
 import sys
 import types
+from collections import namedtuple
 from pkg_resources.extern.packaging.version import InvalidVersion
 
 from six import PY2
 
 from jenkins.plugins import PluginVersion
 from jenkins_jobs.errors import JenkinsJobsException
+import jenkins_jobs.modules.base
+from jenkins_jobs.memo import NotMemoizable, freeze, record_elements
+from jenkins_jobs.profiler import profiler
+from jenkins_jobs.sources import record_source
+from jenkins_jobs.stats import stats
 
 __all__ = ["ModuleRegistry"]
 
@@ -35,6 +42,18 @@ logger = logging.getLogger(__name__)
 getargspec = inspect.getargspec if PY2 else inspect.getfullargspec
 
 
+class ComponentFunc(namedtuple("ComponentFunc", "func takes_job_data pure")):
+    """Component function with its signature inspected once, when loaded"""
+
+    @classmethod
+    def from_func(cls, func):
+        return cls(
+            func,
+            takes_job_data="job_data" in getargspec(func).args,
+            pure=getattr(func, "pure", False),
+        )
+
+
 class ModuleRegistry(object):
     _entry_points_cache = {}
     _component_type_cache = {}
@@ -46,6 +65,17 @@ class ModuleRegistry(object):
         self.jjb_config = jjb_config
         self.masked_warned = {}
         self._macros = {}
+        # id(macro) -> {parameters key -> (XML elements, source files)}, or
+        # None if macro output can not be reused. None if disabled.
+        self.macro_memo = self._new_macro_memo()
+        self.recording_macro = False
+        # (component type, name, component data) -> XML elements, or None
+        # if component output can not be reused. Plugin versions are the same
+        # for all components using this registry.
+        if jjb_config.builder.get("component_cache"):
+            self.component_cache = {}
+        else:
+            self.component_cache = None
 
         if plugins_list is None:
             self._plugin_version = {}
@@ -61,6 +91,14 @@ class ModuleRegistry(object):
             if mod.component_type is not None:
                 self.modules_by_component_type[mod.component_type] = entrypoint
 
+        # Most modules do not override no-op Base.amend_job_dict.
+        base_amend_job_dict = jenkins_jobs.modules.base.Base.amend_job_dict
+        self._amending_modules = [
+            mod
+            for mod in self.modules
+            if type(mod).amend_job_dict is not base_amend_job_dict
+        ]
+
     @staticmethod
     def _get_plugins_versions(plugins_list):
         plugin_version = {}
@@ -95,14 +133,6 @@ class ModuleRegistry(object):
 
         return plugin_version
 
-    @staticmethod
-    def _filter_kwargs(func, **kwargs):
-        arg_spec = getargspec(func)
-        for name in list(kwargs.keys()):
-            if name not in arg_spec.args:
-                del kwargs[name]
-        return kwargs
-
     def get_plugin_version(self, plugin_name, alt_plugin_name=None, default=None):
         """Provide plugin version to be used from a module's impl of Base.gen_xml.
 
@@ -161,16 +191,28 @@ class ModuleRegistry(object):
 
     def set_macros(self, macros):
         self._macros = macros
+        self.macro_memo = self._new_macro_memo()
+
+    def _new_macro_memo(self):
+        if self.jjb_config.builder.get("macro_memo"):
+            return {}
+        return None
 
     def amend_job_dicts(self, job_data_list):
-        while True:
-            changed = False
+        with stats.timer("amend"):
             for job in job_data_list:
-                for module in self.modules:
-                    if module.amend_job_dict(job.data):
-                        changed = True
-            if not changed:
-                break
+                self.amend_job_dict(job.data)
+
+    def amend_job_dict(self, job):
+        """Let modules amend job data until none of them changes it.
+
+        Jobs are amended independently of each other, so this may be called
+        for different jobs in parallel.
+        """
+        modules = self._amending_modules
+        # Every module is called on each pass, as when amending all jobs.
+        while modules and any([module.amend_job_dict(job) for module in modules]):
+            pass
 
     def get_component_list_type(self, entry_point):
         if entry_point in self._component_type_cache:
@@ -240,16 +282,27 @@ class ModuleRegistry(object):
         macro_dict = self.macros.get(component_type, {})
         macro = macro_dict.get(name)
         if macro:
+            if self.recording_macro:
+                # Nested macros are memoized by themselves.
+                raise NotMemoizable()
+            if macro.pos is not None:
+                record_source(macro.pos.path)
+            args = (
+                component_data,
+                component_type,
+                eps,
+                job_data,
+                macro,
+                name,
+                xml_parent,
+            )
             try:
-                self._dispatch_macro(
-                    component_data,
-                    component_type,
-                    eps,
-                    job_data,
-                    macro,
-                    name,
-                    xml_parent,
-                )
+                # Cost source is not formatted when profiler is disabled.
+                if profiler.enabled:
+                    with profiler.cost(f"{component_type} macro {name!r}", macro.pos):
+                        self._dispatch_macro(*args)
+                else:
+                    self._dispatch_macro(*args)
             except JenkinsJobsException as x:
                 if component_pos is not None:
                     raise x.with_context(
@@ -260,9 +313,14 @@ class ModuleRegistry(object):
                     raise
         elif name in eps:
             try:
-                func = eps[name]
-                kwargs = self._filter_kwargs(func, job_data=job_data)
-                func(self, xml_parent, component_data, **kwargs)
+                ep = eps[name]
+                args = (ep, component_type, name, xml_parent, component_data, job_data)
+                if profiler.enabled:
+                    # Components are not defined in YAML; cost is per name only.
+                    with profiler.cost(f"{component_type} {name!r}", None):
+                        self._dispatch_component(*args)
+                else:
+                    self._dispatch_component(*args)
             except JenkinsJobsException as x:
                 raise x.with_context(
                     f"In {component_type} {name!r}",
@@ -289,6 +347,41 @@ class ModuleRegistry(object):
         params = {**component_data, **(job_data or {})}
         macro.dispatch_elements(self, xml_parent, component_data, job_data, params)
 
+    def _dispatch_component(
+        self, ep, component_type, name, xml_parent, component_data, job_data
+    ):
+        if ep.takes_job_data:
+            if self.recording_macro:
+                raise NotMemoizable()
+            ep.func(self, xml_parent, component_data, job_data=job_data)
+        elif self.component_cache is not None and ep.pure:
+            self._dispatch_cached(
+                component_type, name, ep.func, xml_parent, component_data
+            )
+        else:
+            ep.func(self, xml_parent, component_data)
+
+    def _dispatch_cached(self, component_type, name, func, xml_parent, component_data):
+        # Components may depend on tag of parent element.
+        key = (component_type, name, xml_parent.tag, freeze(component_data))
+        try:
+            output = self.component_cache[key]
+        except TypeError:
+            # Unhashable value in component data.
+            func(self, xml_parent, component_data)
+            return
+        except KeyError:
+            # Component may modify it's data, keep original one for real call.
+            output = record_elements(
+                xml_parent.tag,
+                lambda parent: func(self, parent, copy.deepcopy(component_data)),
+            )
+            self.component_cache[key] = output
+        if output is None:
+            func(self, xml_parent, component_data)
+        else:
+            xml_parent.extend(copy.deepcopy(output))
+
     def _load_eps(self, component_list_type, component_type, entry_point, name):
         logging.debug("Caching entrypoints for %s" % component_list_type)
         module_eps = []
@@ -349,7 +442,7 @@ class ModuleRegistry(object):
                     "name: '{1}'".format(component_type, name)
                 )
 
-            eps[module_ep.name] = module_ep.load()
+            eps[module_ep.name] = ComponentFunc.from_func(module_ep.load())
         # cache both sets of entry points
         self._entry_points_cache[component_list_type] = eps
         logger.debug("Cached entry point group %s = %s", component_list_type, eps)
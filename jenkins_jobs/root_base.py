@@ -12,12 +12,15 @@
 
 from collections import namedtuple
 from dataclasses import dataclass, field
-from typing import List
+from functools import partial
+from typing import Callable, List, Optional
 
 from .constants import MAGIC_MANAGE_STRING
 from .errors import Context, JenkinsJobsException
 from .loc_loader import LocDict, LocString
 from .position import Pos
+from .profiler import profiler
+from .sources import record_defaults, record_key_sources
 from .formatter import enum_str_format_required_params, enum_str_format_param_defaults
 from .expander import Expander, expand_parameters
 from .defaults import Defaults
@@ -26,17 +29,43 @@ from .dimensions import enum_dimensions_params, is_point_included
 
 @dataclass
 class JobViewData:
-    """Expanded job or view data, with added source context. Fed into xml generator"""
+    """Expanded job or view data, with added source context. Fed into xml generator
+
+    Items generated with names only have just their name expanded;
+    use ``expanded`` to get one with the rest of data.
+    """
 
     data: LocDict
     context: List[Context] = field(default_factory=list)
+    expand_data: Optional[Callable[[], LocDict]] = None
 
     @property
     def name(self):
         return self.data["name"]
 
     def with_context(self, message, pos):
-        return JobViewData(self.data, [Context(message, pos), *self.context])
+        return JobViewData(
+            self.data, [Context(message, pos), *self.context], self.expand_data
+        )
+
+    def with_error_context(self, message, pos):
+        """Add context to errors raised while expanding the rest of data"""
+        if self.expand_data is None:
+            return self
+        expand_data = self.expand_data
+
+        def expand():
+            try:
+                return expand_data()
+            except JenkinsJobsException as x:
+                raise x.with_context(message, pos=pos)
+
+        return JobViewData(self.data, self.context, expand)
+
+    def expanded(self):
+        if self.expand_data is None:
+            return self
+        return JobViewData(self.expand_data(), self.context)
 
 
 @dataclass
@@ -51,6 +80,10 @@ class ElementBase:
         return str(self).capitalize()
 
     def _pick_defaults(self, name):
+        try:
+            return self._defaults.merged[name]
+        except KeyError:
+            pass
         try:
             defaults = self._defaults[name]
         except KeyError:
@@ -62,7 +95,9 @@ class ElementBase:
             )
         if name == "global":
             return defaults
-        return defaults.merged_with_global(self._pick_defaults("global"))
+        merged = defaults.merged_with_global(self._pick_defaults("global"))
+        self._defaults.merged[name] = merged
+        return merged
 
 
 @dataclass
@@ -71,6 +106,8 @@ class RootBase(ElementBase):
 
     _expander: Expander
     _keep_descriptions: bool
+    # Contents needed to get item name.
+    _name_keys = ("name",)
     _id: str
     name: str
     pos: Pos
@@ -93,16 +130,44 @@ class RootBase(ElementBase):
         return contents
 
     def _expand_contents(self, contents, params):
-        expanded_contents = self._expander.expand(contents, params)
+        # Keys from defaults are tracked by their positions.
+        record_key_sources(contents)
+        record_key_sources(params)
+        if profiler.enabled:
+            with profiler.cost(f"In {self}", self.pos):
+                expanded_contents = self._expander.expand(contents, params)
+        else:
+            expanded_contents = self._expander.expand(contents, params)
         description = expanded_contents.get("description")
         if description is not None or not self._keep_descriptions:
             amended_description = (description or "") + MAGIC_MANAGE_STRING
             expanded_contents["description"] = amended_description
         return expanded_contents
 
+    def _expand_item(self, defaults_name, contents, params):
+        # Defaults are also tracked by name, so ones defined later are found.
+        record_defaults(defaults_name)
+        return self._expand_contents(contents, params)
+
+    def _make_item(self, contents, params, names_only, defaults_name):
+        context = [Context(f"In {self}", self.pos)]
+        if not names_only:
+            return JobViewData(
+                self._expand_item(defaults_name, contents, params), context
+            )
+        name_contents = contents.copy_with(
+            {key: contents[key] for key in self._name_keys if key in contents}
+        )
+        item = JobViewData(
+            self._expand_item(defaults_name, name_contents, params),
+            context,
+            partial(self._expand_item, defaults_name, contents, params),
+        )
+        return item.with_error_context(f"In {self}", self.pos)
+
 
 class NonTemplateRootMixin:
-    def top_level_generate_items(self):
+    def top_level_generate_items(self, names_only=False):
         try:
             defaults = self._pick_defaults(self.defaults_name)
             item_params = LocDict.merge(
@@ -114,22 +179,21 @@ class NonTemplateRootMixin:
                 self.contents,
                 pos=self.pos,
             )
-            expanded_contents = self._expand_contents(contents, item_params)
-            context = [Context(f"In {self}", self.pos)]
-            yield JobViewData(expanded_contents, context)
+            yield self._make_item(contents, item_params, names_only, self.defaults_name)
         except JenkinsJobsException as x:
             raise x.with_context(f"In {self}", pos=self.pos)
 
-    def generate_items(self, defaults_name, params):
+    def generate_items(self, defaults_name, params, names_only=False):
         # Do not produce jobs/views from under project - they are produced when
         # processed directly from roots, by top_level_generate_items.
         return []
 
 
 class TemplateRootMixin:
-    def generate_items(self, defaults_name, params):
+    def generate_items(self, defaults_name, params, names_only=False):
         try:
-            defaults = self._pick_defaults(defaults_name or self.defaults_name)
+            defaults_name = defaults_name or self.defaults_name
+            defaults = self._pick_defaults(defaults_name)
             item_params = LocDict.merge(
                 defaults.params,
                 self.params,
@@ -157,9 +221,9 @@ class TemplateRootMixin:
                     key_pos=expanded_params.key_pos.get("exclude"),
                 ):
                     continue
-                expanded_contents = self._expand_contents(contents, expanded_params)
-                context = [Context(f"In {self}", self.pos)]
-                yield JobViewData(expanded_contents, context)
+                yield self._make_item(
+                    contents, expanded_params, names_only, defaults_name
+                )
         except JenkinsJobsException as x:
             raise x.with_context(f"In {self}", pos=self.pos)
 
@@ -207,7 +271,9 @@ class GroupBase:
                 )
         return cls.Spec(name, params, pos)
 
-    def _generate_items(self, root_dicts, spec_list, defaults_name, params):
+    def _generate_items(
+        self, root_dicts, spec_list, defaults_name, params, names_only=False
+    ):
         try:
             for spec in spec_list:
                 item = self._pick_spec_item(root_dicts, spec)
@@ -217,11 +283,13 @@ class GroupBase:
                     self._my_params,
                     spec.params,
                 )
-                for job_data in item.generate_items(defaults_name, item_params):
+                for job_data in item.generate_items(
+                    defaults_name, item_params, names_only
+                ):
                     yield (
-                        job_data.with_context("Defined here", spec.pos).with_context(
-                            f"In {self}", self.pos
-                        )
+                        job_data.with_context("Defined here", spec.pos)
+                        .with_context(f"In {self}", self.pos)
+                        .with_error_context(f"In {self}", self.pos)
                     )
         except JenkinsJobsException as x:
             raise x.with_context(f"In {self}", self.pos)
@@ -249,5 +317,7 @@ class Group(GroupBase):
     specs: list  # list[Spec]
     params: dict
 
-    def generate_items(self, defaults_name, params):
-        return self._generate_items(self._root_dicts, self.specs, defaults_name, params)
+    def generate_items(self, defaults_name, params, names_only=False):
+        return self._generate_items(
+            self._root_dicts, self.specs, defaults_name, params, names_only
+        )
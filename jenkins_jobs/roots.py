@@ -14,7 +14,7 @@ import logging
 from collections import defaultdict
 
 from .errors import Context, JenkinsJobsException
-from .defaults import Defaults
+from .defaults import Defaults, DefaultsDict
 from .job import Job, JobTemplate, JobGroup
 from .view import View, ViewTemplate, ViewGroup
 from .project import Project
@@ -41,7 +41,7 @@ class Roots:
 
     def __init__(self, config):
         self._allow_duplicates = config.yamlparser["allow_duplicates"]
-        self.defaults = {}
+        self.defaults = DefaultsDict()
         self.jobs = {}
         self.job_templates = {}
         self.job_groups = {}
@@ -51,20 +51,20 @@ class Roots:
         self.projects = {}
         self.macros = defaultdict(dict)  # type -> name -> Macro
 
-    def generate_jobs(self):
+    def generate_jobs(self, names_only=False):
         expanded_jobs = []
         for job in self.jobs.values():
-            expanded_jobs += job.top_level_generate_items()
+            expanded_jobs += job.top_level_generate_items(names_only)
         for project in self.projects.values():
-            expanded_jobs += project.generate_jobs()
+            expanded_jobs += project.generate_jobs(names_only)
         return self._remove_duplicates(expanded_jobs, "job")
 
-    def generate_views(self):
+    def generate_views(self, names_only=False):
         expanded_views = []
         for view in self.views.values():
-            expanded_views += view.top_level_generate_items()
+            expanded_views += view.top_level_generate_items(names_only)
         for project in self.projects.values():
-            expanded_views += project.generate_views()
+            expanded_views += project.generate_views(names_only)
         return self._remove_duplicates(expanded_views, "view")
 
     def assign(self, container, id, value, element_type):
@@ -0,0 +1,46 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Partitioning of jobs and views between processes, used by --shard.
+
+import zlib
+from collections import namedtuple
+
+
+class Shard(namedtuple("Shard", "index count")):
+    """Part index of count (starting from 1) of all jobs and views.
+
+    Items are assigned by hash of their top-level folder, or of name for
+    items not in folders, so folders are on the same shard as their
+    children and are created before them. The hash is stable between runs
+    and Python processes.
+    """
+
+    @classmethod
+    def from_string(cls, value):
+        """Parse "index/count" string, like "1/4"; raise ValueError if invalid"""
+        index, sep, count = value.partition("/")
+        if not sep:
+            raise ValueError(f"Shard should be index/count, like 1/4, got {value!r}")
+        shard = cls(int(index), int(count))
+        if not 1 <= shard.index <= shard.count:
+            raise ValueError(
+                f"Shard index should be from 1 to {shard.count}, got {shard.index}"
+            )
+        return shard
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+    def __contains__(self, name):
+        key = name.split("/", 1)[0]
+        return zlib.crc32(key.encode("utf-8")) % self.count == self.index - 1
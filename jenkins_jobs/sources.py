@@ -0,0 +1,340 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Source files jobs and views are generated from, used by --changed-since
+# and --changed-files to regenerate only ones affected by changed files.
+
+import contextvars
+import io
+import json
+import logging
+import os
+import re
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+
+from jenkins_jobs.cache import JobCache
+from jenkins_jobs.errors import JenkinsJobsException
+from jenkins_jobs.version import version_info
+from jenkins_jobs.xml_config import XmlStream
+
+logger = logging.getLogger(__name__)
+
+# Set of source paths of job or view being generated, if recorded.
+_recorded_sources = contextvars.ContextVar("recorded_sources", default=None)
+
+
+def is_recording_sources():
+    return _recorded_sources.get() is not None
+
+
+def record_source(path):
+    """Add path to sources of job or view being generated, if they are recorded"""
+    sources = _recorded_sources.get()
+    if sources is not None and path is not None:
+        sources.add(path)
+
+
+def record_sources(path_list):
+    sources = _recorded_sources.get()
+    if sources is not None:
+        sources.update(path for path in path_list if path is not None)
+
+
+class DefaultsName(str):
+    """Name of defaults used by job or view, recorded among source paths"""
+
+
+def record_defaults(name):
+    """Add defaults name, and global ones merged into them, to sources"""
+    sources = _recorded_sources.get()
+    if sources is not None:
+        sources.add(DefaultsName(str(name)))
+        sources.add(DefaultsName("global"))
+
+
+def record_key_sources(d):
+    """Add files keys of LocDict d come from, like defaults, to sources"""
+    sources = _recorded_sources.get()
+    if sources is not None:
+        sources.update(pos.path for pos in d.key_pos.values() if pos is not None)
+
+
+@contextmanager
+def recording_sources():
+    """Record sources into a new set, also adding them to enclosing one"""
+    sources = set()
+    token = _recorded_sources.set(sources)
+    try:
+        yield sources
+    finally:
+        _recorded_sources.reset(token)
+        record_sources(sources)
+
+
+def _normalize_path(path):
+    return os.path.abspath(os.fspath(path))
+
+
+def _is_pseudo_path(path):
+    # Like "<stdin>" or "<expanded j2-yaml>".
+    return str(path).startswith("<")
+
+
+def _element_paths(roots, kind_list):
+    """Files root elements of kinds, like "defaults", are defined in"""
+    containers = {
+        "defaults": [roots.defaults],
+        "jobs": [roots.jobs],
+        "views": [roots.views],
+        "templates": [roots.job_templates, roots.view_templates],
+        "groups": [roots.job_groups, roots.view_groups],
+        "projects": [roots.projects],
+        "macros": list(roots.macros.values()),
+    }
+    return {
+        _normalize_path(element.pos.path)
+        for kind in kind_list
+        for container in containers[kind]
+        for element in container.values()
+        if element.pos is not None and not _is_pseudo_path(element.pos.path)
+    }
+
+
+def git_changed_files(ref, path_list):
+    """Files changed since git ref, including uncommitted and untracked ones"""
+    # Use repository input files are in, which is not always current one.
+    path = Path(path_list[0]) if path_list else Path.cwd()
+    cwd = path if path.is_dir() else path.parent
+
+    def git(*args):
+        try:
+            result = subprocess.run(
+                ["git", *args],
+                cwd=cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as x:
+            stderr = getattr(x, "stderr", None) or str(x)
+            raise JenkinsJobsException(
+                f"Failed to get files changed since {ref!r}: {stderr.strip()}"
+            )
+        return result.stdout.splitlines()
+
+    top_dir = git("rev-parse", "--show-toplevel")[0]
+    changed = git("diff", "--name-only", "--no-renames", ref, "--")
+    untracked = git("ls-files", "--others", "--exclude-standard", "--full-name")
+    return {_normalize_path(os.path.join(top_dir, p)) for p in changed + untracked}
+
+
+class SourceIndex(object):
+    """Source files of each job and view, kept between runs.
+
+    Sources are files of job or view itself, and of templates, projects,
+    job groups, defaults, macros, included files and jinja2 templates used
+    to generate it. Defaults are also kept by name, with files defining
+    them, so defaults added later to other files are found too. One index
+    is kept per current directory, in the cache directory, so it is shared
+    by all Jenkins servers jobs are uploaded to.
+    """
+
+    format_version = 2
+
+    def __init__(self, jjb_config, changed_files):
+        self._changed_files = {_normalize_path(path) for path in changed_files}
+        cwd_vary = re.sub(r"[^A-Za-z0-9\-\~]", "_", os.getcwd())
+        self.path = os.path.join(
+            JobCache.get_cache_dir(), "sources-" + cwd_vary + ".json"
+        )
+        self._data = {"jobs": {}, "views": {}, "defaults": {}}
+        self._changed_defaults = set()
+        self._allow_duplicates = jjb_config.yamlparser["allow_duplicates"]
+        # Anchors may come from other files; those are not tracked.
+        self._select_all = jjb_config.yamlparser["retain_anchors"]
+        if self._select_all:
+            logger.warning(
+                "Sources are not tracked with retain_anchors;"
+                " regenerating all jobs and views"
+            )
+        elif jjb_config.builder["flush_cache"]:
+            logger.info("Cache flushed; regenerating all jobs and views")
+        else:
+            self._load()
+
+    def _load(self):
+        try:
+            with io.open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            logger.info(
+                "No source index at %s; regenerating all jobs and views", self.path
+            )
+            return
+        except ValueError as x:
+            logger.warning("Ignoring broken source index %s: %s", self.path, x)
+            return
+        if (
+            data.get("format") != self.format_version
+            or data.get("jjb-version") != version_info.version_string()
+        ):
+            logger.info(
+                "Source index %s is from other Jenkins Job Builder version;"
+                " regenerating all jobs and views",
+                self.path,
+            )
+            return
+        self._data = {
+            kind: data.get(kind, {}) for kind in ["jobs", "views", "defaults"]
+        }
+
+    def set_roots(self, roots):
+        """Find changes of definitions of loaded roots; call before select.
+
+        Defaults defined in changed files, by this or previous run, affect
+        jobs and views using them by name. Changed files not in index yet
+        which define macros, or templates and groups if duplicates are
+        allowed, may override ones used by any job or view, so then all of
+        them are affected. Other new definitions give new job and view
+        names, which are always selected.
+        """
+        defaults_paths = {
+            str(name): _normalize_path(defaults.pos.path)
+            for name, defaults in roots.defaults.items()
+            if defaults.pos is not None and not _is_pseudo_path(defaults.pos.path)
+        }
+        old_defaults_paths = self._data["defaults"]
+        self._changed_defaults = {
+            name
+            for name, path in [*defaults_paths.items(), *old_defaults_paths.items()]
+            if path in self._changed_files
+        }
+        self._data["defaults"] = defaults_paths
+        if self._select_all or not (self._data["jobs"] or self._data["views"]):
+            return
+        known_paths = set(old_defaults_paths.values())
+        for kind in ["jobs", "views"]:
+            for entry in self._data[kind].values():
+                known_paths.update(entry["files"])
+        # Macros may mask components; templates and groups may replace
+        # others with the same name only if duplicates are allowed.
+        kind_list = ["macros"]
+        if self._allow_duplicates:
+            kind_list += ["templates", "groups"]
+        new_paths = (
+            _element_paths(roots, kind_list) & self._changed_files
+        ) - known_paths
+        if new_paths:
+            logger.info(
+                "New files %s may override definitions;"
+                " regenerating all jobs and views",
+                ", ".join(sorted(new_paths)),
+            )
+            self._select_all = True
+
+    def _is_affected(self, entry):
+        return not self._changed_files.isdisjoint(
+            entry["files"]
+        ) or not self._changed_defaults.isdisjoint(entry["defaults"])
+
+    def select(self, kind, data_list, prune):
+        """Return jobs or views affected by changed files.
+
+        These are ones with changed sources and ones not known yet. Index
+        entries are dropped for them, until they are generated with
+        RecordingXmlStream. If prune is set, data_list has all jobs or views,
+        and entries of others, which do not exist anymore, are dropped too.
+        """
+        index = self._data[kind]
+        if prune:
+            names = {data.name for data in data_list}
+            for name in list(index):
+                if name not in names:
+                    del index[name]
+        if self._select_all:
+            selected = list(data_list)
+        else:
+            selected = [
+                data
+                for data in data_list
+                if data.name not in index or self._is_affected(index[data.name])
+            ]
+        for data in selected:
+            index.pop(data.name, None)
+        logger.info(
+            "Regenerating %d of %d %s affected by changed files",
+            len(selected),
+            len(data_list),
+            kind,
+        )
+        return selected
+
+    def set(self, kind, name, sources):
+        self._data[kind][name] = {
+            "files": sorted(
+                {
+                    _normalize_path(path)
+                    for path in sources
+                    if not isinstance(path, DefaultsName) and not _is_pseudo_path(path)
+                }
+            ),
+            "defaults": sorted(
+                {str(path) for path in sources if isinstance(path, DefaultsName)}
+            ),
+        }
+
+    def save(self):
+        data = {
+            "format": self.format_version,
+            "jjb-version": version_info.version_string(),
+            **self._data,
+        }
+        # Write and replace, so an interrupted run leaves old index intact.
+        tmp_path = self.path + ".tmp"
+        with io.open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class RecordingXmlStream(XmlStream):
+    """XmlStream of jobs or views affected by changed files.
+
+    Sources of each job or view are recorded into index while it is
+    generated. Names of all jobs or views, including not affected ones,
+    are still in ``names``, so they are kept by --delete-old.
+    """
+
+    def __init__(self, generator, data_list, index, kind, prune, amend_job_dicts=None):
+        selected = index.select(kind, data_list, prune)
+        super().__init__(generator, selected, amend_job_dicts)
+        self._all_names = sorted(data.name for data in data_list)
+        self._index = index
+        self._kind = kind
+
+    @property
+    def names(self):
+        return self._all_names
+
+    @property
+    def skipped_names(self):
+        return sorted(set(self._all_names) - set(super().names))
+
+    def _generate(self, data):
+        with recording_sources() as sources:
+            xml_list = super()._generate(data)
+        # Template, project and job group the item comes from.
+        sources.update(ctx.pos.path for ctx in data.context if ctx.pos is not None)
+        self._index.set(self._kind, data.name, sources)
+        return xml_list
@@ -0,0 +1,150 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# Timers and counters of processing phases, reported with --stats.
+
+import json
+import threading
+import time
+from collections import Counter
+
+from jenkins_jobs.profiler import profiler
+
+__all__ = ["stats"]
+
+
+class _NullTimer(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_null_timer = _NullTimer()
+
+
+class _Timer(object):
+    def __init__(self, stats, name):
+        self._stats = stats
+        self._name = name
+
+    def __enter__(self):
+        if profiler.enabled:
+            profiler.enter_phase(self._name)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stats.add_time(self._name, time.perf_counter() - self._start)
+        if profiler.enabled:
+            profiler.exit_phase(self._name)
+
+
+class Stats(object):
+    """Timers and counters of one jenkins-jobs run.
+
+    Disabled by default; then ``timer`` returns shared no-op context manager
+    and ``add`` does nothing, so instrumented code runs at almost full speed.
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # Timer name -> [number of times it run, total seconds].
+        self.timers = {}
+        self.counters = Counter()
+
+    def timer(self, name):
+        """Return context manager adding time spent in it to timer name"""
+        if not self.enabled:
+            return _null_timer
+        return _Timer(self, name)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            timer = self.timers.setdefault(name, [0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+
+    def add(self, name, value=1):
+        """Add value to counter name"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] += value
+
+    def as_dict(self):
+        return {
+            "timers": {
+                name: {"count": count, "seconds": seconds}
+                for name, (count, seconds) in sorted(self.timers.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def format_table(self):
+        rows = [("Timer", "Count", "Seconds")]
+        for name, (count, seconds) in sorted(self.timers.items()):
+            rows.append((name, str(count), "{0:.3f}".format(seconds)))
+        if self.counters:
+            rows.append(("Counter", "Value", ""))
+            for name, value in sorted(self.counters.items()):
+                rows.append((name, str(value), ""))
+        widths = [max(len(row[idx]) for row in rows) for idx in range(3)]
+        return "\n".join(
+            "{0:<{3}}  {1:>{4}}  {2:>{5}}".format(*row, *widths).rstrip()
+            for row in rows
+        )
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+            f.write("\n")
+
+
+stats = Stats()
+
+
+class InstrumentedJenkins(object):
+    """Wrapper of jenkins.Jenkins timing its calls, as remote calls
+
+    Time of each method is added to timer "remote <method>"; size of job and
+    view configuration sent, to counter "bytes sent"; and failed calls to
+    counter "remote errors".
+    """
+
+    _sending_config = {"create_job", "reconfig_job", "create_view", "reconfig_view"}
+
+    def __init__(self, jenkins):
+        self._jenkins = jenkins
+
+    def __getattr__(self, name):
+        attr = getattr(self._jenkins, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            if name in self._sending_config:
+                stats.add("bytes sent", len(args[1].encode("utf-8")))
+            try:
+                with stats.timer("remote " + name):
+                    return attr(*args, **kwargs)
+            except Exception:
+                stats.add("remote errors")
+                raise
+
+        return call
@@ -35,7 +35,7 @@ class ViewBase(RootBase):
         contents, params = split_contents_params(d, view_contents_keys)
         return cls(
             _defaults=roots.defaults,
-            _expander=Expander(config),
+            _expander=Expander.shared(config),
             _keep_descriptions=keep_descriptions,
             _id=id,
             name=name,
@@ -21,7 +21,10 @@ import sys
 from xml.dom import minidom
 import xml.etree.ElementTree as XML
 
-from jenkins_jobs.errors import JenkinsJobsException
+from jenkins_jobs.alphanum import AlphanumSort
+from jenkins_jobs.errors import Context, JenkinsJobsException
+from jenkins_jobs.profiler import profiler
+from jenkins_jobs.stats import stats
 
 __all__ = ["XmlJobGenerator", "XmlJob"]
 
@@ -48,23 +51,86 @@ def remove_ignorable_whitespace(node):
         remove_ignorable_whitespace(child)
 
 
+def md5_hexdigest(data):
+    with stats.timer("hash"):
+        if sys.version_info[:2] >= (3, 6):
+            # allows md5 use on fips-enabled systems
+            hash_func = hashlib.new("md5", usedforsecurity=False)
+            hash_func.update(data)
+            return hash_func.hexdigest()
+        else:
+            return hashlib.md5(data).hexdigest()
+
+
 class XmlJob(object):
     def __init__(self, xml, name):
         self.xml = xml
         self.name = name
 
     def md5(self):
-        if sys.version_info[:2] >= (3, 6):
-            # allows md5 use on fips-enabled systems
-            hash_func = hashlib.new("md5", usedforsecurity=False)
-            hash_func.update(self.output())
-            return hash_func.hexdigest()
-        else:
-            return hashlib.md5(self.output()).hexdigest()
+        return md5_hexdigest(self.output())
+
+    def output(self):
+        with stats.timer("serialize"):
+            out = minidom.parseString(XML.tostring(self.xml, encoding="UTF-8"))
+            return out.toprettyxml(indent="  ", encoding="utf-8")
+
+    def serialized(self):
+        return SerializedXmlJob(self.output(), self.name)
+
+
+class SerializedXmlJob(object):
+    """XmlJob output, without element tree kept"""
+
+    def __init__(self, output, name):
+        self._output = output
+        self.name = name
+
+    def md5(self):
+        return md5_hexdigest(self._output)
 
     def output(self):
-        out = minidom.parseString(XML.tostring(self.xml, encoding="UTF-8"))
-        return out.toprettyxml(indent="  ", encoding="utf-8")
+        return self._output
+
+    def serialized(self):
+        return self
+
+
+class XmlStream(object):
+    """XML of jobs or views, generated one by one while iterating.
+
+    Takes jobs or views generated with names only (see Roots.generate_jobs)
+    and yields their XmlJob sorted by name. Data of each one is expanded
+    only when it is reached.
+    """
+
+    def __init__(self, generator, data_list, amend_job_dicts=None):
+        self._generator = generator
+        self._data_list = sorted(data_list, key=AlphanumSort)
+        self._amend_job_dicts = amend_job_dicts
+
+    def __len__(self):
+        return len(self._data_list)
+
+    @property
+    def names(self):
+        return [data.name for data in self._data_list]
+
+    @property
+    def skipped_names(self):
+        """Names of items which are not generated, but still exist"""
+        return []
+
+    def __iter__(self):
+        for data in self._data_list:
+            yield from self._generate(data)
+
+    def _generate(self, data):
+        with stats.timer("expand"):
+            data = data.expanded()
+        if self._amend_job_dicts:
+            self._amend_job_dicts([data])
+        return self._generator.generateXML([data])
 
 
 class XmlGenerator(object):
@@ -83,8 +149,13 @@ class XmlGenerator(object):
     def generateXML(self, data_list):
         xml_objs = []
         for data in data_list:
+            # Innermost context is job or view template it was expanded from.
+            root_context = data.context[-1] if data.context else Context("", None)
             try:
-                xml_objs.append(self._getXMLForData(data.data))
+                with stats.timer("gen_xml"), profiler.cost(
+                    root_context.message, root_context.pos
+                ):
+                    xml_objs.append(self._getXMLForData(data.data))
             except JenkinsJobsException as x:
                 raise x.with_ctx_list(data.context)
         return xml_objs
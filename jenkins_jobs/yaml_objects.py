@@ -170,9 +170,11 @@ Examples:
 """
 
 import abc
+import contextvars
 import logging
 import traceback
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 import jinja2
@@ -183,6 +185,7 @@ from .errors import Context, JenkinsJobsException
 from .loc_loader import LocList
 from .position import Pos
 from .formatter import CustomFormatter, enum_str_format_required_params
+from .sources import is_recording_sources, record_source, record_sources
 
 if sys.version_info >= (3, 8):
     from functools import cached_property
@@ -191,6 +194,94 @@ else:
 
 logger = logging.getLogger(__name__)
 
+# Loader to bind yaml objects to when they are unpickled.
+unpickling_loader = contextvars.ContextVar("unpickling_loader")
+
+
+@lru_cache(maxsize=None)
+def _jinja2_env(search_path, cache_dir):
+    """Environment shared by all templates with same search path"""
+    if cache_dir:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(cache_dir)
+    else:
+        bytecode_cache = None
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(search_path),
+        undefined=jinja2.StrictUndefined,
+        bytecode_cache=bytecode_cache,
+    )
+
+
+@lru_cache(maxsize=1024)
+def _compile_template(env, template_text):
+    """Compile template, reusing ones compiled before for the same text"""
+    bytecode_cache = env.bytecode_cache
+    if bytecode_cache is None:
+        return env.from_string(template_text)
+    # There are no template names for strings, so use text itself as the key.
+    bucket = bytecode_cache.get_bucket(env, template_text, None, template_text)
+    if bucket.code is None:
+        bucket.code = env.compile(template_text)
+        bytecode_cache.set_bucket(bucket)
+    return env.template_class.from_code(env, bucket.code, env.make_globals(None))
+
+
+@lru_cache(maxsize=1024)
+def _parse_template(env, template_text):
+    """Return templates referenced by template and it's undeclared variables"""
+    ast = env.parse(template_text)
+    return (
+        tuple(jinja2.meta.find_referenced_templates(ast)),
+        frozenset(jinja2.meta.find_undeclared_variables(ast)),
+    )
+
+
+class IncludeFiles:
+    """Files included by yaml objects; resolved, read and parsed once per run"""
+
+    def __init__(self):
+        self._path_index = {}  # (dir list, rel path) -> (dir, full path).
+        self._text_cache = {}  # full path -> (mtime, text).
+        self._data_cache = {}  # (loader, full path) -> (mtime, data).
+
+    def find(self, dir_list, rel_path):
+        key = (dir_list, rel_path)
+        try:
+            return self._path_index[key]
+        except KeyError:
+            pass
+        for dir in dir_list:
+            candidate = dir.joinpath(rel_path)
+            if candidate.is_file():
+                self._path_index[key] = (dir, candidate)
+                return (dir, candidate)
+        return (None, None)
+
+    def read_text(self, path):
+        record_source(path)
+        mtime = path.stat().st_mtime_ns
+        cached = self._text_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        text = path.read_text()
+        self._text_cache[path] = (mtime, text)
+        return text
+
+    def load(self, loader, path):
+        # Included file may refer anchors from the including one,
+        # so data parsed by one loader is not reused by others.
+        key = (loader, path)
+        record_source(path)
+        mtime = path.stat().st_mtime_ns
+        cached = self._data_cache.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        text = self.read_text(path)
+        data = loader.load(text, source_path=path, source_dir=path.parent)
+        self._data_cache[key] = (mtime, data)
+        return data
+
 
 class BaseYamlObject(metaclass=abc.ABCMeta):
     @staticmethod
@@ -221,27 +312,36 @@ class BaseYamlObject(metaclass=abc.ABCMeta):
         if loader.source_dir:
             # Loaded from a file, find includes beside it too.
             self._search_path.append(loader.source_dir)
+        dir_list = self._search_path.copy()
+        if "." not in dir_list:
+            dir_list.append(".")
+        self._include_dirs = tuple(Path(d).expanduser() for d in dir_list)
         self._loader = loader
         self._pos = pos
         allow_empty = jjb_config.yamlparser["allow_empty_variables"]
         self._formatter = CustomFormatter(allow_empty)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_loader"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._loader = unpickling_loader.get()
+
     @abc.abstractmethod
     def expand(self, expander, params):
         """Expand object and substitute template parameters"""
         pass
 
     def _find_file(self, rel_path, pos):
-        search_path = self._search_path
-        if "." not in search_path:
-            search_path.append(".")
-        dir_list = [Path(d).expanduser() for d in self._search_path]
-        for dir in dir_list:
-            candidate = dir.joinpath(rel_path)
-            if candidate.is_file():
-                logger.debug("Including file %r from path %r", str(rel_path), str(dir))
-                return candidate
-        dir_list_str = ",".join(str(d) for d in dir_list)
+        include_files = self._loader.include_files
+        dir, full_path = include_files.find(self._include_dirs, str(rel_path))
+        if full_path:
+            logger.debug("Including file %r from path %r", str(rel_path), str(dir))
+            return full_path
+        dir_list_str = ",".join(str(d) for d in self._include_dirs)
         raise JenkinsJobsException(
             f"File {rel_path} does not exist in any of include directories: {dir_list_str}",
             pos=pos,
@@ -255,15 +355,57 @@ class BaseYamlObject(metaclass=abc.ABCMeta):
 class J2BaseYamlObject(BaseYamlObject):
     def __init__(self, jjb_config, loader, pos):
         super().__init__(jjb_config, loader, pos)
-        self._jinja2_env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(self._search_path),
-            undefined=jinja2.StrictUndefined,
-        )
+        self._jinja2_cache_dir = jjb_config.yamlparser["jinja2_cache_dir"]
+        self._jinja2_env = self._create_jinja2_env()
+        # Template text -> paths of templates it includes.
+        self._referenced_paths = {}
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        del state["_jinja2_env"]
+        # Included templates may change before state is loaded.
+        del state["_referenced_paths"]
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._jinja2_env = self._create_jinja2_env()
+        self._referenced_paths = {}
+
+    def _create_jinja2_env(self):
+        return _jinja2_env(tuple(self._search_path), self._jinja2_cache_dir)
+
+    def _referenced_template_paths(self, template_text):
+        """Return files of templates included by this one, recursively"""
+        try:
+            return self._referenced_paths[template_text]
+        except KeyError:
+            pass
+        paths = set()
+        # Templates may include each other, so each one is visited once.
+        pending = [template_text]
+        while pending:
+            referenced_templates, _ = _parse_template(self._jinja2_env, pending.pop())
+            for rt in referenced_templates:
+                if rt is None:
+                    # Name is known only while rendering.
+                    continue
+                full_path = self._find_file(rt, 0)
+                if full_path in paths:
+                    continue
+                paths.add(full_path)
+                pending.append(self._loader.include_files.read_text(full_path))
+        self._referenced_paths[template_text] = paths
+        return paths
 
     def _render_template(self, pos, template_text, template, params):
+        if is_recording_sources():
+            record_sources(self._referenced_template_paths(template_text))
         try:
             return template.render(params)
         except jinja2.UndefinedError as x:
+            if pos is None:
+                raise JenkinsJobsException(str(x))
             # Jinja2 adds fake traceback entry with template line number.
             tb = traceback.extract_tb(x.__traceback__)
             line_ofs = tb[-1].lineno - 1  # traceback lineno starts with 1.
@@ -292,7 +434,16 @@ class J2Template(J2BaseYamlObject):
     def __init__(self, jjb_config, loader, pos, template_text):
         super().__init__(jjb_config, loader, pos)
         self._template_text = template_text
-        self._template = self._jinja2_env.from_string(template_text)
+        self._template = _compile_template(self._jinja2_env, template_text)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        del state["_template"]
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._template = _compile_template(self._jinja2_env, self._template_text)
 
     def _params_from_referenced_templates(self, template_text):
         """
@@ -300,14 +451,17 @@ class J2Template(J2BaseYamlObject):
         (nested) included template(s)
         """
         required_params = set()
-        ast = self._jinja2_env.parse(template_text)
-        for rt in jinja2.meta.find_referenced_templates(ast):
+        referenced_templates, undeclared_variables = _parse_template(
+            self._jinja2_env, template_text
+        )
+        for rt in referenced_templates:
             # recursive call to find params also from nested includes
-            template_text = Path(self._find_file(rt, 0)).read_text()
+            full_path = self._find_file(rt, 0)
+            template_text = self._loader.include_files.read_text(full_path)
             required_params.update(
                 self._params_from_referenced_templates(template_text)
             )
-        required_params.update(jinja2.meta.find_undeclared_variables(ast))
+        required_params.update(undeclared_variables)
         return required_params
 
     @cached_property
@@ -363,8 +517,8 @@ class IncludeJinja2(J2BaseYamlObject):
     def _expand_path(self, path_template, pos, expander, params):
         rel_path = self._formatter.format(path_template, **params)
         full_path = self._find_file(rel_path, pos)
-        template_text = full_path.read_text()
-        template = self._jinja2_env.from_string(template_text)
+        template_text = self._loader.include_files.read_text(full_path)
+        template = _compile_template(self._jinja2_env, template_text)
         pos = Pos.from_file(full_path, template_text)
         try:
             return self._render_template(pos, template_text, template, params)
@@ -382,12 +536,15 @@ class IncludeBaseObject(BaseYamlObject):
         super().__init__(jjb_config, loader, pos)
         self._path_list = path_list
 
-    @property
+    @cached_property
     def required_params(self):
-        for idx, path in enumerate(self._path_list):
-            yield from enum_str_format_required_params(
+        return [
+            param
+            for idx, path in enumerate(self._path_list)
+            for param in enum_str_format_required_params(
                 path, pos=self._path_list.value_pos[idx]
             )
+        ]
 
 
 class YamlInclude(IncludeBaseObject):
@@ -403,7 +560,7 @@ class YamlInclude(IncludeBaseObject):
     def _expand_path(self, path_template, pos, expander, params):
         rel_path = self._formatter.format(path_template, **params)
         full_path = self._find_file(rel_path, pos)
-        data = self._loader.load_path(full_path)
+        data = self._loader.include_files.load(self._loader, full_path)
         try:
             return expander.expand(data, params)
         except JenkinsJobsException as x:
@@ -421,7 +578,7 @@ class IncludeRawExpand(IncludeRawBase):
     def _expand_path(self, rel_path_template, pos, params):
         rel_path = self._formatter.format(rel_path_template, **params)
         full_path = self._find_file(rel_path, pos)
-        template = full_path.read_text()
+        template = self._loader.include_files.read_text(full_path)
         try:
             return self._formatter.format(template, **params)
         except JenkinsJobsException as x:
@@ -434,7 +591,7 @@ class IncludeRawVerbatim(IncludeRawBase):
     def _expand_path(self, rel_path_template, pos, params):
         rel_path = self._formatter.format(rel_path_template, **params)
         full_path = self._find_file(rel_path, pos)
-        return full_path.read_text()
+        return self._loader.include_files.read_text(full_path)
 
 
 class YamlListJoin:
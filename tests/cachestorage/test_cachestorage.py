@@ -18,6 +18,7 @@ import os.path
 import pytest
 
 import jenkins_jobs
+from jenkins_jobs.sharding import Shard
 
 
 # Override fixture - do not use this mock.
@@ -50,3 +51,101 @@ def test_cache_file(mocker):
     mocker.patch("yaml.safe_load")
     mocker.patch("jenkins_jobs.builder.JobCache._lock")
     jenkins_jobs.builder.JobCache("dummy").data = None
+
+
+def test_shard_cache_merged(mocker, tmp_path):
+    """
+    Test that shard caches are merged, newer ones taking precedence.
+    """
+    mocker.patch("jenkins_jobs.builder.JobCache.get_cache_dir", lambda x: str(tmp_path))
+    mocker.patch("jenkins_jobs.builder.JobCache.save")
+    main_file = tmp_path / "cache-host-jobs-dummy.yml"
+    shard_file = tmp_path / "cache-host-jobs-dummy-shard-2-of-2.yml"
+    main_file.write_text("job-a: old\nother: old\n")
+    shard_file.write_text("job-a: new\n")
+    os.utime(main_file, (0, 0))
+
+    cache = jenkins_jobs.builder.JobCache("dummy")
+    assert cache.data == {"job-a": "new", "other": "old"}
+    cache._unlock()
+
+    # Jobs of other shards are not in its cache.
+    assert "job-a" in Shard(2, 2) and "other" not in Shard(2, 2)
+    cache = jenkins_jobs.builder.JobCache("dummy", shard=Shard(2, 2))
+    assert cache.cachefilename == str(shard_file)
+    assert cache.data == {"job-a": "new"}
+    cache._unlock()
+
+
+@pytest.fixture
+def cache_dir(mocker, tmp_path):
+    mocker.patch("jenkins_jobs.builder.JobCache.get_cache_dir", lambda x: str(tmp_path))
+    return tmp_path
+
+
+def make_cache(**kwargs):
+    cache = jenkins_jobs.builder.JobCache("dummy", **kwargs)
+    cache.save()
+    cache._unlock()
+    return cache
+
+
+def test_clear_after_shard_run(cache_dir):
+    """
+    Test that clearing the cache, as delete-all does, drops shard caches.
+    """
+    shard_cache = jenkins_jobs.builder.JobCache("dummy", shard=Shard(1, 2))
+    shard_cache.set("other", "md5")
+    shard_cache.save()
+    shard_cache._unlock()
+
+    cache = jenkins_jobs.builder.JobCache("dummy")
+    assert cache.has_changed("other", "md5") is False
+    cache.clear()
+    cache.save()
+    cache._unlock()
+
+    assert list(cache_dir.glob("*-shard-*.yml")) == []
+    assert make_cache().data == {}
+    assert make_cache(shard=Shard(1, 2)).data == {}
+
+
+def test_flush_after_shard_run(cache_dir):
+    """
+    Test that flushed cache does not keep data of shard caches.
+    """
+    (cache_dir / "cache-host-jobs-dummy-shard-1-of-2.yml").write_text("other: md5\n")
+    cache = jenkins_jobs.builder.JobCache("dummy", flush=True)
+    cache.set("job-a", "md5")
+    cache.save()
+    cache._unlock()
+
+    assert list(cache_dir.glob("*-shard-*.yml")) == []
+    assert make_cache().data == {"job-a": "md5"}
+
+
+def test_shard_cache_authoritative(cache_dir):
+    """
+    Test that jobs missing from newer shard cache are dropped.
+    """
+    main_file = cache_dir / "cache-host-jobs-dummy.yml"
+    main_file.write_text("job-a: md5\nother: md5\n")
+    os.utime(main_file, (0, 0))
+    make_cache(shard=Shard(2, 2), flush=True)
+    assert make_cache().data == {"other": "md5"}
+
+
+def test_old_shard_count_removed(cache_dir):
+    """
+    Test that caches of other shard count are removed once all shards ran.
+    """
+    old_file = cache_dir / "cache-host-jobs-dummy-shard-2-of-2.yml"
+    old_file.write_text("job-a: old\nz: md5\n")
+    os.utime(old_file, (0, 0))
+    make_cache(shard=Shard(1, 3))
+    make_cache(shard=Shard(2, 3))
+    assert old_file.exists()
+    # Data of old shards is carried over by new ones.
+    assert make_cache(shard=Shard(3, 3)).data == {"z": "md5"}
+    assert not old_file.exists()
+    assert make_cache().data == {"job-a": "old", "z": "md5"}
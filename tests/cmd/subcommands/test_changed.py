@@ -0,0 +1,235 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import shutil
+import subprocess
+
+import pytest
+
+from jenkins_jobs.errors import JenkinsJobsException
+
+TREE = {
+    "defaults.yaml": """\
+- defaults:
+    name: global
+    node: builder
+""",
+    "defaults-c.yaml": """\
+- defaults:
+    name: c-defaults
+    branch: main
+""",
+    "macros.yaml": """\
+- builder:
+    name: build
+    builders:
+      - shell: !include-raw-expand: build.sh
+""",
+    "build.sh": "make {target}\n",
+    "jobs-a.yaml": """\
+- job-template:
+    name: a-{target}
+    builders:
+      - build:
+          target: '{target}'
+
+- project:
+    name: project-a
+    target: [all, check]
+    jobs:
+      - a-{target}
+""",
+    "jobs-b.yaml": """\
+- job:
+    name: b
+    description: !j2: |
+      {% include 'common.j2' %}
+
+- job-template:
+    name: c
+    defaults: c-defaults
+    description: On {branch}
+
+- project:
+    name: project-c
+    jobs:
+      - c
+""",
+    "common.j2": "Common description\n",
+    "views.yaml": """\
+- view:
+    name: view-a
+    view-type: list
+""",
+}
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    # Keep source index away from user's cache, and make it per test.
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.chdir(tmp_path)
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    for name, text in TREE.items():
+        (tree / name).write_text(text)
+    return tree
+
+
+@pytest.fixture
+def run_test(tmp_path, tree, default_config_file, execute_jenkins_jobs):
+    out_dir = tmp_path / "out"
+
+    def run(*args):
+        """Run test command with args, return names of output files"""
+        shutil.rmtree(out_dir, ignore_errors=True)
+        execute_jenkins_jobs(
+            [
+                "--conf",
+                default_config_file,
+                "test",
+                "--config-xml",
+                *args,
+                "-o",
+                str(out_dir),
+                str(tree),
+            ]
+        )
+        return sorted(path.name for path in out_dir.iterdir())
+
+    return run
+
+
+def test_first_run_generates_all(tree, run_test):
+    assert run_test("--changed-files", "nothing.yaml") == [
+        "a-all",
+        "a-check",
+        "b",
+        "c",
+        "view-a",
+    ]
+    assert run_test("--changed-files", "nothing.yaml") == []
+
+
+@pytest.mark.parametrize(
+    "changed,expected",
+    [
+        ("jobs-a.yaml", ["a-all", "a-check"]),
+        ("macros.yaml", ["a-all", "a-check"]),
+        ("build.sh", ["a-all", "a-check"]),
+        ("common.j2", ["b"]),
+        ("defaults-c.yaml", ["c"]),
+        # Global defaults apply to all jobs and views.
+        ("defaults.yaml", ["a-all", "a-check", "b", "c", "view-a"]),
+        ("views.yaml", ["view-a"]),
+    ],
+)
+def test_changed_files(tree, run_test, changed, expected):
+    run_test("--changed-files", "nothing.yaml")
+    assert run_test("--changed-files", str(tree / changed)) == expected
+    # Index is kept for not affected ones, and restored for regenerated ones.
+    assert run_test("--changed-files", str(tree / changed)) == expected
+
+
+def test_new_job(tree, run_test):
+    run_test("--changed-files", "nothing.yaml")
+    (tree / "jobs-d.yaml").write_text("- job:\n    name: d\n")
+    assert run_test("--changed-files", str(tree / "jobs-d.yaml")) == ["d"]
+
+
+def test_changed_since(tree, run_test):
+    def git(*args):
+        subprocess.run(
+            ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+            cwd=tree,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+    git("init")
+    git("add", ".")
+    git("commit", "-m", "Initial")
+    run_test("--changed-since", "HEAD")
+    (tree / "common.j2").write_text("Changed description\n")
+    (tree / "jobs-e.yaml").write_text("- job:\n    name: e\n")
+    assert run_test("--changed-since", "HEAD") == ["b", "e"]
+
+
+def test_changed_since_bad_ref(tree, run_test):
+    with pytest.raises(JenkinsJobsException) as excinfo:
+        run_test("--changed-since", "no-such-ref")
+    assert "Failed to get files changed since 'no-such-ref'" in str(excinfo.value)
+
+
+def test_changed_files_delete_old(tree, run_test):
+    with pytest.raises(JenkinsJobsException) as excinfo:
+        run_test("--changed-files", "nothing.yaml", "--delete-old")
+    assert "--delete-old can not be used" in str(excinfo.value)
+
+
+def test_recursive_j2_includes(tree, run_test):
+    (tree / "loop-a.j2").write_text(
+        "{% if false %}{% include 'loop-b.j2' %}{% endif %}A"
+    )
+    (tree / "loop-b.j2").write_text(
+        "{% if false %}{% include 'loop-a.j2' %}{% endif %}B"
+    )
+    (tree / "jobs-d.yaml").write_text(
+        "- job:\n"
+        "    name: d\n"
+        "    description: !j2: |\n"
+        "      {% include 'loop-a.j2' %}\n"
+    )
+    run_test("--changed-files", "nothing.yaml")
+    assert run_test("--changed-files", str(tree / "loop-b.j2")) == ["d"]
+
+
+def test_new_global_defaults_file(tree, run_test, tmp_path):
+    run_test("--changed-files", "nothing.yaml")
+    # Loaded after defaults.yaml, so replaces global defaults from it.
+    (tree / "global-defaults.yaml").write_text(
+        "- defaults:\n" "    name: global\n" "    description: from-global\n"
+    )
+    changed = str(tree / "global-defaults.yaml")
+    assert run_test("--changed-files", changed) == [
+        "a-all",
+        "a-check",
+        "b",
+        "c",
+        "view-a",
+    ]
+    assert "from-global" in (tmp_path / "out" / "a-all" / "config.xml").read_text()
+
+
+def test_defaults_key_added(tree, run_test):
+    (tree / "defaults-e.yaml").write_text("- defaults:\n    name: e-defaults\n")
+    (tree / "jobs-e.yaml").write_text("- job:\n    name: e\n    defaults: e-defaults\n")
+    run_test("--changed-files", "nothing.yaml")
+    (tree / "defaults-e.yaml").write_text(
+        "- defaults:\n    name: e-defaults\n    node: e-node\n"
+    )
+    assert run_test("--changed-files", str(tree / "defaults-e.yaml")) == ["e"]
+
+
+def test_new_macro_file(tree, run_test):
+    run_test("--changed-files", "nothing.yaml")
+    # New macro may mask a component used by any job.
+    (tree / "macros-new.yaml").write_text(
+        "- builder:\n    name: deploy\n    builders: []\n"
+    )
+    assert run_test("--changed-files", str(tree / "macros-new.yaml")) == [
+        "a-all",
+        "a-check",
+        "b",
+        "c",
+        "view-a",
+    ]
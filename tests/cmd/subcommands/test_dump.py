@@ -0,0 +1,82 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def execute_dump(capsys, default_config_file, execute_jenkins_jobs):
+    def execute(path, names=(), args=()):
+        execute_jenkins_jobs(
+            ["--conf", default_config_file, "dump", *args, str(path), *names]
+        )
+        return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    return execute
+
+
+def test_dump_ndjson(fixtures_dir, execute_dump):
+    records = execute_dump(
+        fixtures_dir / "cmd-002.yaml", ["bam001", "bar*"], ["--format", "ndjson"]
+    )
+    # Data is dumped after modules amended it, as XML is generated from it.
+    suffix = "<!-- Managed by Jenkins Job Builder -->"
+    assert records == [
+        {
+            "type": "job",
+            "name": "bam001",
+            "data": {
+                "name": "bam001",
+                "disabled": True,
+                "description": "My fourth job" + suffix,
+            },
+        },
+        {
+            "type": "job",
+            "name": "bar001",
+            "data": {"name": "bar001", "description": "My first job" + suffix},
+        },
+        {
+            "type": "job",
+            "name": "bar002",
+            "data": {
+                "name": "bar002",
+                "disabled": False,
+                "description": "My second job" + suffix,
+            },
+        },
+    ]
+    assert "pos" not in records[0]
+
+
+def test_dump_views_with_positions(fixtures_dir, execute_dump):
+    path = fixtures_dir / "update-both.yaml"
+    records = execute_dump(path, ["*-1"], ["--positions"])
+    assert [(r["type"], r["name"]) for r in records] == [
+        ("job", "job-1"),
+        ("view", "view-1"),
+    ]
+    assert records[0]["pos"] == {"path": str(path), "line": 3, "column": 3}
+    assert records[1]["pos"] == {"path": str(path), "line": 7, "column": 3}
+    assert [c["message"] for c in records[1]["context"]] == [
+        "In project 'sample-project'",
+        "Defined here",
+        "In view template 'view-{num}'",
+    ]
+
+
+def test_dump_unknown_format(capsys, fixtures_dir, execute_dump):
+    with pytest.raises(SystemExit):
+        execute_dump(fixtures_dir / "cmd-002.yaml", args=["--format", "yaml"])
+    assert "invalid choice: 'yaml'" in capsys.readouterr().err
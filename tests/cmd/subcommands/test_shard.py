@@ -0,0 +1,112 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import shutil
+
+import pytest
+
+from jenkins_jobs.errors import JenkinsJobsException
+from jenkins_jobs.sharding import Shard
+
+JOBS = """\
+- job-template:
+    name: 'job-{num}'
+- job-template:
+    name: 'folder-{num}'
+    project-type: folder
+- job-template:
+    name: 'folder-{num}/job'
+- project:
+    name: project
+    num: [1, 2, 3, 4, 5, 6, 7, 8]
+    jobs:
+      - 'job-{num}'
+      - 'folder-{num}'
+      - 'folder-{num}/job'
+- view:
+    name: view
+    view-type: list
+"""
+
+
+@pytest.fixture
+def run_test(tmp_path, default_config_file, execute_jenkins_jobs):
+    jobs_file = tmp_path / "jobs.yaml"
+    jobs_file.write_text(JOBS)
+    out_dir = tmp_path / "out"
+
+    def run(*args):
+        """Run test command with args, return names of output jobs and views"""
+        shutil.rmtree(out_dir, ignore_errors=True)
+        execute_jenkins_jobs(
+            [
+                "--conf",
+                default_config_file,
+                "test",
+                "--config-xml",
+                *args,
+                "-o",
+                str(out_dir),
+                str(jobs_file),
+            ]
+        )
+        return {
+            path.parent.relative_to(out_dir).as_posix()
+            for path in out_dir.rglob("config.xml")
+        }
+
+    return run
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("1/1", Shard(1, 1)),
+        ("2/4", Shard(2, 4)),
+    ],
+)
+def test_shard_from_string(value, expected):
+    assert Shard.from_string(value) == expected
+    assert str(expected) == value
+
+
+@pytest.mark.parametrize("value", ["1", "0/2", "3/2", "a/b", "1/0"])
+def test_shard_from_string_invalid(value):
+    with pytest.raises(ValueError):
+        Shard.from_string(value)
+
+
+def test_shards_partition_jobs(run_test):
+    all_names = run_test()
+    assert len(all_names) == 25
+    shard_names = [run_test("--shard", f"{index}/3") for index in [1, 2, 3]]
+    assert set().union(*shard_names) == all_names
+    assert sum(len(names) for names in shard_names) == len(all_names)
+    # Folders are on the same shard as their jobs.
+    for names in shard_names:
+        for name in names:
+            if name.startswith("folder-"):
+                assert name.split("/")[0] in names
+    # Assignment is stable.
+    assert run_test("--shard", "1/3") == shard_names[0]
+
+
+def test_shard_delete_old(run_test):
+    with pytest.raises(JenkinsJobsException) as excinfo:
+        run_test("--shard", "1/2", "--delete-old")
+    assert "--delete-old can not be used with --shard" in str(excinfo.value)
+
+
+def test_shard_invalid(run_test, capsys):
+    with pytest.raises(SystemExit):
+        run_test("--shard", "3/2")
+    assert "Shard index should be from 1 to 2" in capsys.readouterr().err
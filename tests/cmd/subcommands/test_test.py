@@ -22,14 +22,19 @@ import filecmp
 import io
 import difflib
 import os
+import tarfile
 import yaml
+import zipfile
+from pathlib import Path
 from unittest import mock
 
 import jenkins
 import pytest
 from testtools.assertions import assert_that
 
+from jenkins_jobs.archive import OutputArchive
 from jenkins_jobs.cli import entry
+from jenkins_jobs.errors import JenkinsJobsException
 
 
 def test_non_existing_job(fixtures_dir, default_config_file, execute_jenkins_jobs):
@@ -107,6 +112,80 @@ def test_output_dir_config_xml(tmp_path, fixtures_dir, execute_jenkins_jobs):
     assert tmp_path.joinpath("foo-job", "config.xml").exists()
 
 
+def test_output_dir_unchanged_kept(tmp_path, fixtures_dir, execute_jenkins_jobs):
+    """
+    Run test mode with output to directory twice and verify that files
+    with unchanged content are not written again.
+    """
+    args = ["test", str(fixtures_dir / "cmd-001.yaml"), "-o", str(tmp_path)]
+    execute_jenkins_jobs(args)
+    job_path = tmp_path / "foo-job"
+    os.utime(job_path, ns=(0, 0))
+    execute_jenkins_jobs(args + ["--workers", "2"])
+    assert job_path.stat().st_mtime_ns == 0
+
+
+def test_output_dir_line_endings_changed(tmp_path, fixtures_dir, execute_jenkins_jobs):
+    """
+    Run test mode with output to directory and verify that file differing
+    only in line endings is written again.
+    """
+    args = ["test", str(fixtures_dir / "cmd-001.yaml"), "-o", str(tmp_path)]
+    execute_jenkins_jobs(args)
+    job_path = tmp_path / "foo-job"
+    expected = job_path.read_bytes()
+    job_path.write_bytes(expected.replace(b"\n", b"\r\n"))
+    execute_jenkins_jobs(args)
+    assert job_path.read_bytes() == expected
+
+
+def test_output_dir_delete_old(tmp_path, fixtures_dir, execute_jenkins_jobs):
+    """
+    Run test mode with output to directory and --delete-old option and
+    verify that files of jobs not generated anymore are removed, and
+    other files are kept.
+    """
+    managed = (
+        "<project><description>"
+        "&lt;!-- Managed by Jenkins Job Builder --&gt;"
+        "</description></project>"
+    )
+    for name in ["old-job", "folder/old-job", "manual-job"]:
+        tmp_path.joinpath(name).mkdir(parents=True)
+    tmp_path.joinpath("old-job", "config.xml").write_text(managed)
+    tmp_path.joinpath("folder", "old-job", "config.xml").write_text(managed)
+    tmp_path.joinpath("manual-job", "config.xml").write_text("<project/>")
+    tmp_path.joinpath("README").write_text("Generated jobs\n")
+    args = [
+        "test",
+        str(fixtures_dir / "cmd-001.yaml"),
+        "-o",
+        str(tmp_path),
+        "--config-xml",
+        "--delete-old",
+        "--workers",
+        "0",
+    ]
+    execute_jenkins_jobs(args)
+    assert sorted(p.relative_to(tmp_path) for p in tmp_path.rglob("*")) == [
+        Path("README"),
+        Path("foo-job"),
+        Path("foo-job/config.xml"),
+        Path("manual-job"),
+        Path("manual-job/config.xml"),
+    ]
+
+
+def test_output_dir_delete_old_names(tmp_path, fixtures_dir, execute_jenkins_jobs):
+    """
+    Verify that --delete-old is refused when job names are given.
+    """
+    args = ["test", str(fixtures_dir / "cmd-001.yaml"), "foo-job"]
+    with pytest.raises(JenkinsJobsException) as excinfo:
+        execute_jenkins_jobs(args + ["-o", str(tmp_path), "--delete-old"])
+    assert "--delete-old can not be used with job or view names" in str(excinfo.value)
+
+
 def test_stream_input_output_no_encoding_exceed_recursion(
     mocker, fixtures_dir, execute_jenkins_jobs
 ):
@@ -410,6 +489,60 @@ def test_multi_path(
     assert_that(output_dir, MatchesDir(fixtures_dir / "multi-path/output_simple"))
 
 
+def test_multi_path_streaming(
+    fixtures_dir, default_config_file, execute_jenkins_jobs, output_dir, multipath
+):
+    """
+    Run test mode in streaming mode and verify output is the same.
+    """
+    args = [
+        "--conf",
+        default_config_file,
+        "test",
+        "--streaming",
+        "-o",
+        output_dir,
+        multipath,
+    ]
+
+    execute_jenkins_jobs(args)
+    assert_that(output_dir, MatchesDir(fixtures_dir / "multi-path/output_simple"))
+
+
+@pytest.mark.parametrize("suffix", [".tar", ".tar.gz", ".tar.bz2", ".tar.xz", ".zip"])
+def test_multi_path_output_archive(
+    tmp_path, execute_jenkins_jobs, default_config_file, output_dir, multipath, suffix
+):
+    """
+    Run test mode with output to archive and verify that it has the same
+    files as output directory, and is the same for every run.
+    """
+    base_args = ["--conf", default_config_file, "test", "--config-xml"]
+    execute_jenkins_jobs(base_args + ["-o", output_dir, multipath])
+    archive_path = tmp_path / f"output{suffix}"
+    execute_jenkins_jobs(base_args + ["--output-archive", str(archive_path), multipath])
+
+    if suffix == ".zip":
+        with zipfile.ZipFile(archive_path) as archive:
+            files = {name: archive.read(name) for name in archive.namelist()}
+    else:
+        with tarfile.open(archive_path) as archive:
+            files = {
+                info.name: archive.extractfile(info).read()
+                for info in archive.getmembers()
+            }
+    expected_files = {
+        str(path.relative_to(output_dir)): path.read_bytes()
+        for path in Path(output_dir).rglob("*")
+        if path.is_file()
+    }
+    assert files == expected_files
+
+    archive_data = archive_path.read_bytes()
+    execute_jenkins_jobs(base_args + ["--output-archive", str(archive_path), multipath])
+    assert archive_path.read_bytes() == archive_data
+
+
 def test_recursive_multi_path_command_line(
     fixtures_dir, default_config_file, execute_jenkins_jobs, output_dir, multipath
 ):
@@ -470,3 +603,81 @@ def test_recursive_multi_path_with_excludes(
         output_dir,
         MatchesDir(fixtures_dir / "multi-path/output_recursive_with_excludes"),
     )
+
+
+def test_fast_load_error_location(fixtures_dir, execute_jenkins_jobs):
+    """
+    Run test mode in fast load mode with an erroneous input and verify
+    that error is reported with source location.
+    """
+    error_fixtures_dir = (fixtures_dir / "../../yamlparser/error_fixtures").resolve()
+    path = error_fixtures_dir / "failure_formatting_params.yaml"
+    args = ["--fast-load", "test", str(path)]
+    with pytest.raises(JenkinsJobsException) as excinfo:
+        execute_jenkins_jobs(args)
+    expected_error = path.with_suffix(".error").read_text().rstrip()
+    error = "\n".join(excinfo.value.lines)
+    assert error.replace(str(error_fixtures_dir) + "/", "") == expected_error
+
+
+def test_output_archive_zstd_missing(tmp_path, mocker):
+    """
+    Verify that no file is left when .zst archive can not be written.
+    """
+    mocker.patch("jenkins_jobs.archive.zstandard", None)
+    archive_path = tmp_path / "output.tar.zst"
+    with pytest.raises(JenkinsJobsException) as excinfo:
+        OutputArchive(str(archive_path))
+    assert "'zstandard' is required" in str(excinfo.value)
+    assert not archive_path.exists()
+
+
+@pytest.mark.parametrize("suffix", [".tar.gz", ".zip"])
+def test_output_archive_removed_on_error(
+    tmp_path, execute_jenkins_jobs, default_config_file, suffix
+):
+    """
+    Verify that partial archive is removed when generation fails.
+    """
+    jobs_file = tmp_path / "jobs.yaml"
+    jobs_file.write_text(
+        "- job:\n"
+        "    name: good\n"
+        "- job:\n"
+        "    name: zz-bad\n"
+        "    builders:\n"
+        "      - no-such-builder\n"
+    )
+    archive_path = tmp_path / f"output{suffix}"
+    args = ["--conf", default_config_file, "test", "--config-xml"]
+    with pytest.raises(JenkinsJobsException):
+        execute_jenkins_jobs(
+            args + ["--output-archive", str(archive_path), str(jobs_file)]
+        )
+    assert not archive_path.exists()
+
+
+@pytest.mark.parametrize("suffix", [".zip", ".tar"])
+def test_output_archive_job_and_view_same_name(
+    tmp_path, execute_jenkins_jobs, default_config_file, suffix
+):
+    """
+    Verify that job and view with the same name, written to the same
+    archive entry, are refused.
+    """
+    jobs_file = tmp_path / "jobs.yaml"
+    jobs_file.write_text(
+        "- job:\n"
+        "    name: same\n"
+        "- view:\n"
+        "    name: same\n"
+        "    view-type: list\n"
+    )
+    archive_path = tmp_path / f"output{suffix}"
+    args = ["--conf", default_config_file, "test", "--config-xml"]
+    with pytest.raises(JenkinsJobsException) as excinfo:
+        execute_jenkins_jobs(
+            args + ["--output-archive", str(archive_path), str(jobs_file)]
+        )
+    assert "Duplicate entry 'same/config.xml'" in str(excinfo.value)
+    assert not archive_path.exists()
@@ -140,6 +140,49 @@ def test_update_jobs_and_delete_old(
     assert jenkins_delete_job.call_count == len(calls)
 
 
+def test_update_jobs_streaming(
+    mocker, fixtures_dir, default_config_file, execute_jenkins_jobs
+):
+    """Test update in streaming mode with --enabled-only and --delete-old
+    options: disabled jobs are neither updated nor kept.
+    """
+    mocker.patch("jenkins_jobs.builder.jenkins.Jenkins.job_exists")
+    jenkins_get_all_jobs = mocker.patch(
+        "jenkins_jobs.builder.jenkins.Jenkins.get_all_jobs"
+    )
+    jenkins_reconfig_job = mocker.patch(
+        "jenkins_jobs.builder.jenkins.Jenkins.reconfig_job"
+    )
+    jenkins_delete_job = mocker.patch("jenkins_jobs.builder.jenkins.Jenkins.delete_job")
+    mocker.patch("jenkins_jobs.builder.jenkins.Jenkins.get_views")
+    mocker.patch("jenkins_jobs.builder.JenkinsManager.is_managed_job")
+
+    enabled_jobs = ["bar001", "bar002", "baz001"]
+    jenkins_get_all_jobs.return_value = [
+        {"fullname": name} for name in enabled_jobs + ["bam001", "old_job001"]
+    ]
+
+    path = fixtures_dir / "cmd-002.yaml"
+    args = [
+        "--conf",
+        default_config_file,
+        "update",
+        "--streaming",
+        "--enabled-only",
+        "--delete-old",
+        str(path),
+    ]
+    execute_jenkins_jobs(args)
+
+    assert jenkins_reconfig_job.call_args_list == [
+        mock.call(job_name, mock.ANY) for job_name in enabled_jobs
+    ]
+    assert jenkins_delete_job.call_args_list == [
+        mock.call("bam001"),
+        mock.call("old_job001"),
+    ]
+
+
 def test_update_jobs_and_delete_old_views_only(
     mocker, fixtures_dir, default_config_file, execute_jenkins_jobs
 ):
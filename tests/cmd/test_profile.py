@@ -0,0 +1,81 @@
+import pstats
+import re
+import tracemalloc
+
+from jenkins_jobs.profiler import memory_profiler, profiler
+from jenkins_jobs.stats import stats
+
+JOBS = """\
+- builder:
+    name: make
+    builders:
+      - shell: make {target}
+
+- job-template:
+    name: build-{target}
+    builders:
+      - make:
+          target: '{target}'
+
+- project:
+    name: sample-project
+    target: [all, check]
+    jobs:
+      - build-{target}
+"""
+
+
+def test_profile(tmp_path, default_config_file, execute_jenkins_jobs):
+    jobs_path = tmp_path / "jobs.yaml"
+    jobs_path.write_text(JOBS)
+    profile_dir = tmp_path / "profile"
+    args = [
+        "--conf",
+        default_config_file,
+        "--profile",
+        str(profile_dir),
+        "test",
+        str(jobs_path),
+        "-o",
+        str(tmp_path / "out"),
+    ]
+    execute_jenkins_jobs(args)
+
+    assert not profiler.enabled
+    assert not stats.enabled
+    for phase in ["load", "expand", "amend", "gen_xml", "serialize", "total"]:
+        pstats.Stats(str(profile_dir / f"{phase}.pstats"))
+
+    lines = (profile_dir / "attribution.txt").read_text().splitlines()
+    assert lines[0].split() == ["Seconds", "Count", "Blocks", "Source", "Position"]
+    rows = [re.split(r"\s{2,}", line.strip()) for line in lines[1:]]
+    counts = {row[3]: (int(row[1]), row[4:]) for row in rows}
+    # Expanded and generated twice.
+    assert counts["In job template 'build-{target}'"] == (4, [f"{jobs_path}:6:3"])
+    assert counts["builder macro 'make'"] == (2, [f"{jobs_path}:1:3"])
+    assert counts["builder 'shell'"] == (2, [])
+
+
+def test_memory_profile(tmp_path, default_config_file, execute_jenkins_jobs):
+    jobs_path = tmp_path / "jobs.yaml"
+    jobs_path.write_text(JOBS)
+    report_path = tmp_path / "memory.txt"
+    args = [
+        "--conf",
+        default_config_file,
+        "--memory-profile",
+        str(report_path),
+        "test",
+        str(jobs_path),
+        "-o",
+        str(tmp_path / "out"),
+    ]
+    execute_jenkins_jobs(args)
+
+    assert not memory_profiler.enabled
+    assert not tracemalloc.is_tracing()
+    report = report_path.read_text()
+    boundaries = re.findall(r"^After (\w+):", report, re.MULTILINE)
+    assert boundaries == ["load", "generate_jobs", "amend", "generate_xml", "serialize"]
+    assert re.search(r"^  jenkins_jobs\.position\.Pos +\d+ \(\+\d+\)$", report, re.M)
+    assert re.search(r"^  xml\.etree\.ElementTree\.Element +\d+", report, re.M)
@@ -0,0 +1,52 @@
+import json
+
+from jenkins_jobs.stats import stats
+
+
+def test_stats_json(tmp_path, fixtures_dir, default_config_file, execute_jenkins_jobs):
+    stats_path = tmp_path / "stats.json"
+    args = [
+        "--conf",
+        default_config_file,
+        "--stats-json",
+        str(stats_path),
+        "test",
+        str(fixtures_dir / "update-both.yaml"),
+        "-o",
+        str(tmp_path / "out"),
+    ]
+    execute_jenkins_jobs(args)
+
+    data = json.loads(stats_path.read_text())
+    timers = data["timers"]
+    assert {"load", "expand", "amend", "gen_xml", "serialize", "total"} <= set(timers)
+    # Three jobs and three views.
+    assert timers["gen_xml"]["count"] == 6
+    assert timers["serialize"]["count"] == 6
+    assert not stats.enabled
+
+
+def test_stats_table(capsys, fixtures_dir, default_config_file, execute_jenkins_jobs):
+    args = [
+        "--conf",
+        default_config_file,
+        "--stats",
+        "test",
+        str(fixtures_dir / "cmd-001.yaml"),
+    ]
+    execute_jenkins_jobs(args)
+
+    captured = capsys.readouterr()
+    lines = captured.err.splitlines()
+    assert lines[0].split() == ["Timer", "Count", "Seconds"]
+    assert any(line.split()[:2] == ["gen_xml", "1"] for line in lines)
+    assert "Timer" not in captured.out
+
+
+def test_stats_disabled():
+    stats.reset()
+    assert not stats.enabled
+    with stats.timer("load"):
+        stats.add("unchanged items")
+    assert "load" not in stats.timers
+    assert "unchanged items" not in stats.counters
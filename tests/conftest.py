@@ -9,7 +9,7 @@ import yaml
 from jenkins.plugins import Plugin
 from jenkins_jobs.alphanum import AlphanumSort
 from jenkins_jobs.config import JJBConfig
-from jenkins_jobs.loader import Loader
+from jenkins_jobs.loader import Loader, PyLoader
 from jenkins_jobs.modules import project_externaljob
 from jenkins_jobs.modules import project_flow
 from jenkins_jobs.modules import project_githuborg
@@ -31,6 +31,15 @@ def job_cache_mocked(mocker):
     mocker.patch("jenkins_jobs.builder.JobCache", autospec=True)
 
 
+# Run tests using it with both libyaml based and pure python loaders.
+@pytest.fixture(params=["libyaml", "python"])
+def loader_cls(request, mocker):
+    if request.param == "python":
+        mocker.patch("jenkins_jobs.loader.Loader", PyLoader)
+        return PyLoader
+    return Loader
+
+
 @pytest.fixture
 def config_path(scenario):
     return scenario.config_path
@@ -165,12 +174,15 @@ def check_generator(scenario, input, expected_output, jjb_config, registry, proj
 
 @pytest.fixture
 def check_parser(jjb_config, registry):
-    def check(in_path):
+    def check(in_path, names_only=False):
         roots = Roots(jjb_config)
         load_files(jjb_config, roots, [in_path])
         registry.set_macros(roots.macros)
-        job_data_list = roots.generate_jobs()
-        view_data_list = roots.generate_views()
+        job_data_list = roots.generate_jobs(names_only)
+        view_data_list = roots.generate_views(names_only)
+        if names_only:
+            job_data_list = [job_data.expanded() for job_data in job_data_list]
+            view_data_list = [view_data.expanded() for view_data in view_data_list]
         generator = XmlJobGenerator(registry)
         _ = generator.generateXML(job_data_list)
         _ = generator.generateXML(view_data_list)
@@ -180,15 +192,19 @@ def check_parser(jjb_config, registry):
 
 @pytest.fixture
 def check_job(scenario, expected_output, jjb_config, registry):
-    def check():
+    def check(fast_load=False, names_only=False):
         roots = Roots(jjb_config)
         if jjb_config.recursive:
             path_list = [Path(p) for p in utils.recurse_path(str(scenario.in_path))]
         else:
             path_list = [scenario.in_path]
-        load_files(jjb_config, roots, path_list)
+        load_files(jjb_config, roots, path_list, fast_load)
         registry.set_macros(roots.macros)
-        job_data_list = roots.generate_jobs()
+        if names_only:
+            job_data_list = roots.generate_jobs(names_only=True)
+            job_data_list = [job_data.expanded() for job_data in job_data_list]
+        else:
+            job_data_list = roots.generate_jobs()
         registry.amend_job_dicts(job_data_list)
         generator = XmlJobGenerator(registry)
         job_xml_list = generator.generateXML(job_data_list)
@@ -0,0 +1,316 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+# In-memory imitation of Jenkins controller HTTP API, serving requests
+# python-jenkins makes for jenkins-jobs: crumb, plugins, job and view
+# listing, create, reconfigure and delete, config.xml and script console.
+# Used to test and benchmark uploads without a real controller.
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+CRUMB_FIELD = "Jenkins-Crumb"
+FOLDER_CONFIG = "<com.cloudbees.hudson.plugins.folder.Folder/>"
+ALL_VIEW_CONFIG = "<hudson.model.AllView><name>all</name></hudson.model.AllView>"
+# python-jenkins appends printing of this to scripts, to detect their end.
+SCRIPT_END = ")]}."
+# Script jenkins-jobs runs for `delete-all`.
+DELETE_ALL_SCRIPT = "for(job in jenkins.model.Jenkins.theInstance.getAllItems())"
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=""):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class FakeJenkins:
+    """Fake Jenkins controller, serving HTTP on a local port.
+
+    Jobs and views are kept in ``jobs`` and ``views`` dicts, mapping full
+    name to config XML. Parent folders of jobs are created implicitly; add
+    jobs with add_job to keep track of them.
+
+    :arg float latency: seconds to wait before handling each request
+    :arg float error_rate: fraction of requests, 0 to 1, failing with
+        ``error_status``
+    :arg int error_status: HTTP status of injected errors
+    :arg float rate_limit: maximum number of requests per second; others are
+        rejected with status 429
+    :arg list plugins: plugin info dicts, with shortName, longName and version
+    :arg bool crumb: require CSRF crumb for POST requests
+    :arg int seed: seed for error injection
+    """
+
+    def __init__(
+        self,
+        latency=0,
+        error_rate=0,
+        error_status=500,
+        rate_limit=None,
+        plugins=None,
+        crumb=True,
+        seed=0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.plugins = plugins or []
+        self.crumb = "fake-crumb" if crumb else None
+        self.jobs = {}
+        self.views = {"all": ALL_VIEW_CONFIG}
+        self.scripts = []
+        # Folder full name -> number of jobs in it, including subfolders.
+        self._folders = Counter()
+        # Requests by "METHOD action", and "error" and "rejected" counts.
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = 0
+        self._window_count = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def add_job(self, name, config_xml):
+        if name not in self.jobs:
+            for folder in _parents(name):
+                self._folders[folder] += 1
+        self.jobs[name] = config_xml
+
+    def remove_job(self, name):
+        del self.jobs[name]
+        for folder in _parents(name):
+            self._folders[folder] -= 1
+            if not self._folders[folder]:
+                del self._folders[folder]
+
+    def is_folder(self, name):
+        return name in self._folders
+
+    def _check_limits(self):
+        with self._lock:
+            if self.rate_limit:
+                now = time.monotonic()
+                if now - self._window_start >= 1:
+                    self._window_start = now
+                    self._window_count = 0
+                self._window_count += 1
+                if self._window_count > self.rate_limit:
+                    self.stats["rejected"] += 1
+                    raise HTTPError(429, "Rate limit exceeded")
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats["error"] += 1
+                raise HTTPError(self.error_status, "Injected error")
+
+    def handle(self, method, path, query, headers, body):
+        """Return (status, content type, body) for a request"""
+        if self.latency:
+            time.sleep(self.latency)
+        self._check_limits()
+        if method == "POST" and self.crumb and headers.get(CRUMB_FIELD) != self.crumb:
+            raise HTTPError(403, "No valid crumb was included in the request")
+        folder, action = _split_folder(path)
+        self.stats[f"{method} {action[0] if action else ''}"] += 1
+        with self._lock:
+            return self._dispatch(method, folder, action, query, body)
+
+    def _dispatch(self, method, folder, action, query, body):
+        if method == "GET" and action == ["crumbIssuer", "api", "json"]:
+            if not self.crumb:
+                raise HTTPError(404)
+            return _json({"crumb": self.crumb, "crumbRequestField": CRUMB_FIELD})
+        if method == "GET" and action == ["pluginManager", "api", "json"]:
+            return _json({"plugins": self.plugins})
+        if method == "POST" and action == ["scriptText"]:
+            script = parse_qs(body.decode("utf-8"))["script"][0]
+            self.scripts.append(script)
+            if script.startswith(DELETE_ALL_SCRIPT):
+                self.jobs.clear()
+                self._folders.clear()
+            return _text("\n" + SCRIPT_END)
+        if method == "GET" and action == ["api", "json"]:
+            return _json(self._info(""))
+        if method == "POST" and action == ["createItem"]:
+            return self._create(self.jobs, folder, query, body)
+        if folder and not self.is_folder(folder):
+            # python-jenkins reports missing folder as missing item.
+            raise HTTPError(404)
+        if method == "POST" and action == ["createView"]:
+            return self._create(self.views, folder, query, body)
+        if len(action) >= 3 and action[0] in ("job", "view"):
+            items = self.jobs if action[0] == "job" else self.views
+            name = _join(folder, action[1])
+            return self._item(items, method, name, action[2:], body)
+        raise HTTPError(404)
+
+    def _info(self, folder):
+        prefix = folder + "/" if folder else ""
+        # Full tree is returned regardless of requested depth.
+        children = {}
+        for name in list(self.jobs) + list(self._folders):
+            if name.startswith(prefix) and "/" not in name[len(prefix) :]:
+                children[name] = name[len(prefix) :]
+        jobs = []
+        for name in sorted(children):
+            job = {"name": children[name], "url": self._url("job", name)}
+            if self.is_folder(name):
+                job["jobs"] = self._info(name)["jobs"]
+            else:
+                job["color"] = "notbuilt"
+            jobs.append(job)
+        views = [
+            {"name": name[len(prefix) :], "url": self._url("view", name)}
+            for name in sorted(self.views)
+            if name.startswith(prefix) and "/" not in name[len(prefix) :]
+        ]
+        return {"jobs": jobs, "views": views}
+
+    def _url(self, kind, name):
+        return self.url + "".join(f"{kind}/{part}/" for part in name.split("/"))
+
+    def _create(self, items, folder, query, body):
+        name = _join(folder, query["name"][0])
+        if name in items or (items is self.jobs and self.is_folder(name)):
+            raise HTTPError(400, f"A job already exists with the name {name!r}")
+        if items is self.jobs:
+            self.add_job(name, body.decode("utf-8"))
+        else:
+            items[name] = body.decode("utf-8")
+        return _text("")
+
+    def _item(self, items, method, name, action, body):
+        is_folder = items is self.jobs and self.is_folder(name)
+        if name not in items and not is_folder:
+            raise HTTPError(404)
+        if method == "GET" and action == ["api", "json"]:
+            info = {"name": name.split("/")[-1]}
+            if is_folder:
+                info.update(self._info(name))
+            return _json(info)
+        if method == "GET" and action == ["config.xml"]:
+            return 200, "application/xml", items.get(name, FOLDER_CONFIG).encode()
+        if method == "POST" and action == ["config.xml"]:
+            if items is self.jobs:
+                self.add_job(name, body.decode("utf-8"))
+            else:
+                items[name] = body.decode("utf-8")
+            return _text("")
+        if method == "POST" and action == ["doDelete"]:
+            if items is self.views:
+                del items[name]
+                return _text("")
+            if name in items:
+                self.remove_job(name)
+            if is_folder:
+                for child in [job for job in items if job.startswith(name + "/")]:
+                    self.remove_job(child)
+            return _text("")
+        raise HTTPError(404)
+
+
+def _parents(name):
+    path = name.split("/")[:-1]
+    return ["/".join(path[: idx + 1]) for idx in range(len(path))]
+
+
+def _join(folder, name):
+    return f"{folder}/{name}" if folder else name
+
+
+def _split_folder(path):
+    """Split path like /job/a/job/b/view/c/config.xml to folder and rest"""
+    parts = [unquote(part) for part in path.strip("/").split("/")]
+    folder = []
+    # Last job/name pair is an item, not folder, if something follows it.
+    while len(parts) >= 4 and parts[0] == "job" and parts[2] in ("job", "view"):
+        folder.append(parts[1])
+        parts = parts[2:]
+    if (
+        len(parts) == 3
+        and parts[0] == "job"
+        and parts[2] in ("createItem", "createView")
+    ):
+        folder.append(parts[1])
+        parts = parts[2:]
+    return "/".join(folder), parts
+
+
+def _json(data):
+    return 200, "application/json", json.dumps(data).encode("utf-8")
+
+
+def _text(text):
+    return 200, "text/plain", text.encode("utf-8")
+
+
+def _make_handler(jenkins):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _handle(self, method):
+            url = urlsplit(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length)
+            try:
+                status, content_type, data = jenkins.handle(
+                    method, url.path, parse_qs(url.query), self.headers, body
+                )
+            except HTTPError as x:
+                status, content_type, data = x.status, "text/plain", x.message.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("X-Jenkins", "2.400")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
@@ -0,0 +1,201 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+from textwrap import dedent
+
+import jenkins
+import pytest
+
+from jenkins_jobs.builder import JenkinsManager
+from jenkins_jobs.cli import entry
+from jenkins_jobs.config import JJBConfig
+from jenkins_jobs.sharding import Shard
+from tests.fake_jenkins.server import FakeJenkins
+
+
+MANAGED_JOB = dedent(
+    """\
+    <project>
+      <description>Old job&lt;!-- Managed by Jenkins Job Builder --&gt;</description>
+    </project>
+    """
+)
+UNMANAGED_JOB = "<project><description>Manual job</description></project>"
+
+
+@pytest.fixture
+def fake_jenkins():
+    with FakeJenkins() as server:
+        yield server
+
+
+@pytest.fixture
+def config_file(fake_jenkins, tmp_path):
+    path = tmp_path / "jenkins_jobs.ini"
+    path.write_text(f"[jenkins]\nurl={fake_jenkins.url}\n")
+    return str(path)
+
+
+@pytest.fixture
+def jobs_file(tmp_path):
+    path = tmp_path / "jobs.yaml"
+    path.write_text(
+        dedent(
+            """\
+            - job-template:
+                name: '{name}-{num}'
+            - project:
+                name: project
+                num: [1, 2, 3]
+                jobs: ['{name}-{num}']
+            - job:
+                name: folder/sub/nested-job
+            - view:
+                name: project-view
+                view-type: list
+            """
+        )
+    )
+    return str(path)
+
+
+def test_update_and_delete_old(fake_jenkins, config_file, jobs_file):
+    fake_jenkins.add_job("old-job", MANAGED_JOB)
+    fake_jenkins.add_job("folder/old-job", MANAGED_JOB)
+    fake_jenkins.add_job("manual-job", UNMANAGED_JOB)
+
+    args = ["--conf", config_file, "update", "--workers", "4", "--delete-old"]
+    entry.JenkinsJobs(args + [jobs_file]).execute()
+
+    assert sorted(fake_jenkins.jobs) == [
+        "folder/sub/nested-job",
+        "manual-job",
+        "project-1",
+        "project-2",
+        "project-3",
+    ]
+    assert "<description>" in fake_jenkins.jobs["project-1"]
+    assert sorted(fake_jenkins.views) == ["all", "project-view"]
+    assert fake_jenkins.stats["POST createItem"] == 4
+    assert fake_jenkins.stats["POST createView"] == 1
+
+    # Existing jobs are reconfigured.
+    entry.JenkinsJobs(args + [jobs_file]).execute()
+    assert fake_jenkins.stats["POST createItem"] == 4
+    assert fake_jenkins.stats["POST job"] >= 4
+
+
+def test_delete_all(fake_jenkins, config_file):
+    fake_jenkins.add_job("folder/old-job", MANAGED_JOB)
+    args = ["--conf", config_file, "delete-all", "--force", "--jobs-only"]
+    entry.JenkinsJobs(args).execute()
+    assert fake_jenkins.jobs == {}
+    assert len(fake_jenkins.scripts) == 1
+
+
+def make_manager(url):
+    config = JJBConfig()
+    config.validate()
+    config.jenkins["url"] = url
+    config.builder["plugins_info"] = None
+    return JenkinsManager(config)
+
+
+def test_plugins_info():
+    plugin = {"shortName": "git", "longName": "Git plugin", "version": "5.0"}
+    with FakeJenkins(plugins=[plugin]) as server:
+        builder = make_manager(server.url)
+        assert list(builder.plugins_list) == [plugin]
+
+
+def test_injected_errors():
+    with FakeJenkins(error_rate=1, error_status=500) as server:
+        builder = make_manager(server.url)
+        with pytest.raises(jenkins.JenkinsException):
+            builder.update_job("job", UNMANAGED_JOB)
+    assert server.stats["error"] > 0
+    assert server.jobs == {}
+
+
+def test_rate_limit():
+    # First request is for crumb.
+    with FakeJenkins(rate_limit=3) as server:
+        builder = make_manager(server.url)
+        builder.jenkins.get_views()
+        builder.jenkins.get_views()
+        with pytest.raises(jenkins.JenkinsException):
+            builder.jenkins.get_views()
+    assert server.stats["rejected"] == 1
+    assert server.stats["GET api"] == 2
+
+
+def test_update_stats(fake_jenkins, config_file, jobs_file, tmp_path):
+    stats_path = tmp_path / "stats.json"
+    args = ["--conf", config_file, "--stats-json", str(stats_path), "update"]
+    entry.JenkinsJobs(args + [jobs_file]).execute()
+
+    data = json.loads(stats_path.read_text())
+    assert data["timers"]["remote create_job"]["count"] == 4
+    assert data["timers"]["remote create_view"]["count"] == 1
+    assert data["timers"]["hash"]["count"] >= 5
+    sent = sum(len(xml.encode("utf-8")) for xml in fake_jenkins.jobs.values())
+    sent += len(fake_jenkins.views["project-view"].encode("utf-8"))
+    assert data["counters"]["bytes sent"] == sent
+
+
+def test_update_changed_files(
+    fake_jenkins, config_file, jobs_file, tmp_path, monkeypatch
+):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.chdir(tmp_path)
+    args = ["--conf", config_file, "update", "--changed-files", "other.yaml"]
+    entry.JenkinsJobs(args + [jobs_file]).execute()
+    assert fake_jenkins.stats["POST createItem"] == 4
+
+    # Jobs not affected are neither updated nor deleted.
+    fake_jenkins.add_job("old-job", MANAGED_JOB)
+    entry.JenkinsJobs(args + ["--delete-old", jobs_file]).execute()
+    assert sorted(fake_jenkins.jobs) == [
+        "folder/sub/nested-job",
+        "project-1",
+        "project-2",
+        "project-3",
+    ]
+    # Only request to delete old-job.
+    assert fake_jenkins.stats["POST job"] == 1
+
+
+def test_update_shards_delete_old(
+    fake_jenkins, config_file, jobs_file, tmp_path, monkeypatch
+):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    for name in ["old-job", "other-old-job", "folder/old-job"]:
+        fake_jenkins.add_job(name, MANAGED_JOB)
+
+    old_jobs = sorted(fake_jenkins.jobs)
+    new_jobs = ["folder/sub/nested-job", "project-1", "project-2", "project-3"]
+    shard = Shard(1, 2)
+    args = ["--conf", config_file, "update", "--delete-old", jobs_file]
+    entry.JenkinsJobs(args + ["--shard", "1/2"]).execute()
+    # Jobs of the other shard are neither created nor deleted.
+    assert sorted(fake_jenkins.jobs) == sorted(
+        [name for name in old_jobs if name not in shard]
+        + [name for name in new_jobs if name in shard]
+    )
+
+    entry.JenkinsJobs(args + ["--shard", "2/2"]).execute()
+    assert sorted(fake_jenkins.jobs) == new_jobs
+    assert sorted(fake_jenkins.views) == ["all", "project-view"]
+    assert fake_jenkins.stats["POST createItem"] == 4
+    # Each old job is deleted once, by its own shard.
+    assert fake_jenkins.stats["POST job"] == 3
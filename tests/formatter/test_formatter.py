@@ -4,6 +4,7 @@ from jinja2 import StrictUndefined
 from jenkins_jobs.errors import JenkinsJobsException
 from jenkins_jobs.formatter import (
     CustomFormatter,
+    _str_format_required_params,
     enum_str_format_required_params,
     enum_str_format_param_defaults,
 )
@@ -149,6 +150,31 @@ def test_used_params(
     assert used_vars == set(expected_used_vars)
 
 
+def test_used_params_cached():
+    """
+    Verify that parsed format strings are reused, give the same results
+    for the same strings and can not be changed by callers.
+    """
+    _str_format_required_params.cache_clear()
+    first = list(enum_str_format_required_params("{abc} {def|x}", pos=None))
+    assert first == ["abc", "def"]
+    first.append("ghi")
+    assert list(enum_str_format_required_params("{abc} {def|x}", pos=None)) == [
+        "abc",
+        "def",
+    ]
+    assert list(enum_str_format_required_params("{ghi}", pos=None)) == ["ghi"]
+    assert list(enum_str_format_required_params("{abc}", pos=None)) == ["abc"]
+    info = _str_format_required_params.cache_info()
+    assert (info.hits, info.misses) == (1, 3)
+    # Cached value is immutable.
+    assert isinstance(_str_format_required_params("{abc} {def|x}"), tuple)
+    # Errors are not cached, each call reports them.
+    for _ in range(2):
+        with pytest.raises(JenkinsJobsException):
+            list(enum_str_format_required_params("{abc} {}", pos=None))
+
+
 @pytest.mark.parametrize(
     "format,vars,expected_used_vars,expected_defaults,expected_result", cases
 )
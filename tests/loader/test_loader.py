@@ -25,18 +25,21 @@ from yaml.composer import ComposerError
 from jenkins_jobs.config import JJBConfig
 
 from jenkins_jobs.roots import Roots
-from jenkins_jobs.loader import Loader, load_files
+from jenkins_jobs.loader import load_files
 from jenkins_jobs.registry import ModuleRegistry
+from jenkins_jobs.yaml_objects import _compile_template
 from tests.enum_scenarios import scenario_list
 
 
 fixtures_dir = Path(__file__).parent / "fixtures"
 
+pytestmark = pytest.mark.usefixtures("loader_cls")
+
 
 @pytest.fixture
-def read_input(scenario, jjb_config):
+def read_input(scenario, jjb_config, loader_cls):
     def read():
-        loader = Loader(
+        loader = loader_cls(
             scenario.in_path.read_text(),
             jjb_config=jjb_config,
             source_path=scenario.in_path,
@@ -200,3 +203,157 @@ def test_retain_anchors_enabled_j2_yaml():
     registry.set_macros(roots.macros)
     jobs = roots.generate_jobs()
     assert "docker run ubuntu:latest" == jobs[0].data["builders"][0]["shell"]
+
+
+def test_load_workers():
+    """
+    Verify that files parsed by worker processes are loaded the same way
+    and in the same order as ones parsed sequentially.
+    """
+
+    files = [
+        fixtures_dir / "include001.yaml",
+        fixtures_dir / "include-raw-verbatim-job.yaml",
+        fixtures_dir / "joinlists.yaml",
+        fixtures_dir / "../../yamlparser/job_fixtures/include03.yaml",
+        fixtures_dir / "../../yamlparser/job_fixtures/jinja01.yaml",
+    ]
+
+    def load(load_workers):
+        config = JJBConfig()
+        config.yamlparser["load_workers"] = load_workers
+        config.validate()
+        roots = Roots(config)
+        load_files(config, roots, files)
+        return [(job.data, job.data.pos) for job in roots.generate_jobs()]
+
+    jobs = load(load_workers=1)
+    assert repr(load(load_workers=2)) == repr(jobs)
+
+
+def test_jinja2_cache_dir(tmp_path):
+    """
+    Verify that templates compiled into jinja2 cache directory are
+    reused and give the same results.
+    """
+
+    files = [
+        fixtures_dir / "../../yamlparser/job_fixtures/jinja01.yaml",
+        fixtures_dir / "../../yamlparser/job_fixtures/jinja-include03.yaml",
+    ]
+
+    def load(jinja2_cache_dir):
+        config = JJBConfig()
+        config.yamlparser["jinja2_cache_dir"] = jinja2_cache_dir
+        config.validate()
+        roots = Roots(config)
+        load_files(config, roots, files)
+        return [job.data for job in roots.generate_jobs()]
+
+    jobs = load(jinja2_cache_dir=None)
+    cache_dir = tmp_path / "jinja2"
+    assert load(jinja2_cache_dir=str(cache_dir)) == jobs
+    cached_files = sorted(cache_dir.iterdir())
+    assert cached_files
+    # Drop in-memory compiled templates to read them from cache directory.
+    _compile_template.cache_clear()
+    assert load(jinja2_cache_dir=str(cache_dir)) == jobs
+    assert sorted(cache_dir.iterdir()) == cached_files
+
+
+def test_include_files_read_once(tmp_path, mocker):
+    """
+    Verify that files included by every job instance are read and
+    parsed only once.
+    """
+
+    (tmp_path / "builders.yaml.inc").write_text("- shell: echo {name}\n")
+    (tmp_path / "script.sh").write_text("echo {name}\n")
+    (tmp_path / "jobs.yaml").write_text(
+        "- job-template:\n"
+        "    name: 'job-{name}'\n"
+        "    builders: !include: builders.yaml.inc\n"
+        "    publishers:\n"
+        "      - post-tasks:\n"
+        "          - matches:\n"
+        "              - log-text: x\n"
+        "            script: !include-raw-verbatim: script.sh\n"
+        "- project:\n"
+        "    name: project\n"
+        "    jobs:\n"
+        "      - 'job-{name}':\n"
+        "          name: [a, b, c]\n"
+    )
+
+    config = JJBConfig()
+    config.validate()
+    roots = Roots(config)
+    read_text = mocker.spy(Path, "read_text")
+    load_files(config, roots, [tmp_path / "jobs.yaml"])
+    jobs = roots.generate_jobs()
+
+    assert [job.data["builders"] for job in jobs] == [
+        [{"shell": "echo a"}],
+        [{"shell": "echo b"}],
+        [{"shell": "echo c"}],
+    ]
+    read_paths = [call.args[0].name for call in read_text.call_args_list]
+    assert sorted(read_paths) == ["builders.yaml.inc", "jobs.yaml", "script.sh"]
+
+
+def test_defaults_replaced_after_generation(tmp_path):
+    """
+    Verify that defaults merged with global ones are merged again when
+    defaults, including global ones, are replaced by later loaded files.
+    """
+
+    config = JJBConfig()
+    config.validate()
+
+    def load(name, text):
+        path = tmp_path / name
+        path.write_text(text)
+        load_files(config, roots, [path])
+
+    def generated():
+        [job_data] = roots.generate_jobs()
+        return job_data.expanded().data
+
+    roots = Roots(config)
+    load(
+        "jobs.yaml",
+        "- defaults:\n"
+        "    name: mine\n"
+        "    node: first-node\n"
+        "- job:\n"
+        "    name: job\n"
+        "    defaults: mine\n",
+    )
+    [job] = roots.jobs.values()
+    assert generated()["node"] == "first-node"
+    assert roots.defaults.merged
+
+    load(
+        "mine.yaml",
+        "- defaults:\n" "    name: mine\n" "    node: second-node\n",
+    )
+    assert job._pick_defaults("mine").contents["node"] == "second-node"
+    assert generated()["node"] == "second-node"
+
+    load(
+        "global.yaml",
+        "- defaults:\n"
+        "    name: global\n"
+        "    description: From global\n"
+        "    node: global-node\n",
+    )
+    merged = job._pick_defaults("mine")
+    assert merged.contents["description"] == "From global"
+    assert merged.contents["node"] == "second-node"
+    assert generated()["description"].startswith("From global")
+
+    load(
+        "global-2.yaml",
+        "- defaults:\n" "    name: global\n" "    description: From second global\n",
+    )
+    assert generated()["description"].startswith("From second global")
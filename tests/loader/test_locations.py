@@ -12,7 +12,7 @@
 
 from pathlib import Path
 
-from jenkins_jobs.loc_loader import LocLoader
+from jenkins_jobs.loc_loader import CLocLoader, LocDict, LocList, LocLoader
 
 fixtures_dir = Path(__file__).parent / "loc_fixtures"
 
@@ -70,3 +70,43 @@ def test_location():
         print("keys for item:", key, pos)
     for key, pos in b.value_pos.items():
         print("values for item:", key, pos)
+
+
+def test_location_crlf():
+    path = fixtures_dir / "sample_01.yaml"
+    text = path.read_text().replace("\n", "\r\n")
+    loader = LocLoader(text, str(path))
+    data = loader.get_single_data()
+
+    sample_macro = data[1]["job_template"]["builders"][1]["sample_macro"]
+    param_2_pos = sample_macro.value_pos["param_2"]
+    assert not hasattr(param_2_pos, "__dict__")
+    assert param_2_pos.line == 9
+    assert param_2_pos.column == 19
+    assert param_2_pos.snippet.splitlines()[0].strip() == "param_2: value_2"
+    assert param_2_pos.body.startswith("value_2")
+
+
+def enum_positions(data):
+    if isinstance(data, LocDict):
+        yield data.pos
+        yield from data.key_pos.values()
+        yield from data.value_pos.values()
+        for value in data.values():
+            yield from enum_positions(value)
+    elif isinstance(data, LocList):
+        yield data.pos
+        yield from data.value_pos
+        for value in data:
+            yield from enum_positions(value)
+
+
+def test_libyaml_location_parity():
+    path = fixtures_dir / "sample_01.yaml"
+    text = path.read_text() + "- unicode:\n    ключ: [значение, &a {b: c}]\n    d: *a\n"
+    data = LocLoader(text, str(path)).get_single_data()
+    c_data = CLocLoader(text, str(path)).get_single_data()
+    assert c_data == data
+    positions = [(p.line, p.column, p.snippet) for p in enum_positions(data)]
+    c_positions = [(p.line, p.column, p.snippet) for p in enum_positions(c_data)]
+    assert c_positions == positions
@@ -15,11 +15,20 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from collections import Counter
 from operator import attrgetter
 from pathlib import Path
+import xml.etree.ElementTree as XML
 
 import pytest
 
+from jenkins_jobs.config import JJBConfig
+from jenkins_jobs.loader import load_files
+from jenkins_jobs.macro import Macro
+from jenkins_jobs.memo import record_elements
+from jenkins_jobs.registry import ModuleRegistry
+from jenkins_jobs.roots import Roots
+from jenkins_jobs.xml_config import XmlJobGenerator
 from tests.enum_scenarios import scenario_list
 
 
@@ -36,3 +45,152 @@ def scenario(request):
 
 def test_yaml_snippet(check_job):
     check_job()
+
+
+def test_macro_output_reused(tmp_path, mocker):
+    """
+    Verify that macro called with the same parameters by different jobs
+    is expanded once, and that macros using job data are not reused.
+    """
+
+    (tmp_path / "jobs.yaml").write_text(
+        "- builder:\n"
+        "    name: build\n"
+        "    builders:\n"
+        "      - shell: make {target}\n"
+        "- publisher:\n"
+        "    name: notify\n"
+        "    publishers:\n"
+        "      - email:\n"
+        "          recipients: team@example.com\n"
+        "- property:\n"
+        "    name: auth\n"
+        "    properties:\n"
+        "      - authorization:\n"
+        "          anonymous:\n"
+        "            - job-read\n"
+        "- job-template:\n"
+        "    name: 'job-{name}'\n"
+        "    properties:\n"
+        "      - auth\n"
+        "    builders:\n"
+        "      - build:\n"
+        "          target: '{target}'\n"
+        "    publishers:\n"
+        "      - notify\n"
+        "- project:\n"
+        "    name: project\n"
+        "    target: all\n"
+        "    jobs:\n"
+        "      - 'job-{name}':\n"
+        "          name: [a, b, c]\n"
+        "      - 'job-{name}':\n"
+        "          name: d\n"
+        "          target: docs\n"
+    )
+
+    def generate(macro_memo=True):
+        config = JJBConfig()
+        config.validate()
+        config.builder["macro_memo"] = macro_memo
+        roots = Roots(config)
+        load_files(config, roots, [tmp_path / "jobs.yaml"])
+        registry = ModuleRegistry(config)
+        registry.set_macros(roots.macros)
+        job_data_list = roots.generate_jobs()
+        xml_jobs = XmlJobGenerator(registry).generateXML(job_data_list)
+        return [(job.name, job.output()) for job in xml_jobs]
+
+    dispatch = mocker.spy(Macro, "_dispatch_elements")
+    jobs = generate()
+    dispatched = Counter(call.args[0].name for call in dispatch.call_args_list)
+    # One recording per target value.
+    assert dispatched["build"] == 2
+    assert dispatched["notify"] == 1
+    # Aborted recording, then every job expands it by itself.
+    assert dispatched["auth"] == 5
+    assert b"make docs" in dict(jobs)["job-d"]
+
+    # Disabled by default.
+    dispatch.reset_mock()
+    assert generate(macro_memo=False) == jobs
+    dispatched = Counter(call.args[0].name for call in dispatch.call_args_list)
+    assert dispatched["build"] == 4
+    assert dispatched["notify"] == 4
+
+
+def test_macro_output_by_parent_tag(tmp_path):
+    """
+    Verify that macro output is not reused under parent element with
+    another tag, which components may depend on.
+    """
+
+    (tmp_path / "jobs.yaml").write_text(
+        "- publisher:\n"
+        "    name: deploy\n"
+        "    publishers:\n"
+        "      - ssh:\n"
+        "          site: server.example.com\n"
+        "          target: dest/dir/\n"
+        "          source: base/source/dir/**\n"
+        "- job:\n"
+        "    name: job\n"
+        "    publishers:\n"
+        "      - deploy\n"
+        "      - conditional-publisher:\n"
+        "          - condition-kind: always\n"
+        "            action:\n"
+        "              - deploy\n"
+    )
+
+    def generate(macro_memo=True):
+        config = JJBConfig()
+        config.validate()
+        config.builder["macro_memo"] = macro_memo
+        roots = Roots(config)
+        load_files(config, roots, [tmp_path / "jobs.yaml"])
+        registry = ModuleRegistry(config)
+        registry.set_macros(roots.macros)
+        job_data_list = roots.generate_jobs()
+        [xml_job] = XmlJobGenerator(registry).generateXML(job_data_list)
+        return xml_job.output()
+
+    output = generate()
+    assert b"BapSshPublisherPlugin" in output
+    assert b"BapSshBuilderPlugin" in output
+
+    assert generate(macro_memo=False) == output
+
+
+@pytest.mark.parametrize(
+    "look",
+    [
+        pytest.param(lambda parent: parent.text, id="text"),
+        pytest.param(lambda parent: parent.attrib, id="attrib"),
+        pytest.param(lambda parent: parent.get("name"), id="get"),
+        pytest.param(lambda parent: parent.keys(), id="keys"),
+        pytest.param(lambda parent: parent.items(), id="items"),
+        pytest.param(lambda parent: parent.find("name"), id="find"),
+        pytest.param(lambda parent: len(parent), id="len"),
+        pytest.param(lambda parent: setattr(parent, "text", "x"), id="set-text"),
+        pytest.param(lambda parent: parent.set("name", "x"), id="set"),
+        pytest.param(lambda parent: parent.clear(), id="clear"),
+        pytest.param(lambda parent: parent.insert(0, XML.Element("name")), id="insert"),
+    ],
+)
+def test_record_elements_parent_used(look):
+    """
+    Verify that output is not recorded when parent element is looked at
+    or changed, even if component catches the exception.
+    """
+
+    def dispatch(parent):
+        try:
+            look(parent)
+        except Exception:
+            pass
+        XML.SubElement(parent, "output")
+
+    assert record_elements("builders", dispatch) is None
+    [element] = record_elements("builders", lambda p: XML.SubElement(p, "output"))
+    assert element.tag == "output"
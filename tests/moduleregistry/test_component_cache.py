@@ -0,0 +1,200 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import copy
+import os
+import xml.etree.ElementTree as XML
+from pathlib import Path
+
+import pkg_resources
+import pytest
+
+from jenkins_jobs.config import JJBConfig
+from jenkins_jobs.modules import (
+    builders,
+    general,
+    hipchat_notif,
+    notifications,
+    parameters,
+    project_githuborg,
+    project_multibranch,
+    properties,
+    publishers,
+    reporters,
+    scm,
+    triggers,
+    wrappers,
+)
+from jenkins_jobs.registry import ModuleRegistry
+from jenkins_jobs.xml_config import XmlJob
+from tests.enum_scenarios import scenario_list
+
+
+tests_dir = Path(__file__).parent.parent
+
+# Error and duplicate fixtures produce no XML and are not listed here.
+module_fixtures = [
+    ("builders", builders.Builders),
+    ("general", general.General),
+    ("githuborg", project_githuborg.GithubOrganization),
+    ("hipchat", hipchat_notif.HipChat),
+    ("multibranch", project_multibranch.WorkflowMultiBranch),
+    ("notifications", notifications.Notifications),
+    ("parameters", parameters.Parameters),
+    ("properties", properties.Properties),
+    ("publishers", publishers.Publishers),
+    ("reporters", reporters.Reporters),
+    ("scm", scm.SCM),
+    ("triggers", triggers.Triggers),
+    ("wrappers", wrappers.Wrappers),
+]
+job_scenarios = [
+    *scenario_list(tests_dir / "yamlparser/job_fixtures"),
+    *scenario_list(tests_dir / "macros/fixtures"),
+    *scenario_list(tests_dir / "triggers/job_fixtures"),
+    *scenario_list(tests_dir / "jsonparser/fixtures", in_ext=".json"),
+    *[
+        s
+        for s in scenario_list(tests_dir / "loader/fixtures")
+        if not s.name.startswith(("custom_", "exception_")) and s.out_paths
+    ],
+]
+
+
+def scenario_id(scenario):
+    return scenario.in_path.relative_to(tests_dir).as_posix()
+
+
+# Override to enable component cache.
+@pytest.fixture
+def jjb_config(jjb_config):
+    jjb_config.builder["component_cache"] = True
+    return jjb_config
+
+
+@pytest.mark.parametrize(
+    "scenario,Generator",
+    [
+        pytest.param(s, Generator, id=scenario_id(s))
+        for dir, Generator in module_fixtures
+        for s in scenario_list(tests_dir / dir / "fixtures")
+    ],
+)
+def test_module_fixture(check_generator, input, registry, Generator):
+    # Some components, like gerrit trigger, modify their data.
+    original_input = copy.deepcopy(input)
+    check_generator(Generator)
+    input.clear()
+    input.update(original_input)
+    # Second time, output of pure components is taken from cache.
+    check_generator(Generator)
+    assert registry.component_cache is not None
+
+
+@pytest.mark.parametrize(
+    "scenario",
+    [pytest.param(s, id=scenario_id(s)) for s in job_scenarios],
+)
+@pytest.mark.filterwarnings("ignore::UserWarning")
+def test_job_fixture(check_job):
+    os.chdir(tests_dir.parent)
+    check_job()
+    check_job()
+
+
+@pytest.mark.parametrize(
+    "scenario",
+    [
+        pytest.param(s, id=scenario_id(s))
+        for s in scenario_list(tests_dir / "yamlparser/view_fixtures")
+    ],
+)
+def test_view_fixture(check_view):
+    check_view()
+    check_view()
+
+
+@pytest.mark.parametrize(
+    "scenario",
+    [
+        pytest.param(s, id=scenario_id(s))
+        for s in scenario_list(tests_dir / "views/fixtures")
+    ],
+)
+def test_view_module_fixture(input, registry, expected_output):
+    [ep] = pkg_resources.iter_entry_points("jenkins_jobs.views", input["view-type"])
+    view = ep.load()(registry)
+    for _ in range(2):
+        xml = view.root_xml(input)
+        assert XmlJob(xml, "fixtureview").output().decode() == expected_output
+
+
+def test_component_output_reused():
+    """
+    Verify that output of pure component is reused for the same data,
+    and that other components are not cached.
+    """
+
+    config = JJBConfig()
+    config.builder["component_cache"] = True
+    config.validate()
+    registry = ModuleRegistry(config)
+    xml_parent = XML.Element("builders")
+    for command in ["make", "make", "make docs"]:
+        registry.dispatch("builder", xml_parent, {"shell": command})
+    registry.dispatch("builder", xml_parent, {"python": "print()"})
+
+    assert [e.findtext("command") for e in xml_parent] == [
+        "make",
+        "make",
+        "make docs",
+        "print()",
+    ]
+    assert xml_parent[0] is not xml_parent[1]
+    assert sorted(key[3] for key in registry.component_cache) == [
+        (str, "make"),
+        (str, "make docs"),
+    ]
+
+
+def test_component_output_by_parent_tag(mocker):
+    """
+    Verify that output of pure component is not reused under parent
+    element with another tag.
+    """
+
+    mocker.patch.object(publishers.ssh, "pure", True, create=True)
+    # Reload entry points, to see it as pure.
+    mocker.patch.object(ModuleRegistry, "_entry_points_cache", {})
+    config = JJBConfig()
+    config.builder["component_cache"] = True
+    config.validate()
+    registry = ModuleRegistry(config)
+    data = {
+        "ssh": {
+            "site": "server.example.com",
+            "target": "dest/dir/",
+            "source": "base/source/dir/**",
+        }
+    }
+    tags = []
+    for tag in ["publishers", "publishers", "dummy"]:
+        xml_parent = XML.Element(tag)
+        registry.dispatch("publisher", xml_parent, data)
+        tags.append(xml_parent[0].tag.rsplit(".", 1)[-1])
+
+    assert tags == [
+        "BapSshPublisherPlugin",
+        "BapSshPublisherPlugin",
+        "BapSshBuilderPlugin",
+    ]
+    assert len(registry.component_cache) == 2
@@ -160,3 +160,22 @@ def test_plugin_version_comparison(registry, scenario):
         f"Unexpectedly found {v1} {scenario.op} {scenario.v2} == False"
         " when comparing versions!"
     )
+
+
+def test_amend_job_dicts(config):
+    """
+    Verify that jobs are amended only by modules overriding amend_job_dict,
+    until none of them changes the job.
+    """
+    registry = ModuleRegistry(config)
+    assert [type(mod).__name__ for mod in registry._amending_modules] == ["Zuul"]
+
+    zuul_job = {"triggers": ["zuul", "zuul-post"]}
+    other_job = {"triggers": ["timed"]}
+    registry.amend_job_dict(zuul_job)
+    registry.amend_job_dict(other_job)
+
+    assert zuul_job["triggers"] == []
+    names = [p["string"]["name"] for p in zuul_job["parameters"]]
+    assert "ZUUL_UUID" in names and "ZUUL_OLDREV" in names
+    assert other_job == {"triggers": ["timed"]}
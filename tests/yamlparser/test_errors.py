@@ -47,9 +47,11 @@ def plugins_info():
     return None
 
 
-def test_error(check_parser, scenario, expected_error):
+@pytest.mark.usefixtures("loader_cls")
+@pytest.mark.parametrize("names_only", [False, True], ids=["full", "names-only"])
+def test_error(check_parser, scenario, expected_error, names_only):
     with pytest.raises(JenkinsJobsException) as excinfo:
-        check_parser(scenario.in_path)
+        check_parser(scenario.in_path, names_only)
     error = "\n".join(excinfo.value.lines)
     print()
     print(error)
@@ -35,6 +35,7 @@ def scenario(request):
     return request.param
 
 
+@pytest.mark.usefixtures("loader_cls")
 def test_yaml_snippet(scenario, check_job):
     # Some tests using config with 'include_path' expect JJB root to be current directory.
     os.chdir(Path(__file__).parent / "../..")
@@ -44,3 +45,24 @@ def test_yaml_snippet(scenario, check_job):
         assert "is deprecated" in str(record[0].message)
     else:
         check_job()
+
+
+def test_yaml_snippet_fast_load(scenario, jjb_config, check_job):
+    if jjb_config.yamlparser["retain_anchors"] or scenario.name == "include03":
+        # CLI retries these in normal mode.
+        pytest.skip("Fast load does not pass anchors to other files")
+    os.chdir(Path(__file__).parent / "../..")
+    if scenario.name.startswith("deprecated-"):
+        with pytest.warns(UserWarning):
+            check_job(fast_load=True)
+    else:
+        check_job(fast_load=True)
+
+
+def test_yaml_snippet_names_only(scenario, check_job):
+    os.chdir(Path(__file__).parent / "../..")
+    if scenario.name.startswith("deprecated-"):
+        with pytest.warns(UserWarning):
+            check_job(names_only=True)
+    else:
+        check_job(names_only=True)
@@ -17,5 +17,6 @@ def scenario(request):
     return request.param
 
 
+@pytest.mark.usefixtures("loader_cls")
 def test_yaml_snippet(check_view):
     check_view()